@@ -1,11 +1,37 @@
-from flask import Flask
-from flask_cors import CORS
-from .storage import MemoryStorage
+"""
+Aplicación Flask
+Los módulos se importan dentro de create_app() y no al importar el paquete:
+el proceso servidor de almacenamiento y gunicorn.conf.py solo necesitan
+app.config y app.storage, y no deben cargar Flask ni sus extensiones.
+"""
+import atexit
 
+from .config import STORAGE_CONFIG, COMPRESSION_CONFIG
+
+
+def create_app(storage=None):
+    from flask import Flask
+    from flask_cors import CORS
+    from .storage import create_storage
+    from .analytics_cache import AnalyticsCache
+    from .compression import init_compression
+    from .json_provider import init_json
+    from .routing import LazyBuilderRule
 
-def create_app():
     app = Flask(__name__)
-    app.storage = MemoryStorage()
+    # Las funciones de url_for de cada ruta se compilan al usarlas, no al registrarlas
+    app.url_rule_class = LazyBuilderRule
+    # Serialización JSON con orjson si está instalado
+    init_json(app)
+    # Si no se proporciona un almacenamiento, se crea según la configuración
+    if storage is None:
+        storage = create_storage(STORAGE_CONFIG)
+        if hasattr(storage, 'close'):
+            # Vuelca las escrituras pendientes (journal) y cierra al terminar el proceso
+            atexit.register(storage.close)
+    app.storage = storage
+    # Resultados de /api/analytics por usuario y versión de sus datos
+    app.analytics_cache = AnalyticsCache()
 
     # Configurar CORS para permitir llamadas desde el frontend
     # En desarrollo, permite cualquier origen
@@ -21,10 +47,11 @@ def create_app():
     # Registrar blueprints
     from .views import views
     from .routes import api
-    
+
     app.register_blueprint(views)
     app.register_blueprint(api)
 
-    return app
-
+    # Comprimir las respuestas grandes según Accept-Encoding
+    init_compression(app, COMPRESSION_CONFIG)
 
+    return app
@@ -0,0 +1,129 @@
+"""
+Analítica del historial de peso
+Medias móviles, tendencia y medias semanales y mensuales calculadas con NumPy
+sobre la serie completa del usuario (get_weight_series). La caché por usuario
+está en analytics_cache.py, que no importa NumPy, de modo que este módulo
+solo se carga en la primera petición que lo necesita.
+"""
+import numpy as np
+
+from .storage import MICROSECONDS_PER_DAY
+
+
+# Ventanas de las medias móviles, en días naturales
+MOVING_AVERAGE_WINDOWS = (7, 30)
+
+# El 1 de enero de 1970 fue jueves: (día + 3) // 7 numera semanas de lunes a domingo
+_WEEK_OFFSET = 3
+
+
+def iso_dates(days):
+    """Fechas ISO (AAAA-MM-DD) de un array de días desde EPOCH
+
+    Equivale a days.astype('datetime64[D]').astype(str).tolist(), pero
+    calcula año, mes y día con aritmética entera (algoritmo civil_from_days
+    de H. Hinnant) y escribe los dígitos directamente, lo que es
+    varias veces más rápido con historiales grandes. Años 0-9999.
+    """
+    z = np.asarray(days, dtype=np.int64) + 719_468
+    era = z // 146_097
+    day_of_era = z - era * 146_097
+    year_of_era = (day_of_era - day_of_era // 1460 + day_of_era // 36_524
+                   - day_of_era // 146_096) // 365
+    day_of_year = day_of_era - (365 * year_of_era + year_of_era // 4 - year_of_era // 100)
+    shifted_month = (5 * day_of_year + 2) // 153
+    day = day_of_year - (153 * shifted_month + 2) // 5 + 1
+    month = np.where(shifted_month < 10, shifted_month + 3, shifted_month - 9)
+    year = year_of_era + era * 400 + (month <= 2)
+
+    # Cada fila son los diez caracteres UCS-4 de una fecha
+    chars = np.empty((len(z), 10), dtype=np.uint32)
+    for column, divisor in enumerate((1000, 100, 10, 1)):
+        chars[:, column] = year // divisor % 10 + ord('0')
+    chars[:, 4] = chars[:, 7] = ord('-')
+    chars[:, 5] = month // 10 + ord('0')
+    chars[:, 6] = month % 10 + ord('0')
+    chars[:, 8] = day // 10 + ord('0')
+    chars[:, 9] = day % 10 + ord('0')
+    return chars.view('<U10').ravel().tolist()
+
+
+def _moving_average(days, weights, window):
+    """Media de los pesos de los últimos window días naturales hasta cada pesaje"""
+    cumulative = np.concatenate(([0.0], np.cumsum(weights)))
+    end = np.arange(1, len(days) + 1)
+    start = np.searchsorted(days, days - (window - 1), side='left')
+    return (cumulative[end] - cumulative[start]) / (end - start)
+
+
+def _trend_per_week(micros, weights):
+    """Pendiente de la recta de regresión en kg/semana, o None con menos de dos días"""
+    if len(micros) < 2:
+        return None
+    # Se centran ambos ejes para no perder precisión con marcas de tiempo grandes
+    x = (micros - micros[0]) / MICROSECONDS_PER_DAY
+    x -= x.mean()
+    denominator = x @ x
+    if denominator == 0:
+        return None
+    return float(x @ (weights - weights.mean()) / denominator * 7)
+
+
+def _group_means(keys, weights):
+    """Media y número de pesajes por grupo de claves consecutivas iguales
+
+    Devuelve la clave de cada grupo, la media y el número de pesajes; keys
+    debe estar ordenado, como lo está la serie.
+    """
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(keys)) + 1))
+    counts = np.diff(np.concatenate((starts, [len(keys)])))
+    return keys[starts], np.add.reduceat(weights, starts) / counts, counts
+
+
+def _rounded(values):
+    return np.round(values, 2).tolist()
+
+
+def compute_analytics(timestamps, weights) -> dict:
+    """Calcula la analítica de una serie (microsegundos, pesos) en orden cronológico"""
+    micros = np.asarray(timestamps, dtype=np.int64)
+    weights = np.asarray(weights, dtype=np.float64)
+    if len(micros) == 0:
+        return {
+            "serie": {"fechas": [], "peso_kg": [],
+                      **{f"media_movil_{window}d": [] for window in MOVING_AVERAGE_WINDOWS}},
+            "tendencia_kg_semana": None,
+            "medias_semanales": [],
+            "medias_mensuales": [],
+        }
+
+    # División entera hacia abajo: las fechas anteriores a 1970 también caen en su día
+    days = micros // MICROSECONDS_PER_DAY
+
+    series = {"fechas": iso_dates(days), "peso_kg": weights.tolist()}
+    for window in MOVING_AVERAGE_WINDOWS:
+        series[f"media_movil_{window}d"] = _rounded(_moving_average(days, weights, window))
+
+    trend = _trend_per_week(micros, weights)
+
+    weeks, week_means, week_counts = _group_means((days + _WEEK_OFFSET) // 7, weights)
+    week_starts = iso_dates(weeks * 7 - _WEEK_OFFSET)
+    months, month_means, month_counts = _group_means(
+        days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64), weights
+    )
+    month_names = months.astype('datetime64[M]')
+
+    return {
+        "serie": series,
+        "tendencia_kg_semana": round(trend, 2) if trend is not None else None,
+        "medias_semanales": [
+            {"semana": week, "peso_medio": mean, "num_pesajes": count}
+            for week, mean, count in zip(week_starts,
+                                         _rounded(week_means), week_counts.tolist())
+        ],
+        "medias_mensuales": [
+            {"mes": month, "peso_medio": mean, "num_pesajes": count}
+            for month, mean, count in zip(month_names.astype(str).tolist(),
+                                          _rounded(month_means), month_counts.tolist())
+        ],
+    }
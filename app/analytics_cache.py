@@ -0,0 +1,49 @@
+"""
+Caché de la analítica del historial de peso
+Independiente de NumPy: analytics.py (y NumPy) se importan en el primer cálculo.
+"""
+import threading
+from collections import OrderedDict
+
+
+# Usuarios cuyo resultado se conserva en la caché
+ANALYTICS_CACHE_SIZE = 256
+
+
+class AnalyticsCache:
+    """Caché de la analítica por usuario, indexada por la versión de sus datos
+
+    Cada escritura cambia la versión de los datos del usuario, por lo que un
+    resultado guardado con otra versión se descarta y se vuelve a calcular. La
+    versión la comparten todos los procesos, así que la caché es válida
+    también con varios workers.
+    """
+
+    def __init__(self, max_users: int = ANALYTICS_CACHE_SIZE):
+        self._max_users = max_users
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, storage, user_id: int) -> dict:
+        # Como en los ETag, la versión se lee antes que los datos: si una
+        # escritura llega entre medias, el resultado se recalcula en la siguiente
+        version = storage.get_data_version(user_id)
+        with self._lock:
+            cached = self._entries.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(user_id)
+                return cached[1]
+
+        # El cálculo se hace fuera del bloqueo para no serializar a los usuarios
+        from .analytics import compute_analytics
+        result = compute_analytics(*storage.get_weight_series(user_id))
+        with self._lock:
+            self._entries[user_id] = (version, result)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self._max_users:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
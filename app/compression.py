@@ -0,0 +1,128 @@
+"""
+Compresión de respuestas según Accept-Encoding
+Comprime con brotli (si el paquete está instalado) o gzip las respuestas de
+texto que superan un tamaño mínimo, incluidas las respuestas en streaming.
+"""
+import zlib
+
+try:
+    import brotli
+except ImportError:  # dependencia opcional
+    brotli = None
+
+from flask import request
+
+
+# Tipos de contenido que merece la pena comprimir
+COMPRESSIBLE_MIMETYPES = frozenset({
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/csv',
+    'text/html',
+    'text/css',
+    'text/plain',
+})
+
+# wbits para que zlib escriba cabecera y cola gzip
+_GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+
+def available_encodings() -> tuple:
+    """Codificaciones soportadas, en orden de preferencia"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def _choose_encoding(accept_encodings, encodings):
+    """Codificación con mayor calidad en Accept-Encoding (en empate, la preferida)"""
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Compresor incremental con la misma interfaz para gzip y brotli"""
+
+    def __init__(self, encoding: str, config: dict):
+        self._brotli = encoding == 'br'
+        if self._brotli:
+            self._compressor = brotli.Compressor(quality=config["brotli_quality"])
+        else:
+            self._compressor = zlib.compressobj(config["gzip_level"], zlib.DEFLATED, _GZIP_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli:
+            return self._compressor.process(data)
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Vacía lo pendiente sin terminar el flujo (el cliente puede ir descomprimiendo)"""
+        if self._brotli:
+            return self._compressor.flush()
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self._brotli:
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+def compress_bytes(data: bytes, encoding: str, config: dict) -> bytes:
+    """Comprime data completo con la codificación indicada"""
+    compressor = _Compressor(encoding, config)
+    return compressor.compress(data) + compressor.finish()
+
+
+def _compress_stream(chunks, compressor):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode('utf-8')
+        data = compressor.compress(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def init_compression(app, config: dict) -> None:
+    """Registra la compresión de respuestas en la aplicación (ver COMPRESSION_CONFIG)"""
+    if not config["enabled"]:
+        return
+    encodings = available_encodings()
+    min_size = config["min_size"]
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code != 200
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        if response.is_streamed:
+            # Tamaño desconocido: se comprime siempre, bloque a bloque
+            size = None
+        else:
+            size = response.content_length
+            if size is None or size < min_size:
+                # Respuesta pequeña: no depende de Accept-Encoding
+                return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = _choose_encoding(request.accept_encodings, encodings)
+        if encoding is None:
+            return response
+
+        if size is None:
+            response.response = _compress_stream(response.response, _Compressor(encoding, config))
+            response.headers.pop('Content-Length', None)
+        else:
+            response.set_data(compress_bytes(response.get_data(), encoding, config))
+        response.headers['Content-Encoding'] = encoding
+        # La representación comprimida no es idéntica byte a byte a la original
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -0,0 +1,77 @@
+"""
+Primitivas de sincronización
+Bloqueos compartidos por las implementaciones de almacenamiento
+"""
+import threading
+
+
+class ReadWriteLock:
+    """Bloqueo de lectura/escritura
+
+    Permite varios lectores simultáneos o un único escritor. Los escritores
+    tienen preferencia: cuando uno espera, los nuevos lectores aguardan a que
+    termine, de modo que una carga continua de lecturas no bloquea las escrituras.
+
+    Uso:
+        with lock.read: ...
+        with lock.write: ...
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self.read = _ReadLock(self)
+        self.write = _WriteLock(self)
+
+    def acquire_read(self) -> None:
+        with self._condition:
+            while self._writer or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self) -> None:
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self) -> None:
+        with self._condition:
+            self._writer = False
+            self._condition.notify_all()
+
+
+class _ReadLock:
+    __slots__ = ('_lock',)
+
+    def __init__(self, lock: ReadWriteLock):
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire_read()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._lock.release_read()
+
+
+class _WriteLock:
+    __slots__ = ('_lock',)
+
+    def __init__(self, lock: ReadWriteLock):
+        self._lock = lock
+
+    def __enter__(self):
+        self._lock.acquire_write()
+
+    def __exit__(self, exc_type, exc, tb):
+        self._lock.release_write()
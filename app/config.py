@@ -2,11 +2,20 @@
 Archivo de configuración de la aplicación
 Centraliza todos los valores de configuración y constantes
 """
+import os
 from datetime import datetime
 
-# Configuración de usuario (monousuario)
+# Usuario único del modo monousuario
 USER_ID = 1
 
+# Modo multiusuario: el usuario de cada petición se identifica por una
+# cabecera que añade el proxy de autenticación de la clínica (el proxy debe
+# eliminar la que envíe el cliente). Sin él, todas las peticiones son de USER_ID
+MULTI_USER_CONFIG = {
+    "enabled": os.environ.get("MULTI_USER", "0") == "1",
+    "user_header": os.environ.get("USER_ID_HEADER", "X-User-Id"),
+}
+
 # Límites de validación
 VALIDATION_LIMITS = {
     "height_min": 0.4,  # metros
@@ -17,12 +26,54 @@ VALIDATION_LIMITS = {
     "weight_variation_per_day": 5,  # kg por día
 }
 
+# Número máximo de registros por petición de carga masiva (/api/weights/bulk)
+BULK_MAX_ENTRIES = 10000
+
+# Número máximo de mediciones por petición de cálculo de IMC en lote (/api/imc/batch)
+IMC_BATCH_MAX_ENTRIES = 100000
+
+# Tamaño máximo de página de /api/weights (parámetro limit)
+WEIGHTS_PAGE_MAX_LIMIT = 1000
+
+# Vida en caché (segundos) de las respuestas que no cambian mientras el
+# proceso está en marcha (/api/config, /api/messages); se revalidan por ETag
+STATIC_API_MAX_AGE = 86400
+
+# Compresión de respuestas según Accept-Encoding (brotli requiere el paquete
+# opcional "brotli"; sin él solo se usa gzip). Las respuestas de menos de
+# min_size bytes se envían sin comprimir.
+COMPRESSION_CONFIG = {
+    "enabled": os.environ.get("COMPRESSION_ENABLED", "1") == "1",
+    "min_size": int(os.environ.get("COMPRESSION_MIN_SIZE", 1024)),  # bytes
+    "gzip_level": int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6)),  # 1-9
+    "brotli_quality": int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4)),  # 0-11
+}
+
 # Configuración del servidor
 SERVER_CONFIG = {
     "port": 5001,
     "host": "0.0.0.0",
 }
 
+# Configuración del almacenamiento
+# backend: "memory" (datos en memoria, se pierden al reiniciar), "journal"
+# (memoria con diario y snapshots en disco), "sqlite" o "shared" (proceso
+# servidor compartido por todos los workers, que usa "shared_backend")
+STORAGE_CONFIG = {
+    "backend": os.environ.get("STORAGE_BACKEND", "memory"),
+    "sqlite_path": os.environ.get("SQLITE_PATH", "instance/app.db"),
+    "journal_dir": os.environ.get("JOURNAL_DIR", "instance/journal"),
+    "compaction_interval": float(os.environ.get("JOURNAL_COMPACTION_INTERVAL", 300)),  # segundos
+    # 0: cada escritura espera a estar en disco; > 0: write-behind, se vuelca cada tantos segundos
+    "flush_interval": float(os.environ.get("JOURNAL_FLUSH_INTERVAL", 0)),  # segundos
+    "max_batch": int(os.environ.get("JOURNAL_MAX_BATCH", 1000)),  # registros por fsync
+    # Particiones de los almacenamientos en memoria (memory, journal), cada una con su bloqueo
+    "partitions": int(os.environ.get("STORAGE_PARTITIONS", 64)),
+    "shared_backend": os.environ.get("STORAGE_SHARED_BACKEND", "memory"),
+    "socket_path": os.environ.get("STORAGE_SOCKET", "instance/storage.sock"),
+    "authkey": os.environ.get("STORAGE_AUTHKEY", ""),  # hexadecimal
+}
+
 # Configuración de idioma
 ACTIVE_LANGUAGE = 'es'
 
@@ -1,4 +1,15 @@
-from .translations import get_bmi_complete_description
+from bisect import bisect_right
+from datetime import datetime
+
+from .translations import get_bmi_complete_description, get_bmi_description as get_bmi_label
+
+
+# Clasificaciones de BMI en orden y límites inferiores de cada una a partir de
+# la segunda: un BMI pertenece a la última clasificación cuyo límite no supera
+BMI_CATEGORY_KEYS = (
+    "underweight", "normal", "overweight", "obese_class_i", "obese_class_ii", "obese_class_iii",
+)
+BMI_THRESHOLDS = (18.5, 25, 30, 35, 40)
 
 
 def calculate_bmi(weight_kg, height_m):
@@ -9,21 +20,73 @@ def calculate_bmi(weight_kg, height_m):
 
 def get_bmi_description(bmi):
     """Devuelve la clasificación de BMI con su descripción detallada"""
-    # Diccionario que vincula el rango de BMI con la clave de descripción
     # La descripción está vinculada directamente a la clasificación
-    if bmi < 18.5:
-        key = "underweight"
-    elif 18.5 <= bmi < 25:
-        key = "normal"
-    elif 25 <= bmi < 30:
-        key = "overweight"
-    elif 30 <= bmi < 35:
-        key = "obese_class_i"
-    elif 35 <= bmi < 40:
-        key = "obese_class_ii"
-    else:  # bmi >= 40
-        key = "obese_class_iii"
-    
+    key = BMI_CATEGORY_KEYS[bisect_right(BMI_THRESHOLDS, bmi)]
     return get_bmi_complete_description(key)
 
 
+# Las versiones vectorizadas importan NumPy al usarse: solo lo necesitan
+# /api/imc/history y /api/imc/batch, y así no se carga al arrancar
+
+def _round_like_python(values, digits):
+    """Redondea como round() de Python
+
+    np.round multiplica por 10**digits antes de redondear, lo que cambia el
+    resultado cuando el valor está justo en la mitad (0.15 es en realidad
+    0.1499...). Esos pocos casos se redondean con round().
+    """
+    import numpy as np
+    rounded = np.round(values, digits)
+    scaled = values * 10 ** digits
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if len(ties):
+        rounded[ties] = [round(value, digits) for value in values[ties].tolist()]
+    return rounded
+
+
+def calculate_bmi_array(weights_kg, heights_m):
+    """Versión vectorizada de calculate_bmi: mismo cálculo y mismo redondeo
+
+    heights_m puede ser un array de la misma longitud que weights_kg o una
+    sola talla para todos los pesos. Las tallas no positivas dan 0.
+    """
+    import numpy as np
+    weights = np.asarray(weights_kg, dtype=np.float64)
+    heights = np.broadcast_to(np.asarray(heights_m, dtype=np.float64), weights.shape)
+    valid = heights > 0
+    bmi = np.zeros(weights.shape)
+    np.divide(weights, heights ** 2, out=bmi, where=valid)
+    return _round_like_python(bmi, 1)
+
+
+def classify_bmi_array(bmi):
+    """Índice en BMI_CATEGORY_KEYS de la clasificación de cada BMI"""
+    import numpy as np
+    return np.searchsorted(BMI_THRESHOLDS, bmi, side='right')
+
+
+def bmi_category_labels():
+    """Nombres de las clasificaciones en el orden de BMI_CATEGORY_KEYS
+
+    Se devuelven como array de objetos para traducir los índices de
+    classify_bmi_array con labels[indices]: cada punto referencia una de
+    estas seis cadenas en lugar de consultar las traducciones.
+    """
+    import numpy as np
+    return np.array([get_bmi_label(key) for key in BMI_CATEGORY_KEYS], dtype=object)
+
+
+def parse_recorded_date(value):
+    """Convierte una fecha ISO 8601 a fecha local sin zona horaria
+
+    Acepta el formato de Date.toISOString() del frontend (sufijo 'Z'); las
+    fechas con zona horaria se convierten a la hora local del servidor, que es
+    la que usa el almacenamiento.
+    """
+    text = str(value)
+    if text.endswith('Z'):
+        text = text[:-1] + '+00:00'
+    parsed = datetime.fromisoformat(text)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
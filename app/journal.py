@@ -0,0 +1,338 @@
+"""
+Persistencia de MemoryStorage mediante diario (journal) y snapshots
+Cada escritura se añade a un diario de solo anexado, por lotes con un fsync
+por lote; periódicamente se guarda un snapshot completo y se descartan los
+segmentos del diario ya incluidos en él. Al arrancar se carga el último
+snapshot y solo se reproduce la cola del diario.
+
+El snapshot usa el formato binario de app/snapshot.py.
+"""
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+from .snapshot import (Snapshot, read_snapshot as read_snapshot_file,
+                       write_snapshot as write_snapshot_file)
+from .storage import DEFAULT_PARTITIONS, MemoryStorage, UserData, WeightEntryData
+
+
+SNAPSHOT_FILE = 'snapshot.bin'
+SEGMENT_PREFIX = 'journal-'
+SEGMENT_SUFFIX = '.log'
+
+# Tipos de registro del diario
+RECORD_USER = 'u'
+RECORD_WEIGHT = 'w'
+
+# Registros por escritura y fsync al volcar la cola al diario
+DEFAULT_MAX_BATCH = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class StorageJournal:
+    """Diario de escrituras dividido en segmentos más un snapshot
+
+    Cada registro lleva un número de secuencia ('s'). Los segmentos se nombran
+    con la secuencia de su primer registro, de modo que el orden alfabético de
+    los ficheros coincide con el orden de escritura.
+    """
+
+    def __init__(self, directory: str):
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        self._sequence = 0
+        self._file = None
+        self._segment_path = None
+
+    @property
+    def sequence(self) -> int:
+        """Secuencia del último registro escrito o cargado"""
+        return self._sequence
+
+    def _segment_paths(self) -> list:
+        names = sorted(
+            name for name in os.listdir(self._directory)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        )
+        return [os.path.join(self._directory, name) for name in names]
+
+    def read_snapshot(self) -> Optional[Snapshot]:
+        """Lee el último snapshot, o None si todavía no existe"""
+        path = os.path.join(self._directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        snapshot = read_snapshot_file(path)
+        self._sequence = snapshot.sequence
+        return snapshot
+
+    def replay(self):
+        """Genera los registros del diario posteriores al snapshot cargado"""
+        for path in self._segment_paths():
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # Última línea incompleta (caída durante la escritura)
+                        break
+                    if record['s'] <= self._sequence:
+                        continue
+                    self._sequence = record['s']
+                    yield record
+
+    def open(self) -> None:
+        """Abre un segmento nuevo para los registros siguientes"""
+        name = f"{SEGMENT_PREFIX}{self._sequence + 1:020d}{SEGMENT_SUFFIX}"
+        self._segment_path = os.path.join(self._directory, name)
+        self._file = open(self._segment_path, 'a', encoding='utf-8')
+
+    def append(self, record: dict) -> None:
+        """Añade un registro al diario y lo fuerza a disco"""
+        self.append_batch([record])
+
+    def append_batch(self, records: list) -> None:
+        """Añade varios registros al diario con una única escritura a disco"""
+        lines = []
+        for record in records:
+            self._sequence += 1
+            record['s'] = self._sequence
+            lines.append(json.dumps(record, separators=(',', ':')) + '\n')
+        self._file.write(''.join(lines))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def rotate(self) -> int:
+        """Cierra el segmento actual y abre otro; devuelve la última secuencia cerrada"""
+        self._file.close()
+        self.open()
+        return self._sequence
+
+    def write_snapshot(self, blocks: list, next_entry_id: int, sequence: int) -> None:
+        """Guarda el snapshot de forma atómica y elimina los segmentos ya incluidos"""
+        write_snapshot_file(os.path.join(self._directory, SNAPSHOT_FILE), blocks, next_entry_id, sequence)
+        for segment_path in self._segment_paths():
+            if segment_path != self._segment_path:
+                os.remove(segment_path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JournaledMemoryStorage(MemoryStorage):
+    """MemoryStorage con persistencia en diario y snapshots
+
+    Las lecturas se sirven desde memoria igual que en MemoryStorage. Cada
+    save_user y add_weight_entry se aplica en memoria y deja su registro en
+    una cola, que se vuelca al diario por lotes de hasta max_batch registros
+    con un único fsync por lote (group commit):
+
+    - flush_interval = 0: cada escritura vuelca la cola antes de volver, por
+      lo que al responder ya está en disco. Las escrituras concurrentes
+      comparten el mismo fsync.
+    - flush_interval > 0 (write-behind): la escritura vuelve en cuanto está
+      en memoria y un hilo vuelca la cola cada flush_interval segundos, o
+      antes si acumula max_batch registros. Si el proceso cae, se pierden como
+      máximo las escrituras de los últimos flush_interval segundos más las
+      del volcado en curso.
+
+    Todas las escrituras, de cualquier usuario y partición, toman un único
+    _write_lock para que la cola conserve el orden en que se aplicaron en
+    memoria; las particiones solo evitan esperas entre lecturas.
+
+    Un hilo en segundo plano compacta el diario cada compaction_interval
+    segundos (0 desactiva la compactación automática). close() vuelca la
+    cola pendiente antes de guardar el snapshot final.
+    """
+
+    def __init__(self, directory: str, compaction_interval: float = 300,
+                 partitions: int = DEFAULT_PARTITIONS, flush_interval: float = 0,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        super().__init__(partitions)
+        self._journal = StorageJournal(directory)
+        self._write_lock = threading.Lock()
+        self._compaction_lock = threading.Lock()
+        self._snapshot_sequence = 0
+        # Cola de registros aplicados en memoria y aún no escritos en el diario
+        # (protegida por _write_lock) y número de registros encolados desde el inicio
+        self._pending = []
+        self._queued = 0
+        self._max_batch = max(1, max_batch)
+        # Registros ya escritos en disco y si algún hilo tiene el fichero del
+        # diario (solo uno escribe a la vez; el resto espera su turno o su registro)
+        self._journal_state = threading.Condition(threading.Lock())
+        self._durable = 0
+        self._journal_busy = False
+
+        snapshot = self._journal.read_snapshot()
+        if snapshot is not None:
+            self._load_snapshot(snapshot)
+        self._snapshot_sequence = self._journal.sequence
+        for record in self._journal.replay():
+            self._apply_record(record)
+        self._journal.open()
+
+        self._stop_event = threading.Event()
+        self._flush_event = threading.Event()
+        self._flusher = None
+        if flush_interval > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_loop, args=(flush_interval,),
+                name='storage-flusher', daemon=True
+            )
+            self._flusher.start()
+        self._compactor = None
+        if compaction_interval > 0:
+            self._compactor = threading.Thread(
+                target=self._compaction_loop, args=(compaction_interval,),
+                name='storage-compactor', daemon=True
+            )
+            self._compactor.start()
+
+    def _apply_record(self, record: dict) -> None:
+        if record['t'] == RECORD_USER:
+            super().save_user(UserData.from_dict(record['d']))
+        elif record['t'] == RECORD_WEIGHT:
+            self._restore_weight_entry(WeightEntryData.from_dict(record['d']))
+
+    def save_user(self, user: UserData) -> None:
+        with self._write_lock:
+            super().save_user(user)
+            ticket = self._enqueue([{'t': RECORD_USER, 'd': user.to_dict()}])
+        self._after_write(ticket)
+
+    def add_weight_entry(self, entry: WeightEntryData) -> None:
+        with self._write_lock:
+            super().add_weight_entry(entry)
+            ticket = self._enqueue([{'t': RECORD_WEIGHT, 'd': entry.to_dict()}])
+        self._after_write(ticket)
+
+    def add_weight_entries(self, entries: list) -> None:
+        with self._write_lock:
+            super().add_weight_entries(entries)
+            ticket = self._enqueue([{'t': RECORD_WEIGHT, 'd': entry.to_dict()} for entry in entries])
+        self._after_write(ticket)
+
+    def _enqueue(self, records: list) -> int:
+        """Encola los registros (con _write_lock tomado); devuelve el número del último"""
+        self._pending.extend(records)
+        self._queued += len(records)
+        return self._queued
+
+    def _after_write(self, ticket: int) -> None:
+        if self._flusher is None:
+            self._wait_durable(ticket)
+        elif len(self._pending) >= self._max_batch:
+            self._flush_event.set()
+
+    def flush(self) -> None:
+        """Escribe en el diario los registros pendientes, con un fsync por lote"""
+        with self._write_lock:
+            ticket = self._queued
+        self._wait_durable(ticket)
+
+    def _wait_durable(self, ticket: int) -> None:
+        """Espera a que estén en disco los registros hasta ticket (group commit)
+
+        Si ningún hilo está escribiendo, este escribe toda la cola, incluidos
+        los registros que otros hilos encolaron mientras tanto; si no, espera
+        a que quien escribe termine y solo escribe si su registro sigue en la cola.
+        """
+        with self._journal_state:
+            while self._durable < ticket and self._journal_busy:
+                self._journal_state.wait()
+            if self._durable >= ticket:
+                return
+            self._journal_busy = True
+        try:
+            self._write_pending()
+        finally:
+            with self._journal_state:
+                self._journal_busy = False
+                self._journal_state.notify_all()
+
+    def _write_pending(self) -> None:
+        """Escribe la cola en lotes de max_batch registros (con el diario reservado)"""
+        while True:
+            with self._write_lock:
+                batch = self._pending[:self._max_batch]
+                del self._pending[:self._max_batch]
+            if not batch:
+                return
+            try:
+                self._journal.append_batch(batch)
+            except Exception:
+                # Se reintentarán en el siguiente volcado; reproducir dos veces
+                # un registro escrito a medias da el mismo resultado
+                with self._write_lock:
+                    self._pending[:0] = batch
+                raise
+            with self._journal_state:
+                self._durable += len(batch)
+                self._journal_state.notify_all()
+
+    def _flush_loop(self, interval: float) -> None:
+        while not self._stop_event.is_set():
+            self._flush_event.wait(interval)
+            self._flush_event.clear()
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Error al volcar el diario; se reintentará")
+
+    def compact(self) -> None:
+        """Guarda un snapshot del estado actual y descarta el diario ya incluido
+
+        El snapshot puede incluir escrituras que siguen en la cola; se
+        escribirán después en el segmento nuevo y, al reproducirlas de nuevo
+        sobre el snapshot en el mismo orden, el resultado es el mismo.
+        """
+        with self._compaction_lock:
+            with self._journal_state:
+                while self._journal_busy:
+                    self._journal_state.wait()
+                self._journal_busy = True
+            try:
+                with self._write_lock:
+                    if self._journal.sequence == self._snapshot_sequence:
+                        return
+                    blocks, next_entry_id = self._export_blocks()
+                    sequence = self._journal.rotate()
+            finally:
+                with self._journal_state:
+                    self._journal_busy = False
+                    self._journal_state.notify_all()
+
+            # La escritura del snapshot se hace fuera de los bloqueos de escritura
+            self._journal.write_snapshot(blocks, next_entry_id, sequence)
+            self._snapshot_sequence = sequence
+
+    def load(self, path: str) -> None:
+        """Carga un snapshot binario y guarda enseguida un snapshot del diario
+
+        Los datos cargados no pasan por el diario: quedan persistidos cuando
+        vuelve la llamada, al compactar.
+        """
+        with self._write_lock:
+            super().load(path)
+            self._snapshot_sequence = None
+        self.compact()
+
+    def _compaction_loop(self, interval: float) -> None:
+        while not self._stop_event.wait(interval):
+            self.compact()
+
+    def close(self) -> None:
+        """Detiene los hilos, vuelca la cola, guarda un snapshot final y cierra el diario"""
+        self._stop_event.set()
+        self._flush_event.set()
+        for thread in (self._flusher, self._compactor):
+            if thread is not None:
+                thread.join()
+        self.flush()
+        self.compact()
+        self._journal.close()
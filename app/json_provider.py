@@ -0,0 +1,66 @@
+"""
+Proveedor JSON de la aplicación
+Usa orjson si está instalado (serializa listas grandes varias veces más
+rápido) y el proveedor estándar de Flask en caso contrario.
+"""
+from importlib.util import find_spec
+
+from flask.json.provider import DefaultJSONProvider
+
+
+def orjson_available() -> bool:
+    """Indica si orjson está instalado, sin importarlo (dependencia opcional)"""
+    return find_spec('orjson') is not None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Proveedor JSON basado en orjson
+
+    Los tipos que orjson no serializa (o que Flask serializa de otra forma,
+    como las fechas) pasan por DefaultJSONProvider.default y las claves se
+    ordenan como con sort_keys, de modo que el contenido es el mismo que con
+    el proveedor estándar. A diferencia de este (ensure_ascii), los
+    caracteres no ASCII se escriben en UTF-8 en lugar de como secuencias
+    \\uXXXX. Las llamadas con opciones propias de json.dumps/json.loads usan
+    el proveedor estándar.
+    """
+
+    # orjson se importa en la primera serialización, no al crear la aplicación
+    _orjson = None
+    options = 0
+
+    @classmethod
+    def _module(cls):
+        orjson = cls._orjson
+        if orjson is None:
+            import orjson
+            cls.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_SORT_KEYS
+            cls._orjson = orjson
+        return orjson
+
+    def dumps(self, obj, **kwargs) -> str:
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        orjson = self._module()
+        return orjson.dumps(obj, default=self.default, option=self.options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return self._module().loads(s)
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            # Salida indentada para depuración
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        # orjson genera bytes: se evita decodificar y volver a codificar
+        orjson = self._module()
+        body = orjson.dumps(obj, default=self.default, option=self.options) + b'\n'
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+def init_json(app) -> None:
+    """Instala el proveedor JSON más rápido disponible en la aplicación"""
+    if orjson_available():
+        app.json = OrjsonProvider(app)
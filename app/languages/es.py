@@ -11,9 +11,19 @@ ERRORS = {
     "invalid_birth_date": "Fecha de nacimiento no válida",
     "birth_date_out_of_range": "Fecha de nacimiento fuera de rango (1900 - hoy)",
     "user_not_configured": "Usuario no configurado",
+    "user_id_required": "Falta la identificación del usuario",
     "user_must_be_configured": "Debe configurar el usuario primero",
     "invalid_weight": "Peso no válido",
     "weight_out_of_range": "Peso fuera de rango (2 - 650 kg)",
+    "invalid_bulk_payload": "Formato de carga masiva no válido",
+    "too_many_entries": "Demasiados registros en una sola petición (máximo {max_entries})",
+    "invalid_recorded_date": "Fecha de registro no válida",
+    "invalid_page_limit": "Tamaño de página no válido (entre 1 y {max_limit})",
+    "invalid_cursor": "Cursor de paginación no válido",
+    "invalid_date_range": "Rango de fechas no válido (formato AAAA-MM-DD)",
+    "invalid_since": "Versión de sincronización no válida",
+    "invalid_export_format": "Formato de exportación no válido (ndjson o csv)",
+    "invalid_imc_batch_payload": "Formato de lote no válido (peso_kg y talla_m deben ser listas de la misma longitud)",
     "weight_variation_exceeded": "El peso no puede variar más de 5 kg por día desde el último registro. Han pasado {days_text}, por lo que la variación máxima permitida es {max_allowed_difference:.1f} kg. Diferencia actual: {weight_difference:.1f} kg",
 }
 
@@ -0,0 +1,87 @@
+"""
+Respuestas precalculadas
+Contenidos inmutables durante la vida del proceso (configuración, mensajes,
+página principal) que se serializan o renderizan una sola vez y se sirven
+directamente como bytes
+"""
+import gzip
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+
+class PrecomputedResponse:
+    """Respuesta JSON serializada y comprimida con gzip al crearse
+
+    Cada variante (sin comprimir y gzip) tiene su propio ETag fuerte,
+    derivado del contenido. La variante gzip solo se prepara si ocupa menos.
+    """
+
+    def __init__(self, payload, max_age: int):
+        body = json.dumps(payload, ensure_ascii=False, sort_keys=True,
+                          separators=(',', ':')).encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        # Huella del contenido, para derivar ETags de respuestas que lo incluyen
+        self.digest = digest
+        self._identity = (body, digest)
+        self._gzip = None
+        # mtime=0: la misma entrada produce siempre los mismos bytes
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) < len(body):
+            self._gzip = (compressed, f"{digest}-gzip")
+        self._cache_control = f"public, max-age={max_age}"
+
+    def make_response(self):
+        """Respuesta para la petición actual: variante según Accept-Encoding o 304"""
+        use_gzip = self._gzip is not None and request.accept_encodings['gzip'] > 0
+        body, etag = self._gzip if use_gzip else self._identity
+
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+        else:
+            response = current_app.response_class(body, mimetype='application/json')
+            if use_gzip:
+                response.headers['Content-Encoding'] = 'gzip'
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = self._cache_control
+        response.vary.add('Accept-Encoding')
+        return response
+
+
+class PrecomputedPage:
+    """Página HTML ya renderizada, servida con ETag y Last-Modified
+
+    El ETag fuerte se deriva del contenido y Last-Modified es la fecha de
+    modificación más reciente de los ficheros de los que sale la página. La
+    compresión la aplica init_compression al responder.
+    """
+
+    def __init__(self, html: str, sources):
+        self.body = html.encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self._mtimes = {path: os.stat(path).st_mtime for path in sources}
+        # Las fechas HTTP tienen resolución de segundos
+        self.last_modified = datetime.fromtimestamp(int(max(self._mtimes.values())), timezone.utc)
+
+    def is_stale(self) -> bool:
+        """Indica si algún fichero de origen ha cambiado desde que se renderizó"""
+        try:
+            return any(os.stat(path).st_mtime != mtime for path, mtime in self._mtimes.items())
+        except OSError:
+            return True
+
+    def make_response(self):
+        """Respuesta para la petición actual: la página o 304 según If-None-Match/If-Modified-Since"""
+        if is_resource_modified(request.environ, etag=self.etag, last_modified=self.last_modified):
+            response = current_app.response_class(self.body, mimetype='text/html')
+        else:
+            response = current_app.response_class(status=304)
+        response.set_etag(self.etag)
+        response.last_modified = self.last_modified
+        # no-cache: el navegador guarda la página pero la revalida en cada uso
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
@@ -2,30 +2,163 @@
 Blueprint para las rutas de API REST
 Maneja todas las operaciones de la API (usuarios, pesos, IMC, estadísticas)
 """
-from flask import request, jsonify, Blueprint, current_app
-from datetime import datetime, date
+from flask import request, jsonify, Blueprint, current_app, g, Response, stream_with_context
+from datetime import datetime, date, timedelta
+import base64
+import binascii
+import csv
+import io
 
-from .storage import UserData, WeightEntryData
-from .helpers import calculate_bmi, get_bmi_description
-from .translations import get_error, get_message, get_text, get_days_text, get_frontend_messages
-from .config import USER_ID, VALIDATION_LIMITS
+from .storage import UserData, WeightEntryData, MICROSECONDS_PER_DAY, datetime_to_micros, micros_to_datetime
+from .helpers import (
+    calculate_bmi, get_bmi_description, parse_recorded_date,
+    calculate_bmi_array, classify_bmi_array, bmi_category_labels
+)
+from .translations import (
+    get_error, get_message, get_text, get_days_text, get_frontend_messages, get_language,
+    is_multilingual
+)
+from .precomputed import PrecomputedResponse
+from .config import (
+    USER_ID, MULTI_USER_CONFIG, VALIDATION_LIMITS, BULK_MAX_ENTRIES, IMC_BATCH_MAX_ENTRIES,
+    WEIGHTS_PAGE_MAX_LIMIT, STATIC_API_MAX_AGE
+)
 
 
 api = Blueprint('api', __name__, url_prefix='/api')
 
 
+# Endpoints que no dependen del usuario de la petición
+_ANONYMOUS_ENDPOINTS = frozenset({'api.get_messages', 'api.get_config', 'api.calculate_imc_batch'})
+
+
+@api.before_request
+def _resolve_user():
+    """Identifica al usuario de la petición en g.user_id
+
+    En modo monousuario es siempre USER_ID. En modo multiusuario se lee de la
+    cabecera que añade el proxy de autenticación; sin ella (o si no es un
+    entero positivo) se responde 401 sin llegar al endpoint.
+    """
+    if not MULTI_USER_CONFIG["enabled"]:
+        g.user_id = USER_ID
+        return None
+    if request.method == 'OPTIONS' or request.endpoint in _ANONYMOUS_ENDPOINTS:
+        return None
+    try:
+        user_id = int(request.headers.get(MULTI_USER_CONFIG["user_header"], ''))
+    except ValueError:
+        user_id = 0
+    if user_id <= 0:
+        return jsonify({"error": get_error("user_id_required")}), 401
+    g.user_id = user_id
+    return None
+
+
+def _data_etag(storage):
+    """ETag derivado de la versión de los datos del usuario
+
+    Se lee antes que los datos: si una escritura llega entre medias, la
+    respuesta lleva datos nuevos con el ETag anterior y el cliente solo
+    tendrá que volver a descargarlos en la siguiente petición. Con varios
+    idiomas incluye el de la petición, ya que las descripciones cambian.
+    """
+    etag = f"v{storage.get_data_version(g.user_id)}"
+    if is_multilingual():
+        etag = f"{etag}-{get_language()}"
+    return etag
+
+
+def _not_modified(etag):
+    """Comprueba If-None-Match; devuelve la respuesta 304 o None si hay que responder"""
+    if request.if_none_match.contains_weak(etag):
+        return _with_etag(current_app.response_class(status=304), etag)
+    return None
+
+
+def _with_etag(response, etag):
+    # no-cache: el navegador guarda la respuesta pero la revalida en cada uso
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    if MULTI_USER_CONFIG["enabled"]:
+        # La misma URL devuelve datos distintos según el usuario
+        response.vary.add(MULTI_USER_CONFIG["user_header"])
+    if is_multilingual():
+        response.vary.add('Accept-Language')
+    return response
+
+
+# Formato JSON de los datos; compartido por los endpoints individuales y por
+# /api/bootstrap para que ambos devuelvan exactamente lo mismo
+
+def _user_payload(user):
+    return {
+        "nombre": user.first_name,
+        "apellidos": user.last_name,
+        "fecha_nacimiento": user.birth_date.isoformat(),
+        "talla_m": user.height_m
+    }
+
+
+def _weight_payload(entry):
+    return {
+        "id": entry.entry_id,
+        "peso_kg": entry.weight_kg,
+        "fecha_registro": entry.recorded_date_iso
+    }
+
+
+def _imc_payload(user, last_weight):
+    """IMC del último peso; devuelve el contenido y el código de estado"""
+    if not last_weight:
+        return {"imc": 0, "description": get_text("no_weight_records")}, 200
+
+    # Validación defensiva: verificar que los datos estén dentro de los límites
+    # antes de calcular el IMC (protege contra datos antiguos o corruptos)
+    if not (VALIDATION_LIMITS["weight_min"] <= last_weight.weight_kg <= VALIDATION_LIMITS["weight_max"]):
+        return {"error": get_error("weight_out_of_range")}, 400
+    if not (VALIDATION_LIMITS["height_min"] <= user.height_m <= VALIDATION_LIMITS["height_max"]):
+        return {"error": get_error("height_out_of_range")}, 400
+
+    bmi = calculate_bmi(last_weight.weight_kg, user.height_m)
+    description = get_bmi_description(bmi)
+    return {"imc": bmi, "description": description}, 200
+
+
+def _stats_payload(weight_count, max_weight, min_weight):
+    return {
+        "num_pesajes": weight_count or 0,
+        "peso_max": max_weight or 0,
+        "peso_min": min_weight or 0
+    }
+
+
+def _config_payload():
+    # Convertir fecha a string ISO para JSON
+    return {
+        "validation_limits": {
+            "height_min": VALIDATION_LIMITS["height_min"],
+            "height_max": VALIDATION_LIMITS["height_max"],
+            "weight_min": VALIDATION_LIMITS["weight_min"],
+            "weight_max": VALIDATION_LIMITS["weight_max"],
+            "birth_date_min": VALIDATION_LIMITS["birth_date_min"].isoformat(),
+            "weight_variation_per_day": VALIDATION_LIMITS["weight_variation_per_day"]
+        }
+    }
+
+
 @api.route('/user', methods=['GET'])
 def get_user():
     storage = current_app.storage
-    user = storage.get_user(USER_ID)
+    etag = _data_etag(storage)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    user = storage.get_user(g.user_id)
     if not user:
         return jsonify({"error": get_error("user_not_found")}), 404
-    return jsonify({
-        "nombre": user.first_name,
-        "apellidos": user.last_name,
-        "fecha_nacimiento": user.birth_date.isoformat(),
-        "talla_m": user.height_m
-    })
+    return _with_etag(jsonify(_user_payload(user)), etag)
 
 
 @api.route('/user', methods=['POST'])
@@ -51,7 +184,7 @@ def create_or_update_user():
         return jsonify({"error": get_error("birth_date_out_of_range")}), 400
 
     user = UserData(
-        user_id=USER_ID,
+        user_id=g.user_id,
         first_name=data['nombre'],
         last_name=data['apellidos'],
         birth_date=birth_date,
@@ -67,7 +200,7 @@ def add_weight():
     storage = current_app.storage
     data = request.json or {}
     
-    user = storage.get_user(USER_ID)
+    user = storage.get_user(g.user_id)
     if not user:
         return jsonify({"error": get_error("user_must_be_configured")}), 400
 
@@ -82,7 +215,7 @@ def add_weight():
     
     # Obtener el último peso de un día diferente para validar variación
     # Si hay múltiples entradas del mismo día, se reemplazarán
-    last_weight_different_date = storage.get_last_weight_entry_from_different_date(USER_ID, current_date)
+    last_weight_different_date = storage.get_last_weight_entry_from_different_date(g.user_id, current_date)
     
     if last_weight_different_date:
         last_registration_date = last_weight_different_date.recorded_date.date()
@@ -104,7 +237,7 @@ def add_weight():
 
     new_weight = WeightEntryData(
         entry_id=0,
-        user_id=USER_ID,
+        user_id=g.user_id,
         weight_kg=weight_kg,
         recorded_date=datetime.now()
     )
@@ -113,95 +246,542 @@ def add_weight():
     return jsonify({"message": get_message("weight_registered")}), 201
 
 
+def _read_bulk_items():
+    """Lee los registros de una carga masiva: array JSON, {"weights": [...]} o NDJSON"""
+    if request.mimetype == 'application/x-ndjson':
+        try:
+            return [current_app.json.loads(line) for line in request.get_data(as_text=True).splitlines() if line.strip()]
+        except ValueError:
+            return None
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('weights')
+    return data if isinstance(data, list) else None
+
+
+def _variation_error(weight_kg, day, reference):
+    """Resultado de error si weight_kg supera la variación diaria respecto a reference (fecha, peso)"""
+    days_elapsed = abs((day - reference[0]).days)
+    max_allowed_difference = days_elapsed * VALIDATION_LIMITS["weight_variation_per_day"]
+    weight_difference = abs(weight_kg - reference[1])
+    if weight_difference <= max_allowed_difference:
+        return None
+    return {
+        "status": "error",
+        "error": get_error("weight_variation_exceeded",
+                           days_text=get_days_text(days_elapsed),
+                           max_allowed_difference=max_allowed_difference,
+                           weight_difference=weight_difference)
+    }
+
+
+@api.route('/weights/bulk', methods=['POST'])
+def add_weights_bulk():
+    """Registra varios pesos con fecha en una sola petición
+
+    Los registros se ordenan una vez por fecha y la regla de variación diaria
+    se aplica en una sola pasada, comparando cada registro con el peso más
+    reciente de un día anterior (aceptado en el lote o ya guardado) y con el
+    primer peso guardado de un día posterior, de modo que rellenar días
+    antiguos no salta la validación. Si hay varios registros del mismo día,
+    prevalece el último. Devuelve un resultado por registro, en el orden recibido.
+    """
+    storage = current_app.storage
+
+    user = storage.get_user(g.user_id)
+    if not user:
+        return jsonify({"error": get_error("user_must_be_configured")}), 400
+
+    items = _read_bulk_items()
+    if items is None:
+        return jsonify({"error": get_error("invalid_bulk_payload")}), 400
+    if len(items) > BULK_MAX_ENTRIES:
+        return jsonify({"error": get_error("too_many_entries", max_entries=BULK_MAX_ENTRIES)}), 400
+
+    results = [None] * len(items)
+    parsed = []  # (recorded_date, weight_kg, index)
+    today = date.today()
+    for index, item in enumerate(items):
+        try:
+            weight_kg = float(item['peso_kg'])
+        except Exception:
+            results[index] = {"status": "error", "error": get_error("invalid_weight")}
+            continue
+        if not (VALIDATION_LIMITS["weight_min"] <= weight_kg <= VALIDATION_LIMITS["weight_max"]):
+            results[index] = {"status": "error", "error": get_error("weight_out_of_range")}
+            continue
+        try:
+            recorded_date = parse_recorded_date(item['fecha_registro'])
+        except Exception:
+            recorded_date = None
+        if recorded_date is None or recorded_date.date() > today:
+            results[index] = {"status": "error", "error": get_error("invalid_recorded_date")}
+            continue
+        parsed.append((recorded_date, weight_kg, index))
+
+    parsed.sort(key=lambda item: item[0])
+
+    # Pesos guardados de referencia, en orden cronológico: el último de un día
+    # anterior al primer registro y todos los posteriores
+    stored = []  # (fecha, peso)
+    if parsed:
+        first_day_start = datetime.combine(parsed[0][0].date(), datetime.min.time())
+        later = storage.get_weight_entries_range(g.user_id, start=first_day_start)
+        earlier = storage.get_weight_entries_range(g.user_id, end=first_day_start, limit=1)
+        stored = [(entry.recorded_date.date(), entry.weight_kg) for entry in reversed(later + earlier)]
+    stored_position = 0  # pesos guardados de días anteriores al registro actual
+
+    previous_day_entry = None  # (fecha, peso) del último aceptado de un día anterior
+    accepted = []  # (WeightEntryData, index)
+    current_day = None
+    current_day_entry = None
+    current_day_position = None
+    for recorded_date, weight_kg, index in parsed:
+        day = recorded_date.date()
+        if day != current_day:
+            if current_day_entry is not None:
+                previous_day_entry = current_day_entry
+            current_day = day
+            current_day_entry = None
+            current_day_position = None
+            while stored_position < len(stored) and stored[stored_position][0] < day:
+                stored_position += 1
+
+        # Anterior: el más reciente entre el último aceptado del lote y el último
+        # guardado (si son del mismo día prevalece el del lote, que lo reemplaza).
+        # Siguiente: el primer peso guardado de un día posterior.
+        references = []
+        previous = previous_day_entry
+        if stored_position and (previous is None or stored[stored_position - 1][0] > previous[0]):
+            previous = stored[stored_position - 1]
+        if previous is not None:
+            references.append(previous)
+        next_position = stored_position
+        if next_position < len(stored) and stored[next_position][0] == day:
+            next_position += 1
+        if next_position < len(stored):
+            references.append(stored[next_position])
+
+        error = None
+        for reference in references:
+            error = _variation_error(weight_kg, day, reference)
+            if error is not None:
+                break
+        if error is not None:
+            results[index] = error
+            continue
+
+        if current_day_position is not None:
+            # Un registro posterior del mismo día reemplaza al anterior
+            _, replaced_index = accepted[current_day_position]
+            results[replaced_index] = {"status": "replaced"}
+            accepted[current_day_position] = None
+        current_day_entry = (day, weight_kg)
+        current_day_position = len(accepted)
+        accepted.append((WeightEntryData(entry_id=0, user_id=g.user_id, weight_kg=weight_kg,
+                                         recorded_date=recorded_date), index))
+
+    accepted = [item for item in accepted if item is not None]
+    storage.add_weight_entries([entry for entry, _ in accepted])
+    for entry, index in accepted:
+        results[index] = {"status": "created", "id": entry.entry_id}
+
+    return jsonify({
+        "created": len(accepted),
+        "results": results
+    }), 200
+
+
 @api.route('/imc', methods=['GET'])
 def get_current_imc():
     storage = current_app.storage
+    etag = _data_etag(storage)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
     
-    user = storage.get_user(USER_ID)
+    user = storage.get_user(g.user_id)
     if not user:
         return jsonify({"error": get_error("user_not_configured")}), 404
 
-    last_weight = storage.get_last_weight_entry(USER_ID)
-    if not last_weight:
-        return jsonify({"imc": 0, "description": get_text("no_weight_records")}), 200
+    payload, status = _imc_payload(user, storage.get_last_weight_entry(g.user_id))
+    if status != 200:
+        return jsonify(payload), status
+    return _with_etag(jsonify(payload), etag)
 
-    # Validación defensiva: verificar que los datos estén dentro de los límites
-    # antes de calcular el IMC (protege contra datos antiguos o corruptos)
-    if not (VALIDATION_LIMITS["weight_min"] <= last_weight.weight_kg <= VALIDATION_LIMITS["weight_max"]):
-        return jsonify({"error": get_error("weight_out_of_range")}), 400
+
+@api.route('/imc/history', methods=['GET'])
+def get_imc_history():
+    """IMC y clasificación de cada pesaje del historial, en columnas
+
+    Los pesos fuera de los límites de validación (datos antiguos o corruptos)
+    aparecen con imc y categoria nulos, como la validación defensiva de /api/imc.
+    """
+    # NumPy y la analítica se cargan en la primera petición que los usa
+    import numpy as np
+    from .analytics import iso_dates
+
+    storage = current_app.storage
+    etag = _data_etag(storage)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    user = storage.get_user(g.user_id)
+    if not user:
+        return jsonify({"error": get_error("user_not_configured")}), 404
     if not (VALIDATION_LIMITS["height_min"] <= user.height_m <= VALIDATION_LIMITS["height_max"]):
         return jsonify({"error": get_error("height_out_of_range")}), 400
 
-    bmi = calculate_bmi(last_weight.weight_kg, user.height_m)
-    description = get_bmi_description(bmi)
-    return jsonify({"imc": bmi, "description": description})
+    timestamps, weights = storage.get_weight_series(g.user_id)
+    weights = np.frombuffer(weights, dtype=np.float64)
+    bmi = calculate_bmi_array(weights, user.height_m)
+    categories = bmi_category_labels()[classify_bmi_array(bmi)]
+    bmi = bmi.astype(object)
+
+    invalid = (weights < VALIDATION_LIMITS["weight_min"]) | (weights > VALIDATION_LIMITS["weight_max"])
+    if invalid.any():
+        bmi[invalid] = None
+        categories[invalid] = None
+
+    days = np.frombuffer(timestamps, dtype=np.int64) // MICROSECONDS_PER_DAY
+    return _with_etag(jsonify({
+        "talla_m": user.height_m,
+        "fechas": iso_dates(days),
+        "peso_kg": weights.tolist(),
+        "imc": bmi.tolist(),
+        "categoria": categories.tolist()
+    }), etag)
+
+
+def _float_column(values):
+    """Convierte una columna de la petición a float64
+
+    Los valores que no son números quedan como NaN. La conversión de toda la
+    lista de una vez es el caso habitual; solo si falla se convierte valor a valor.
+    """
+    import numpy as np
+    try:
+        column = np.array(values, dtype=np.float64)
+        if column.ndim == 1:
+            return column
+    except (TypeError, ValueError):
+        pass
+    column = np.empty(len(values))
+    for index, value in enumerate(values):
+        try:
+            column[index] = float(value)
+        except (TypeError, ValueError):
+            column[index] = np.nan
+    return column
+
+
+def _imc_batch_payload(weights, heights):
+    """IMC, clasificación y error de cada medición, en columnas
+
+    Las mediciones no válidas tienen imc y categoria nulos y el motivo en
+    error; si fallan peso y talla se indica el error del peso.
+    """
+    import numpy as np
+    bmi = calculate_bmi_array(weights, heights)
+    categories = bmi_category_labels()[classify_bmi_array(bmi)]
+    errors = np.full(len(bmi), None, dtype=object)
+    # De menor a mayor prioridad: cada asignación sobrescribe a las anteriores
+    errors[~((VALIDATION_LIMITS["height_min"] <= heights) & (heights <= VALIDATION_LIMITS["height_max"]))] = \
+        get_error("height_out_of_range")
+    errors[np.isnan(heights)] = get_error("invalid_height")
+    errors[~((VALIDATION_LIMITS["weight_min"] <= weights) & (weights <= VALIDATION_LIMITS["weight_max"]))] = \
+        get_error("weight_out_of_range")
+    errors[np.isnan(weights)] = get_error("invalid_weight")
+
+    bmi = bmi.astype(object)
+    invalid = errors.astype(bool)
+    bmi[invalid] = None
+    categories[invalid] = None
+    return {
+        "imc": bmi.tolist(),
+        "categoria": categories.tolist(),
+        "error": errors.tolist()
+    }
+
+
+@api.route('/imc/batch', methods=['POST'])
+def calculate_imc_batch():
+    """Calcula el IMC de muchas mediciones en una petición
+
+    Recibe {"peso_kg": [...], "talla_m": [...]} y devuelve las columnas imc,
+    categoria y error en el mismo orden. No lee ni guarda datos del usuario.
+    """
+    data = request.get_json(silent=True)
+    weights = data.get('peso_kg') if isinstance(data, dict) else None
+    heights = data.get('talla_m') if isinstance(data, dict) else None
+    if not isinstance(weights, list) or not isinstance(heights, list) or len(weights) != len(heights):
+        return jsonify({"error": get_error("invalid_imc_batch_payload")}), 400
+    if len(weights) > IMC_BATCH_MAX_ENTRIES:
+        return jsonify({"error": get_error("too_many_entries", max_entries=IMC_BATCH_MAX_ENTRIES)}), 400
+
+    return jsonify(_imc_batch_payload(_float_column(weights), _float_column(heights))), 200
 
 
 @api.route('/stats', methods=['GET'])
 def get_stats():
     storage = current_app.storage
+    etag = _data_etag(storage)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
     
-    weight_count = storage.get_weight_count(USER_ID)
-    max_weight = storage.get_max_weight(USER_ID)
-    min_weight = storage.get_min_weight(USER_ID)
-    
-    return jsonify({
-        "num_pesajes": weight_count or 0,
-        "peso_max": max_weight or 0,
-        "peso_min": min_weight or 0
-    })
+    return _with_etag(jsonify(_stats_payload(
+        storage.get_weight_count(g.user_id),
+        storage.get_max_weight(g.user_id),
+        storage.get_min_weight(g.user_id)
+    )), etag)
+
+
+@api.route('/analytics', methods=['GET'])
+def get_analytics():
+    """Medias móviles, tendencia (kg/semana) y medias semanales y mensuales del historial"""
+    storage = current_app.storage
+    etag = _data_etag(storage)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+
+    if not storage.get_user(g.user_id):
+        return jsonify({"error": get_error("user_not_configured")}), 404
+
+    return _with_etag(jsonify(current_app.analytics_cache.get(storage, g.user_id)), etag)
+
+
+def _encode_cursor(recorded_date):
+    """Cursor opaco: fecha del último registro devuelto"""
+    value = str(datetime_to_micros(recorded_date)).encode('ascii')
+    return base64.urlsafe_b64encode(value).decode('ascii')
+
+
+def _decode_cursor(cursor):
+    try:
+        return micros_to_datetime(int(base64.urlsafe_b64decode(cursor.encode('ascii'))))
+    except (ValueError, binascii.Error, OverflowError, UnicodeError):
+        return None
 
 
 @api.route('/weights', methods=['GET'])
 def get_all_weights():
-    """Obtiene todos los registros de peso del usuario"""
+    """Obtiene los registros de peso del usuario, del más reciente al más antiguo
+
+    Parámetros opcionales: from/to (AAAA-MM-DD, ambos incluidos) acotan el
+    rango de fechas; limit fija el tamaño de página y cursor (el next_cursor
+    de la página anterior) continúa donde terminó. Sin parámetros devuelve
+    todos los registros.
+    """
     storage = current_app.storage
+    etag = _data_etag(storage)
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
     
-    user = storage.get_user(USER_ID)
+    user = storage.get_user(g.user_id)
     if not user:
         return jsonify({"error": get_error("user_not_configured")}), 404
     
-    # Obtener todas las entradas de peso
-    all_entries = storage.get_all_weight_entries(USER_ID)
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not (1 <= limit <= WEIGHTS_PAGE_MAX_LIMIT):
+            return jsonify({"error": get_error("invalid_page_limit", max_limit=WEIGHTS_PAGE_MAX_LIMIT)}), 400
     
-    # Convertir a formato JSON
-    weights_data = [
-        {
-            "id": entry.entry_id,
-            "peso_kg": entry.weight_kg,
-            "fecha_registro": entry.recorded_date.isoformat()
-        }
-        for entry in all_entries
-    ]
+    try:
+        date_from = request.args.get('from')
+        start = datetime.combine(date.fromisoformat(date_from), datetime.min.time()) if date_from else None
+        date_to = request.args.get('to')
+        end = datetime.combine(date.fromisoformat(date_to) + timedelta(days=1), datetime.min.time()) if date_to else None
+    except (ValueError, OverflowError):
+        return jsonify({"error": get_error("invalid_date_range")}), 400
+    
+    cursor = request.args.get('cursor')
+    if cursor:
+        cursor_date = _decode_cursor(cursor)
+        if cursor_date is None:
+            return jsonify({"error": get_error("invalid_cursor")}), 400
+        end = cursor_date if end is None else min(end, cursor_date)
+    
+    # Se pide un registro más de los necesarios para saber si hay otra página
+    entries = storage.get_weight_entries_range(
+        g.user_id, start, end, None if limit is None else limit + 1
+    )
+    next_cursor = None
+    if limit is not None and len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = _encode_cursor(entries[-1].recorded_date)
+    
+    return _with_etag(jsonify({
+        "weights": [_weight_payload(entry) for entry in entries],
+        "next_cursor": next_cursor
+    }), etag)
+
+
+@api.route('/weights/changes', methods=['GET'])
+def get_weight_changes():
+    """Obtiene los registros de peso añadidos o reemplazados desde una versión
+
+    since es la versión devuelta por la sincronización anterior. Si el
+    registro de cambios ya no llega hasta ella, resync_required indica que el
+    cliente debe descargar /api/weights completo; en ambos casos version es la
+    versión que debe enviar en la siguiente petición.
+    """
+    storage = current_app.storage
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"error": get_error("invalid_since")}), 400
+    
+    user = storage.get_user(g.user_id)
+    if not user:
+        return jsonify({"error": get_error("user_not_configured")}), 404
+    
+    # La versión se lee antes que los cambios: una escritura concurrente se
+    # reenviará en la siguiente petición en lugar de perderse
+    version = storage.get_data_version(g.user_id)
+    changes = storage.get_weight_changes(g.user_id, since) if since > 0 else None
     
     return jsonify({
-        "weights": weights_data
+        "version": version,
+        "resync_required": changes is None,
+        "changes": [_weight_payload(entry) for entry in changes or []]
     })
 
 
+# Formatos de exportación: tipo MIME y extensión del fichero
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv", "csv"),
+}
+EXPORT_CHUNK_SIZE = 500
+
+
+def _export_ndjson(chunks):
+    dumps = current_app.json.dumps
+    for chunk in chunks:
+        yield ''.join(dumps(_weight_payload(entry)) + '\n' for entry in chunk)
+
+
+def _export_csv(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(["id", "peso_kg", "fecha_registro"])
+    yield buffer.getvalue()
+    for chunk in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (entry.entry_id, entry.weight_kg, entry.recorded_date_iso)
+            for entry in chunk
+        )
+        yield buffer.getvalue()
+
+
+@api.route('/weights/export', methods=['GET'])
+def export_weights():
+    """Exporta el historial de peso en NDJSON o CSV, en orden cronológico
+
+    La respuesta se genera en streaming: el historial se lee del storage por
+    bloques y cada bloque se envía en cuanto se serializa, de modo que la
+    memoria usada no depende del tamaño del historial.
+    """
+    storage = current_app.storage
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({"error": get_error("invalid_export_format")}), 400
+
+    user = storage.get_user(g.user_id)
+    if not user:
+        return jsonify({"error": get_error("user_not_configured")}), 404
+
+    mimetype, extension = EXPORT_FORMATS[export_format]
+    serialize = _export_csv if export_format == 'csv' else _export_ndjson
+    chunks = storage.iter_weight_entries(g.user_id, EXPORT_CHUNK_SIZE)
+    return Response(
+        stream_with_context(serialize(chunks)),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=pesos.{extension}"}
+    )
+
+
+# Mensajes y configuración no cambian mientras el proceso está en marcha: se
+# serializan y comprimen una vez, la configuración al importar el módulo (al
+# crear la aplicación) y los mensajes la primera vez que se piden en cada idioma
+_MESSAGES_RESPONSES = {}  # {idioma: PrecomputedResponse}
+_CONFIG_RESPONSE = PrecomputedResponse(_config_payload(), STATIC_API_MAX_AGE)
+
+
+def _messages_response():
+    """Mensajes del frontend precalculados en el idioma de la petición"""
+    language = get_language()
+    precomputed = _MESSAGES_RESPONSES.get(language)
+    if precomputed is None:
+        precomputed = _MESSAGES_RESPONSES.setdefault(
+            language, PrecomputedResponse(get_frontend_messages(), STATIC_API_MAX_AGE)
+        )
+    return precomputed
+
+
 @api.route('/messages', methods=['GET'])
 def get_messages():
-    """Endpoint que devuelve todos los mensajes para el frontend"""
-    return jsonify(get_frontend_messages())
+    """Endpoint que devuelve todos los mensajes para el frontend, en el idioma de la petición"""
+    response = _messages_response().make_response()
+    if is_multilingual():
+        response.vary.add('Accept-Language')
+    return response
 
 
 @api.route('/config', methods=['GET'])
 def get_config():
     """Endpoint que devuelve las constantes de validación y configuración para el frontend"""
-    from .config import VALIDATION_LIMITS
+    return _CONFIG_RESPONSE.make_response()
+
+
+@api.route('/bootstrap', methods=['GET'])
+def get_bootstrap():
+    """Devuelve todo lo necesario para la carga inicial de la página en una respuesta
+
+    Incluye usuario, IMC, estadísticas, pesos, configuración y mensajes. Los
+    datos del usuario salen de una única lectura consistente del storage.
+    Con since (versión de la sincronización anterior) weights solo contiene
+    los cambios posteriores, como /api/weights/changes, salvo que
+    resync_required indique que contiene el historial completo.
+    """
+    storage = current_app.storage
+    try:
+        since = int(request.args.get('since', 0))
+    except ValueError:
+        return jsonify({"error": get_error("invalid_since")}), 400
     
-    # Convertir fecha a string ISO para JSON
-    config = {
-        "validation_limits": {
-            "height_min": VALIDATION_LIMITS["height_min"],
-            "height_max": VALIDATION_LIMITS["height_max"],
-            "weight_min": VALIDATION_LIMITS["weight_min"],
-            "weight_max": VALIDATION_LIMITS["weight_max"],
-            "birth_date_min": VALIDATION_LIMITS["birth_date_min"].isoformat(),
-            "weight_variation_per_day": VALIDATION_LIMITS["weight_variation_per_day"]
-        }
-    }
+    # La versión de los datos sobrevive a los reinicios (sqlite), pero la
+    # configuración y los mensajes pueden cambiar en un despliegue
+    messages = _messages_response()
+    etag = f"{_data_etag(storage)}-{_CONFIG_RESPONSE.digest[:12]}{messages.digest[:12]}"
+    not_modified = _not_modified(etag)
+    if not_modified:
+        return not_modified
+    
+    snapshot = storage.get_user_snapshot(g.user_id, since if since > 0 else None)
+    user = snapshot.user
+    imc = _imc_payload(user, snapshot.last_weight_entry)[0] if user else None
     
-    return jsonify(config)
+    return _with_etag(jsonify({
+        "user": _user_payload(user) if user else None,
+        "imc": imc,
+        "stats": _stats_payload(snapshot.weight_count, snapshot.max_weight, snapshot.min_weight),
+        "weights": [_weight_payload(entry) for entry in snapshot.weight_entries] if user else [],
+        "version": snapshot.data_version,
+        "resync_required": not snapshot.weight_changes_only,
+        "config": _config_payload(),
+        "messages": get_frontend_messages()
+    }), etag)
 
 
@@ -0,0 +1,23 @@
+"""
+Reglas de URL con construcción diferida
+Werkzeug compila al registrar cada regla dos funciones para construir URLs
+(url_for), aunque la aplicación casi nunca las usa. LazyBuilderRule las
+compila la primera vez que se construye una URL de la regla, de modo que
+registrar las rutas de la API no cuesta en el arranque.
+"""
+from werkzeug.routing import Rule
+
+
+class LazyBuilderRule(Rule):
+    """Rule que compila sus funciones de construcción en el primer uso"""
+
+    def _compile_builder(self, append_unknown: bool = True):
+        compiled = None
+
+        def build(rule, *args, **kwargs):
+            nonlocal compiled
+            if compiled is None:
+                compiled = Rule._compile_builder(rule, append_unknown)
+            return compiled(rule, *args, **kwargs)
+
+        return build
@@ -0,0 +1,188 @@
+"""
+Snapshot binario de MemoryStorage
+Formato versionado de ancho fijo que se lee a través de un fichero mapeado en
+memoria: el tramo de cada columna de un usuario se copia una sola vez
+(memcpy) del fichero a los array de su historial, sin analizar ni crear un
+objeto por entrada.
+
+Formato (little-endian, versión 1):
+
+- Cabecera (HEADER): magic, versión, reservado, secuencia del diario incluida
+  (0 si no aplica), siguiente entry_id, número de usuarios, número de
+  entradas y tamaño de la zona de cadenas.
+- Usuarios: un registro de ancho fijo (USER_RECORD) por usuario con su
+  user_id, la posición y longitud de su bloque de entradas, la posición de
+  nombre y apellidos en la zona de cadenas, la fecha de nacimiento en días
+  desde EPOCH, la talla y si tiene datos personales.
+- Cadenas: nombres y apellidos en UTF-8, rellenados hasta múltiplo de 8.
+- Columnas: fechas (int64, microsegundos desde EPOCH), pesos (float64),
+  entry_id (int64) y pesos ordenados (float64), con entry_count valores cada
+  una. Las entradas de cada usuario ocupan un bloque contiguo, ordenado por
+  fecha, en las cuatro columnas.
+"""
+import mmap
+import os
+import struct
+import sys
+from array import array
+from datetime import date
+from typing import Optional
+
+from .storage import UserData
+
+
+SNAPSHOT_MAGIC = b'PESOSNAP'
+SNAPSHOT_VERSION = 1
+
+HEADER = struct.Struct('<8sIIQQQQQ')
+USER_RECORD = struct.Struct('<qQQQIIiId')
+
+_HAS_USER = 1
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+# Tipo y tamaño de cada columna, en el orden en que se guardan
+_COLUMN_TYPES = ('q', 'd', 'q', 'd')
+_ITEM_SIZE = 8
+
+
+class SnapshotBlock:
+    """Datos de un usuario en el snapshot: sus datos personales (o None) y sus columnas"""
+
+    __slots__ = ('user_id', 'user', 'timestamps', 'weights', 'entry_ids', 'sorted_weights')
+
+    def __init__(self, user_id: int, user: Optional[UserData], timestamps: array,
+                 weights: array, entry_ids: array, sorted_weights: array):
+        self.user_id = user_id
+        self.user = user
+        self.timestamps = timestamps
+        self.weights = weights
+        self.entry_ids = entry_ids
+        self.sorted_weights = sorted_weights
+
+
+class Snapshot:
+    """Contenido de un snapshot leído con read_snapshot"""
+
+    __slots__ = ('sequence', 'next_entry_id', 'blocks')
+
+    def __init__(self, sequence: int, next_entry_id: int, blocks: list):
+        self.sequence = sequence
+        self.next_entry_id = next_entry_id
+        self.blocks = blocks
+
+
+def _padding(size: int) -> int:
+    return -size % _ITEM_SIZE
+
+
+def _to_little_endian(column: array) -> array:
+    if sys.byteorder == 'little':
+        return column
+    swapped = column[:]
+    swapped.byteswap()
+    return swapped
+
+
+def write_snapshot(path: str, blocks: list, next_entry_id: int, sequence: int = 0) -> None:
+    """Guarda los bloques en path de forma atómica (fichero temporal, fsync y rename)"""
+    records = []
+    strings = bytearray()
+    columns = [array(typecode) for typecode in _COLUMN_TYPES]
+    for block in blocks:
+        user = block.user
+        first_name = user.first_name.encode('utf-8') if user else b''
+        last_name = user.last_name.encode('utf-8') if user else b''
+        records.append(USER_RECORD.pack(
+            block.user_id,
+            len(columns[0]),
+            len(block.timestamps),
+            len(strings),
+            len(first_name),
+            len(last_name),
+            user.birth_date.toordinal() - _EPOCH_ORDINAL if user else 0,
+            _HAS_USER if user else 0,
+            user.height_m if user else 0.0,
+        ))
+        strings += first_name
+        strings += last_name
+        for column, values in zip(columns, (block.timestamps, block.weights,
+                                            block.entry_ids, block.sorted_weights)):
+            column.extend(values)
+    strings_size = len(strings)
+    strings += bytes(_padding(strings_size))
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, sequence, next_entry_id,
+                            len(records), len(columns[0]), strings_size))
+        f.write(b''.join(records))
+        f.write(strings)
+        for column in columns:
+            _to_little_endian(column).tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def _read_column(view: memoryview, typecode: str, offset: int, count: int) -> array:
+    column = array(typecode)
+    column.frombytes(view[offset:offset + count * _ITEM_SIZE])
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column
+
+
+def _read_blocks(view: memoryview) -> Snapshot:
+    if len(view) < HEADER.size:
+        raise ValueError("Snapshot incompleto")
+    (magic, version, _, sequence, next_entry_id,
+     user_count, entry_count, strings_size) = HEADER.unpack_from(view)
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("El fichero no es un snapshot del almacenamiento")
+    if version != SNAPSHOT_VERSION:
+        raise ValueError(f"Versión de snapshot no soportada: {version}")
+
+    users_offset = HEADER.size
+    strings_offset = users_offset + user_count * USER_RECORD.size
+    columns_offset = strings_offset + strings_size + _padding(strings_size)
+    column_size = entry_count * _ITEM_SIZE
+    if len(view) != columns_offset + column_size * len(_COLUMN_TYPES):
+        raise ValueError("El tamaño del snapshot no coincide con su cabecera")
+
+    strings = bytes(view[strings_offset:strings_offset + strings_size])
+    column_offsets = [(typecode, columns_offset + index * column_size)
+                      for index, typecode in enumerate(_COLUMN_TYPES)]
+    blocks = []
+    for (user_id, start, count, name_offset, first_name_size, last_name_size,
+         birth_days, flags, height_m) in USER_RECORD.iter_unpack(view[users_offset:strings_offset]):
+        if start + count > entry_count:
+            raise ValueError("Bloque de entradas fuera del snapshot")
+        user = None
+        if flags & _HAS_USER:
+            last_name_offset = name_offset + first_name_size
+            user = UserData(
+                user_id=user_id,
+                first_name=strings[name_offset:last_name_offset].decode('utf-8'),
+                last_name=strings[last_name_offset:last_name_offset + last_name_size].decode('utf-8'),
+                birth_date=date.fromordinal(birth_days + _EPOCH_ORDINAL),
+                height_m=height_m,
+            )
+        # El tramo del usuario se copia directamente del fichero mapeado a sus columnas
+        blocks.append(SnapshotBlock(user_id, user, *(
+            _read_column(view, typecode, column_offset + start * _ITEM_SIZE, count)
+            for typecode, column_offset in column_offsets
+        )))
+    return Snapshot(sequence, next_entry_id, blocks)
+
+
+def read_snapshot(path: str) -> Snapshot:
+    """Lee un snapshot guardado con write_snapshot
+
+    Lanza ValueError si el fichero no es un snapshot, es de otra versión o
+    está truncado.
+    """
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError("Snapshot incompleto")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return _read_blocks(view)
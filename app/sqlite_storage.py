@@ -0,0 +1,327 @@
+"""
+Almacenamiento persistente en SQLite
+Implementación de StorageInterface que conserva los datos entre reinicios
+"""
+import os
+import sqlite3
+import threading
+from array import array
+from datetime import datetime, date
+from typing import Optional
+
+from .storage import StorageInterface, UserData, UserSnapshot, WeightEntryData, next_data_version
+
+
+# Esquema de la base de datos
+# El índice único (user_id, day) garantiza un único registro por día y permite
+# reemplazar el registro del mismo día con una sola sentencia.
+# El índice (user_id, weight_kg) cubre las consultas de máximo y mínimo y el
+# índice (user_id, recorded_date) las consultas por rango de fechas (las fechas
+# se guardan en ISO con microsegundos, cuyo orden de texto es el cronológico).
+# version es la versión de datos de la escritura que creó el registro: como el
+# reemplazo del mismo día crea un registro nuevo, el índice (user_id, version)
+# sirve de registro de cambios sin tabla adicional.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    first_name TEXT NOT NULL,
+    last_name TEXT NOT NULL,
+    birth_date TEXT NOT NULL,
+    height_m REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS weight_entries (
+    entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    recorded_date TEXT NOT NULL,
+    weight_kg REAL NOT NULL,
+    version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS data_versions (
+    user_id INTEGER PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_weight_entries_user_day
+    ON weight_entries (user_id, day);
+CREATE INDEX IF NOT EXISTS ix_weight_entries_user_weight
+    ON weight_entries (user_id, weight_kg);
+CREATE INDEX IF NOT EXISTS ix_weight_entries_user_recorded
+    ON weight_entries (user_id, recorded_date);
+"""
+
+# Índices sobre columnas añadidas después de la primera versión del esquema;
+# se crean tras migrar las bases de datos existentes
+_SCHEMA_INDEXES = """
+CREATE INDEX IF NOT EXISTS ix_weight_entries_user_version
+    ON weight_entries (user_id, version);
+"""
+
+# Sentencias SQL (sqlite3 mantiene en caché las sentencias preparadas por texto)
+_SQL_GET_USER = (
+    "SELECT user_id, first_name, last_name, birth_date, height_m "
+    "FROM users WHERE user_id = ?"
+)
+_SQL_SAVE_USER = (
+    "INSERT INTO users (user_id, first_name, last_name, birth_date, height_m) "
+    "VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT (user_id) DO UPDATE SET first_name = excluded.first_name, "
+    "last_name = excluded.last_name, birth_date = excluded.birth_date, "
+    "height_m = excluded.height_m"
+)
+_SQL_LAST_ENTRY = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date FROM weight_entries "
+    "WHERE user_id = ? ORDER BY day DESC LIMIT 1"
+)
+_SQL_LAST_ENTRY_BEFORE_DAY = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date FROM weight_entries "
+    "WHERE user_id = ? AND day < ? ORDER BY day DESC LIMIT 1"
+)
+# INSERT OR REPLACE elimina el registro del mismo día y asigna un nuevo entry_id,
+# igual que MemoryStorage
+_SQL_UPSERT_ENTRY = (
+    "INSERT OR REPLACE INTO weight_entries (user_id, day, recorded_date, weight_kg, version) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+# La versión se actualiza en la misma transacción que la escritura; el valor
+# propuesto (next_data_version) la mantiene creciente aunque se borre la base
+_SQL_BUMP_VERSION = (
+    "INSERT INTO data_versions (user_id, version) VALUES (?, ?) "
+    "ON CONFLICT (user_id) DO UPDATE SET version = MAX(version + 1, excluded.version)"
+)
+_SQL_GET_VERSION = "SELECT version FROM data_versions WHERE user_id = ?"
+_SQL_ENTRIES_CHANGED = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date FROM weight_entries "
+    "WHERE user_id = ? AND version > ? ORDER BY day"
+)
+_SQL_COUNT = "SELECT COUNT(*) FROM weight_entries WHERE user_id = ?"
+_SQL_MAX_WEIGHT = "SELECT MAX(weight_kg) FROM weight_entries WHERE user_id = ?"
+_SQL_MIN_WEIGHT = "SELECT MIN(weight_kg) FROM weight_entries WHERE user_id = ?"
+_SQL_ALL_ENTRIES = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date FROM weight_entries "
+    "WHERE user_id = ? ORDER BY day DESC"
+)
+_SQL_ENTRIES_RANGE = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date FROM weight_entries "
+    "WHERE user_id = ? AND recorded_date >= ? AND recorded_date < ? "
+    "ORDER BY recorded_date DESC LIMIT ?"
+)
+# Fecha en microsegundos desde EPOCH calculada en SQLite (los segundos con
+# strftime y los microsegundos de la parte fraccionaria, que siempre se guarda)
+_SQL_WEIGHT_SERIES = (
+    "SELECT CAST(strftime('%s', substr(recorded_date, 1, 19)) AS INTEGER) * 1000000 "
+    "+ CAST(substr(recorded_date, 21, 6) AS INTEGER), weight_kg "
+    "FROM weight_entries WHERE user_id = ? ORDER BY day"
+)
+_SQL_ENTRIES_AFTER = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date FROM weight_entries "
+    "WHERE user_id = ? AND recorded_date > ? ORDER BY recorded_date LIMIT ?"
+)
+_SQL_ENTRIES_AFTER_DAY = (
+    "SELECT entry_id, user_id, weight_kg, recorded_date, day FROM weight_entries "
+    "WHERE user_id = ? AND day > ? ORDER BY day LIMIT ?"
+)
+
+
+def _row_to_entry(row) -> WeightEntryData:
+    # La fecha se guarda siempre con microsegundos; isoformat() los omite si son 0
+    iso = row[3]
+    if iso.endswith('.000000'):
+        iso = iso[:-7]
+    return WeightEntryData(
+        entry_id=row[0],
+        user_id=row[1],
+        weight_kg=row[2],
+        recorded_date=datetime.fromisoformat(iso),
+        recorded_date_iso=iso
+    )
+
+
+class SqliteStorage(StorageInterface):
+    """Implementación de almacenamiento en SQLite
+
+    Usa el modo WAL para que las lecturas no bloqueen a las escrituras y una
+    conexión por hilo (las conexiones de sqlite3 no se comparten entre hilos).
+    Requiere una ruta de fichero: con ':memory:' cada hilo vería su propia base
+    de datos vacía.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._path = path
+        self._local = threading.local()
+        self._connections = []
+        self._connections_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(weight_entries)")}
+        if 'version' not in columns:
+            conn.execute("ALTER TABLE weight_entries ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+        conn.executescript(_SCHEMA_INDEXES)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Devuelve la conexión del hilo actual, creándola si no existe"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self._path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Cierra todas las conexiones abiertas"""
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def get_user(self, user_id: int) -> Optional[UserData]:
+        row = self._connection().execute(_SQL_GET_USER, (user_id,)).fetchone()
+        if row is None:
+            return None
+        return UserData(
+            user_id=row[0],
+            first_name=row[1],
+            last_name=row[2],
+            birth_date=date.fromisoformat(row[3]),
+            height_m=row[4]
+        )
+
+    def save_user(self, user: UserData) -> None:
+        conn = self._connection()
+        with conn:
+            conn.execute(_SQL_SAVE_USER, (
+                user.user_id,
+                user.first_name,
+                user.last_name,
+                user.birth_date.isoformat(),
+                user.height_m
+            ))
+            self._bump_version(conn, user.user_id)
+
+    def get_data_version(self, user_id: int) -> int:
+        row = self._connection().execute(_SQL_GET_VERSION, (user_id,)).fetchone()
+        return row[0] if row else 0
+
+    def get_last_weight_entry(self, user_id: int) -> Optional[WeightEntryData]:
+        row = self._connection().execute(_SQL_LAST_ENTRY, (user_id,)).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def get_last_weight_entry_from_different_date(self, user_id: int, reference_date: date) -> Optional[WeightEntryData]:
+        """Obtiene la última entrada de peso de un día diferente a la fecha de referencia"""
+        last = self.get_last_weight_entry(user_id)
+        if last is None or last.recorded_date.date() != reference_date:
+            return last
+
+        row = self._connection().execute(
+            _SQL_LAST_ENTRY_BEFORE_DAY, (user_id, reference_date.isoformat())
+        ).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def _bump_version(self, conn: sqlite3.Connection, user_id: int) -> int:
+        """Aumenta la versión de datos del usuario dentro de la transacción en curso"""
+        conn.execute(_SQL_BUMP_VERSION, (user_id, next_data_version(0)))
+        return conn.execute(_SQL_GET_VERSION, (user_id,)).fetchone()[0]
+
+    def _upsert_entry(self, conn: sqlite3.Connection, entry: WeightEntryData) -> None:
+        cursor = conn.execute(_SQL_UPSERT_ENTRY, (
+            entry.user_id,
+            entry.recorded_date.date().isoformat(),
+            entry.recorded_date.isoformat(timespec='microseconds'),
+            entry.weight_kg,
+            self._bump_version(conn, entry.user_id)
+        ))
+        entry.entry_id = cursor.lastrowid
+
+    def add_weight_entry(self, entry: WeightEntryData) -> None:
+        conn = self._connection()
+        with conn:
+            self._upsert_entry(conn, entry)
+
+    def add_weight_entries(self, entries: list) -> None:
+        """Añade el lote completo en una única transacción"""
+        conn = self._connection()
+        with conn:
+            for entry in entries:
+                self._upsert_entry(conn, entry)
+
+    def get_weight_count(self, user_id: int) -> int:
+        return self._connection().execute(_SQL_COUNT, (user_id,)).fetchone()[0]
+
+    def get_max_weight(self, user_id: int) -> Optional[float]:
+        return self._connection().execute(_SQL_MAX_WEIGHT, (user_id,)).fetchone()[0]
+
+    def get_min_weight(self, user_id: int) -> Optional[float]:
+        return self._connection().execute(_SQL_MIN_WEIGHT, (user_id,)).fetchone()[0]
+
+    def get_all_weight_entries(self, user_id: int) -> list:
+        """Obtiene todas las entradas de peso de un usuario, ordenadas por fecha descendente"""
+        rows = self._connection().execute(_SQL_ALL_ENTRIES, (user_id,)).fetchall()
+        return [_row_to_entry(row) for row in rows]
+
+    def get_weight_entries_range(self, user_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> list:
+        """Consulta la ventana pedida sobre el índice (user_id, recorded_date)"""
+        # Los límites abiertos se sustituyen por valores fuera de cualquier fecha ISO
+        rows = self._connection().execute(_SQL_ENTRIES_RANGE, (
+            user_id,
+            '' if start is None else start.isoformat(timespec='microseconds'),
+            '~' if end is None else end.isoformat(timespec='microseconds'),
+            -1 if limit is None else limit
+        )).fetchall()
+        return [_row_to_entry(row) for row in rows]
+
+    def get_weight_entries_after(self, user_id: int, after: Optional[datetime],
+                                 limit: int) -> list:
+        """Consulta el bloque siguiente sobre el índice (user_id, recorded_date)"""
+        rows = self._connection().execute(_SQL_ENTRIES_AFTER, (
+            user_id,
+            '' if after is None else after.isoformat(timespec='microseconds'),
+            limit
+        )).fetchall()
+        return [_row_to_entry(row) for row in rows]
+
+    def get_weight_changes(self, user_id: int, since: int) -> Optional[list]:
+        """Obtiene los registros escritos con una versión posterior a since
+
+        Los registros reemplazados se eliminan, así que cada día modificado
+        aparece con su estado actual y el registro de cambios no se compacta.
+        """
+        rows = self._connection().execute(_SQL_ENTRIES_CHANGED, (user_id, since)).fetchall()
+        return [_row_to_entry(row) for row in rows]
+
+    def get_weight_series(self, user_id: int) -> tuple:
+        rows = self._connection().execute(_SQL_WEIGHT_SERIES, (user_id,)).fetchall()
+        return array('q', [row[0] for row in rows]), array('d', [row[1] for row in rows])
+
+    def get_user_snapshot(self, user_id: int, since: Optional[int] = None) -> UserSnapshot:
+        """Hace las consultas individuales dentro de una transacción de lectura
+
+        En modo WAL todas las consultas de la transacción ven la misma
+        instantánea de la base de datos aunque otro proceso escriba entre medias.
+        """
+        conn = self._connection()
+        conn.execute("BEGIN")
+        try:
+            return super().get_user_snapshot(user_id, since)
+        finally:
+            conn.rollback()
+
+    def iter_weight_entries(self, user_id: int, chunk_size: int = 500):
+        """Recorre las entradas por bloques, paginando por día sobre el índice (user_id, day)"""
+        day = ''
+        while True:
+            rows = self._connection().execute(
+                _SQL_ENTRIES_AFTER_DAY, (user_id, day, chunk_size)
+            ).fetchall()
+            if not rows:
+                return
+            day = rows[-1][4]
+            yield [_row_to_entry(row) for row in rows]
@@ -16,6 +16,21 @@ const DEFAULT_VALIDATION_LIMITS = {
 // Configuración actual (se actualiza desde el backend)
 let VALIDATION_LIMITS = { ...DEFAULT_VALIDATION_LIMITS };
 
+/**
+ * Aplica la configuración recibida del backend (/api/config o /api/bootstrap)
+ * @param {object} config - Configuración en formato del backend
+ */
+function applyConfig(config) {
+    VALIDATION_LIMITS = {
+        height_min: config.validation_limits.height_min,
+        height_max: config.validation_limits.height_max,
+        weight_min: config.validation_limits.weight_min,
+        weight_max: config.validation_limits.weight_max,
+        birth_date_min: config.validation_limits.birth_date_min,
+        weight_variation_per_day: config.validation_limits.weight_variation_per_day
+    };
+}
+
 /**
  * Carga la configuración desde el backend
  * @returns {Promise<boolean>} true si se cargó exitosamente
@@ -24,15 +39,7 @@ async function loadConfigFromBackend() {
     try {
         const response = await fetch('/api/config');
         if (response.ok) {
-            const config = await response.json();
-            VALIDATION_LIMITS = {
-                height_min: config.validation_limits.height_min,
-                height_max: config.validation_limits.height_max,
-                weight_min: config.validation_limits.weight_min,
-                weight_max: config.validation_limits.weight_max,
-                birth_date_min: config.validation_limits.birth_date_min,
-                weight_variation_per_day: config.validation_limits.weight_variation_per_day
-            };
+            applyConfig(await response.json());
             return true;
         }
     } catch (error) {
@@ -90,14 +97,8 @@ function getMaxWeightVariation(daysElapsed) {
     return daysElapsed * VALIDATION_LIMITS.weight_variation_per_day;
 }
 
-// Inicializar configuración cuando el DOM esté listo
-if (document.readyState === 'loading') {
-    document.addEventListener('DOMContentLoaded', () => {
-        loadConfigFromBackend();
-    });
-} else {
-    loadConfigFromBackend();
-}
+// La configuración se carga desde main.js junto con el resto de datos
+// iniciales (/api/bootstrap), o con loadConfigFromBackend si esa petición falla
 
 // Exportar para uso global
 window.AppConfig = {
@@ -106,6 +107,7 @@ window.AppConfig = {
     validateWeight,
     validateBirthDate,
     getMaxWeightVariation,
+    applyConfig,
     loadConfigFromBackend
 };
 
@@ -39,6 +39,7 @@ class DevTools {
                     // Fallback: usar las claves correctas directamente
                     localStorage.removeItem('imc_app_user');
                     localStorage.removeItem('imc_app_weights');
+                    localStorage.removeItem('imc_app_sync_version');
                     console.log('Datos eliminados usando localStorage.removeItem()');
                 }
                 
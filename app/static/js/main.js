@@ -43,8 +43,16 @@ document.addEventListener('DOMContentLoaded', async () => {
     const statMax = document.getElementById('stat-max');
     const statMin = document.getElementById('stat-min');
 
-    // Cargar configuración compartida desde el backend
-    await AppConfig.loadConfigFromBackend();
+    // Cargar en una sola petición configuración, mensajes y datos del usuario;
+    // si falla, cargar configuración y traducciones por separado (con fallback local)
+    const bootstrap = await SyncManager.fetchBootstrap();
+    if (bootstrap) {
+        AppConfig.applyConfig(bootstrap.config);
+        TranslationManager.applyBackendMessages(bootstrap.messages);
+    } else {
+        await AppConfig.loadConfigFromBackend();
+        await TranslationManager.loadTranslations();
+    }
     
     // Actualizar límites de inputs HTML con constantes compartidas
     const limits = AppConfig.getValidationLimits();
@@ -69,7 +77,7 @@ document.addEventListener('DOMContentLoaded', async () => {
     
     // Sincronizar datos del backend al cargar la página
     try {
-        await SyncManager.syncFromBackend();
+        await SyncManager.syncFromBackend(bootstrap);
     } catch (error) {
         console.warn('Error al sincronizar desde backend:', error);
         // Continuar con datos locales si falla la sincronización
@@ -5,7 +5,8 @@
 
 const STORAGE_KEYS = {
     USER: 'imc_app_user',
-    WEIGHTS: 'imc_app_weights'
+    WEIGHTS: 'imc_app_weights',
+    SYNC_VERSION: 'imc_app_sync_version'
 };
 
 class LocalStorageManager {
@@ -149,12 +150,44 @@ class LocalStorageManager {
         };
     }
 
+    /**
+     * Obtiene la versión de datos del backend de la última sincronización (0 si no hay)
+     */
+    static getSyncVersion() {
+        return parseInt(localStorage.getItem(STORAGE_KEYS.SYNC_VERSION), 10) || 0;
+    }
+
+    /**
+     * Guarda la versión de datos del backend de la última sincronización
+     */
+    static saveSyncVersion(version) {
+        localStorage.setItem(STORAGE_KEYS.SYNC_VERSION, String(version));
+    }
+
+    /**
+     * Aplica los cambios recibidos del backend: cada cambio reemplaza el
+     * registro local del mismo día o se añade si no existe
+     */
+    static applyWeightChanges(changes) {
+        if (changes.length === 0) return;
+        const dayOf = w => new Date(w.fecha_registro).toISOString().split('T')[0];
+        const changedDays = new Set(changes.map(dayOf));
+        const weights = this.getWeights().filter(w => !changedDays.has(dayOf(w)));
+        changes.forEach(change => weights.push({
+            id: change.id,
+            peso_kg: change.peso_kg,
+            fecha_registro: change.fecha_registro
+        }));
+        localStorage.setItem(STORAGE_KEYS.WEIGHTS, JSON.stringify(weights));
+    }
+
     /**
      * Limpia todos los datos (útil para testing o reset)
      */
     static clearAll() {
         localStorage.removeItem(STORAGE_KEYS.USER);
         localStorage.removeItem(STORAGE_KEYS.WEIGHTS);
+        localStorage.removeItem(STORAGE_KEYS.SYNC_VERSION);
     }
 }
 
@@ -26,11 +26,31 @@ class SyncManager {
         }
     }
 
+    /**
+     * Descarga en una sola petición todos los datos de la carga inicial
+     * (usuario, IMC, estadísticas, pesos, configuración y mensajes)
+     * @returns {Promise<object|null>} Datos de /api/bootstrap o null si no se pudieron obtener
+     */
+    static async fetchBootstrap() {
+        try {
+            const since = LocalStorageManager.getSyncVersion();
+            const response = await fetch(`/api/bootstrap?since=${since}`);
+            if (response.ok) {
+                return await response.json();
+            }
+            console.warn('Error al cargar datos iniciales desde backend:', response.status);
+        } catch (error) {
+            console.warn('Error al cargar datos iniciales desde backend (modo offline):', error);
+        }
+        return null;
+    }
+
     /**
      * Sincroniza los datos del backend al frontend (localStorage)
+     * @param {object|null} bootstrap - Datos de fetchBootstrap(); si se indican no se hace ninguna petición
      * @returns {Promise<boolean>} true si la sincronización fue exitosa
      */
-    static async syncFromBackend() {
+    static async syncFromBackend(bootstrap = null) {
         // Verificar si la sincronización está desactivada manualmente
         if (this.isSyncDisabled()) {
             console.log('Sincronización omitida: desactivada manualmente');
@@ -45,68 +65,54 @@ class SyncManager {
             sessionStorage.removeItem('_skip_backend_sync');
             return false;
         }
+
+        if (bootstrap) {
+            // Sin usuario en el backend: mantener los datos locales
+            if (bootstrap.user) {
+                this.saveBackendUser(bootstrap.user);
+                if (bootstrap.resync_required) {
+                    this.mergeBackendWeights(bootstrap.weights || []);
+                } else {
+                    LocalStorageManager.applyWeightChanges(bootstrap.weights || []);
+                }
+                LocalStorageManager.saveSyncVersion(bootstrap.version);
+            }
+            return true;
+        }
         
         try {
             // Sincronizar usuario
             const userResponse = await fetch('/api/user');
             if (userResponse.ok) {
-                const userData = await userResponse.json();
-                // Convertir formato del backend al formato del frontend
-                const user = {
-                    nombre: userData.nombre,
-                    apellidos: userData.apellidos,
-                    fecha_nacimiento: userData.fecha_nacimiento,
-                    talla_m: userData.talla_m
-                };
-                LocalStorageManager.saveUser(user);
+                this.saveBackendUser(await userResponse.json());
             } else if (userResponse.status !== 404) {
                 // Si es 404, simplemente no hay usuario (normal)
                 // Otros errores se registran
                 console.warn('Error al sincronizar usuario desde backend:', userResponse.status);
             }
 
-            // Sincronizar pesos
+            // Sincronizar pesos: primero solo los cambios desde la última sincronización
+            let syncVersion = null;
+            const since = LocalStorageManager.getSyncVersion();
+            const changesResponse = await fetch(`/api/weights/changes?since=${since}`);
+            if (changesResponse.ok) {
+                const changesData = await changesResponse.json();
+                if (!changesData.resync_required) {
+                    LocalStorageManager.applyWeightChanges(changesData.changes || []);
+                    LocalStorageManager.saveSyncVersion(changesData.version);
+                    return true;
+                }
+                // Primera sincronización o registro de cambios ya compactado:
+                // descargar el historial completo y guardar la versión recibida
+                syncVersion = changesData.version;
+            }
+
             const weightsResponse = await fetch('/api/weights');
             if (weightsResponse.ok) {
                 const weightsData = await weightsResponse.json();
-                const backendWeights = weightsData.weights || [];
-                
-                // Convertir formato del backend al formato del frontend
-                const frontendWeights = backendWeights.map(w => ({
-                    id: w.id,
-                    peso_kg: w.peso_kg,
-                    fecha_registro: w.fecha_registro
-                }));
-                
-                // Fusionar pesos del backend con los locales
-                // Prioridad: backend (más reciente y autoritativo)
-                const localWeights = LocalStorageManager.getWeights();
-                const mergedWeights = [...frontendWeights];
-                
-                // Añadir pesos locales que no estén en el backend (por fecha)
-                const backendDates = new Set(
-                    frontendWeights.map(w => new Date(w.fecha_registro).toISOString().split('T')[0])
-                );
-                
-                localWeights.forEach(localWeight => {
-                    const localDate = new Date(localWeight.fecha_registro).toISOString().split('T')[0];
-                    if (!backendDates.has(localDate)) {
-                        // Si no hay peso del backend para esta fecha, añadir el local
-                        mergedWeights.push(localWeight);
-                    }
-                });
-                
-                // Ordenar por fecha descendente
-                mergedWeights.sort((a, b) => 
-                    new Date(b.fecha_registro) - new Date(a.fecha_registro)
-                );
-                
-                // Guardar pesos fusionados
-                if (mergedWeights.length > 0) {
-                    localStorage.setItem('imc_app_weights', JSON.stringify(mergedWeights));
-                } else if (frontendWeights.length > 0) {
-                    // Si no hay pesos locales pero sí del backend, usar solo los del backend
-                    localStorage.setItem('imc_app_weights', JSON.stringify(frontendWeights));
+                this.mergeBackendWeights(weightsData.weights || []);
+                if (syncVersion !== null) {
+                    LocalStorageManager.saveSyncVersion(syncVersion);
                 }
             } else if (weightsResponse.status === 404) {
                 // Si no hay usuario en el backend, mantener pesos locales
@@ -122,6 +128,64 @@ class SyncManager {
         }
     }
 
+    /**
+     * Guarda en localStorage el usuario recibido del backend
+     * @param {object} userData - Usuario en formato del backend
+     */
+    static saveBackendUser(userData) {
+        // Convertir formato del backend al formato del frontend
+        LocalStorageManager.saveUser({
+            nombre: userData.nombre,
+            apellidos: userData.apellidos,
+            fecha_nacimiento: userData.fecha_nacimiento,
+            talla_m: userData.talla_m
+        });
+    }
+
+    /**
+     * Fusiona el historial completo del backend con los pesos locales
+     * @param {Array} backendWeights - Pesos en formato del backend
+     */
+    static mergeBackendWeights(backendWeights) {
+        // Convertir formato del backend al formato del frontend
+        const frontendWeights = backendWeights.map(w => ({
+            id: w.id,
+            peso_kg: w.peso_kg,
+            fecha_registro: w.fecha_registro
+        }));
+        
+        // Fusionar pesos del backend con los locales
+        // Prioridad: backend (más reciente y autoritativo)
+        const localWeights = LocalStorageManager.getWeights();
+        const mergedWeights = [...frontendWeights];
+        
+        // Añadir pesos locales que no estén en el backend (por fecha)
+        const backendDates = new Set(
+            frontendWeights.map(w => new Date(w.fecha_registro).toISOString().split('T')[0])
+        );
+        
+        localWeights.forEach(localWeight => {
+            const localDate = new Date(localWeight.fecha_registro).toISOString().split('T')[0];
+            if (!backendDates.has(localDate)) {
+                // Si no hay peso del backend para esta fecha, añadir el local
+                mergedWeights.push(localWeight);
+            }
+        });
+        
+        // Ordenar por fecha descendente
+        mergedWeights.sort((a, b) => 
+            new Date(b.fecha_registro) - new Date(a.fecha_registro)
+        );
+        
+        // Guardar pesos fusionados
+        if (mergedWeights.length > 0) {
+            localStorage.setItem('imc_app_weights', JSON.stringify(mergedWeights));
+        } else if (frontendWeights.length > 0) {
+            // Si no hay pesos locales pero sí del backend, usar solo los del backend
+            localStorage.setItem('imc_app_weights', JSON.stringify(frontendWeights));
+        }
+    }
+
     /**
      * Sincroniza el usuario al backend
      * @param {object} user - Objeto usuario
@@ -206,6 +270,7 @@ class SyncManager {
     /**
      * Sincroniza todos los pesos locales al backend
      * Útil para sincronización inicial o recuperación
+     * Envía todos los pesos en una única petición a /api/weights/bulk
      * @returns {Promise<number>} Número de pesos sincronizados exitosamente
      */
     static async syncAllWeightsToBackend() {
@@ -215,23 +280,42 @@ class SyncManager {
         }
 
         const weights = LocalStorageManager.getWeights();
-        let syncedCount = 0;
+        if (weights.length === 0) {
+            return 0;
+        }
 
-        for (const weight of weights) {
-            try {
-                const success = await this.syncWeightToBackend(weight);
-                if (success) {
-                    syncedCount++;
-                }
-                // Pequeña pausa para no sobrecargar el servidor
-                await new Promise(resolve => setTimeout(resolve, 100));
-            } catch (error) {
-                // Si hay error de validación, lo registramos pero continuamos
-                console.warn(`Error al sincronizar peso ${weight.id}:`, error.message);
+        try {
+            const response = await fetch('/api/weights/bulk', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    weights: weights.map(w => ({
+                        peso_kg: w.peso_kg,
+                        fecha_registro: w.fecha_registro
+                    }))
+                })
+            });
+
+            if (!response.ok) {
+                const errorData = await response.json();
+                console.error('Error al sincronizar pesos al backend:', errorData.error);
+                return 0;
             }
-        }
 
-        return syncedCount;
+            const data = await response.json();
+            // Los errores de validación se registran por peso, sin detener el resto
+            (data.results || []).forEach((result, index) => {
+                if (result.status === 'error') {
+                    console.warn(`Error al sincronizar peso ${weights[index].id}:`, result.error);
+                }
+            });
+            return data.created || 0;
+        } catch (error) {
+            console.warn('Error al sincronizar pesos al backend (modo offline):', error);
+            return 0;
+        }
     }
 }
 
@@ -9,6 +9,27 @@ const AVAILABLE_LANGUAGES = window.APP_CONFIG?.availableLanguages || ['es'];
 // Objeto global de mensajes
 let MESSAGES = {};
 
+/**
+ * Aplica los mensajes recibidos del backend (/api/messages o /api/bootstrap)
+ * @param {object} backendMessages - Mensajes en formato del backend
+ * @param {string} langCode - Código del idioma (para las funciones helper locales)
+ */
+function applyBackendMessages(backendMessages, langCode = ACTIVE_LANGUAGE) {
+    const localTranslations = window.translations?.[langCode];
+    // Fusionar mensajes del backend con funciones helper locales
+    MESSAGES = {
+        errors: {
+            ...backendMessages.errors,
+            weightVariationExceeded: localTranslations?.errors?.weightVariationExceeded
+        },
+        texts: {
+            ...backendMessages.texts,
+            greeting: localTranslations?.texts?.greeting
+        },
+        bmi_descriptions: backendMessages.bmi_descriptions
+    };
+}
+
 /**
  * Carga las traducciones del idioma especificado
  * Primero intenta cargar desde el backend, luego desde archivos locales
@@ -28,19 +49,7 @@ async function loadTranslations(langCode = ACTIVE_LANGUAGE) {
     try {
         const response = await fetch('/api/messages');
         if (response.ok) {
-            const backendMessages = await response.json();
-            // Fusionar mensajes del backend con funciones helper locales
-            MESSAGES = {
-                errors: {
-                    ...backendMessages.errors,
-                    weightVariationExceeded: localTranslations?.errors?.weightVariationExceeded
-                },
-                texts: {
-                    ...backendMessages.texts,
-                    greeting: localTranslations?.texts?.greeting
-                },
-                bmi_descriptions: backendMessages.bmi_descriptions
-            };
+            applyBackendMessages(await response.json(), langCode);
             return;
         }
     } catch (error) {
@@ -68,22 +77,13 @@ async function loadTranslations(langCode = ACTIVE_LANGUAGE) {
     }
 }
 
-/**
- * Inicializa el sistema de traducciones
- */
-function initTranslations() {
-    loadTranslations(ACTIVE_LANGUAGE);
-}
-
-// Inicializar traducciones cuando el DOM esté listo
-if (document.readyState === 'loading') {
-    document.addEventListener('DOMContentLoaded', initTranslations);
-} else {
-    initTranslations();
-}
+// Las traducciones se cargan desde main.js junto con el resto de datos
+// iniciales (/api/bootstrap), o con loadTranslations si esa petición falla
 
 // Exportar funciones públicas
 window.TranslationManager = {
+    applyBackendMessages,
+    loadTranslations,
     getMessages: () => MESSAGES,
     getActiveLanguage: () => ACTIVE_LANGUAGE,
     getAvailableLanguages: () => AVAILABLE_LANGUAGES
@@ -1,10 +1,16 @@
 """
 Sistema de almacenamiento abstracto
 """
+import threading
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime, date
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, date, timedelta
 from typing import Optional
 
+from .concurrency import ReadWriteLock
+
 
 class UserData:
     """Clase de datos para usuario (DTO)"""
@@ -39,13 +45,28 @@ class UserData:
 
 
 class WeightEntryData:
-    """Clase de datos para entrada de peso (DTO)"""
+    """Clase de datos para entrada de peso (DTO)
+
+    recorded_date_iso guarda la fecha en ISO 8601 (como datetime.isoformat())
+    para no formatearla en cada serialización: el almacenamiento puede darla
+    al crear la entrada y, si no, se calcula la primera vez que se pide.
+    MemoryStorage crea las entradas en cada lectura, así que con él la fecha
+    se sigue formateando una vez por entrada y petición.
+    """
     def __init__(self, entry_id: int, user_id: int, weight_kg: float, 
-                 recorded_date: datetime):
+                 recorded_date: datetime, recorded_date_iso: Optional[str] = None):
         self.entry_id = entry_id
         self.user_id = user_id
         self.weight_kg = weight_kg
         self.recorded_date = recorded_date
+        self._recorded_date_iso = recorded_date_iso
+    
+    @property
+    def recorded_date_iso(self) -> str:
+        iso = self._recorded_date_iso
+        if iso is None:
+            iso = self._recorded_date_iso = self.recorded_date.isoformat()
+        return iso
     
     def to_dict(self):
         """Convierte a diccionario para serialización JSON"""
@@ -53,7 +74,7 @@ class WeightEntryData:
             'entry_id': self.entry_id,
             'user_id': self.user_id,
             'weight_kg': self.weight_kg,
-            'recorded_date': self.recorded_date.isoformat()
+            'recorded_date': self.recorded_date_iso
         }
     
     @classmethod
@@ -67,6 +88,27 @@ class WeightEntryData:
         )
 
 
+class UserSnapshot:
+    """Datos de un usuario leídos de forma consistente en una sola operación (DTO)
+
+    weight_entries contiene el historial completo (del más reciente al más
+    antiguo) o, si weight_changes_only es True, solo los días modificados
+    desde la versión pedida (en orden cronológico, como get_weight_changes).
+    """
+    def __init__(self, user: Optional[UserData], data_version: int, weight_count: int,
+                 max_weight: Optional[float], min_weight: Optional[float],
+                 last_weight_entry: Optional[WeightEntryData], weight_entries: list,
+                 weight_changes_only: bool = False):
+        self.user = user
+        self.data_version = data_version
+        self.weight_count = weight_count
+        self.max_weight = max_weight
+        self.min_weight = min_weight
+        self.last_weight_entry = last_weight_entry
+        self.weight_entries = weight_entries
+        self.weight_changes_only = weight_changes_only
+
+
 class StorageInterface(ABC):
     """Interfaz abstracta para el almacenamiento"""
     
@@ -95,6 +137,25 @@ class StorageInterface(ABC):
         """Añade una nueva entrada de peso. Si ya existe una entrada del mismo día, la reemplaza"""
         pass
     
+    def add_weight_entries(self, entries: list) -> None:
+        """Añade varias entradas de peso en un solo lote, en el orden dado
+
+        Cada entrada sigue las reglas de add_weight_entry. Las implementaciones
+        pueden sobrescribirlo para aplicar el lote en una sola operación.
+        """
+        for entry in entries:
+            self.add_weight_entry(entry)
+    
+    @abstractmethod
+    def get_data_version(self, user_id: int) -> int:
+        """Obtiene la versión de los datos de un usuario (0 si no tiene datos)
+
+        La versión crece con cada escritura del usuario (datos personales o
+        pesos) y no se repite tras reiniciar, por lo que sirve para validar
+        cachés (ETag) sin leer los datos.
+        """
+        pass
+    
     @abstractmethod
     def get_weight_count(self, user_id: int) -> int:
         """Obtiene el número de entradas de peso de un usuario"""
@@ -115,79 +176,623 @@ class StorageInterface(ABC):
         """Obtiene todas las entradas de peso de un usuario"""
         pass
 
+    def get_weight_entries_range(self, user_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> list:
+        """Obtiene las entradas con start <= fecha < end, de la más reciente a la más antigua
+
+        Devuelve como máximo limit entradas (todas si es None); los límites
+        None no acotan el rango. Las implementaciones pueden sobrescribirlo
+        para ir directamente a la ventana pedida sin recorrer el historial.
+        """
+        result = []
+        for entry in self.get_all_weight_entries(user_id):
+            if limit is not None and len(result) >= limit:
+                break
+            if end is not None and entry.recorded_date >= end:
+                continue
+            if start is not None and entry.recorded_date < start:
+                break
+            result.append(entry)
+        return result
+
+    def get_weight_entries_after(self, user_id: int, after: Optional[datetime],
+                                 limit: int) -> list:
+        """Obtiene hasta limit entradas con fecha posterior a after, en orden cronológico
+
+        Con after igual a la fecha de la última entrada de un bloque se obtiene
+        el bloque siguiente, sin estado entre llamadas (None: desde el principio).
+        Las implementaciones pueden sobrescribirlo para ir directamente al bloque.
+        """
+        entries = self.get_all_weight_entries(user_id)
+        entries.reverse()
+        if after is not None:
+            entries = [entry for entry in entries if entry.recorded_date > after]
+        return entries[:limit]
+
+    def get_weight_changes(self, user_id: int, since: int) -> Optional[list]:
+        """Obtiene las entradas añadidas o reemplazadas después de la versión since
+
+        Devuelve el estado actual de cada día modificado, en orden cronológico,
+        o None si el registro de cambios ya no llega hasta since y el cliente
+        debe descargar el historial completo. Por defecto siempre devuelve None.
+        """
+        return None
+
+    def get_weight_series(self, user_id: int) -> tuple:
+        """Obtiene el historial como columnas en orden cronológico
+
+        Devuelve (timestamps, weights): array('q') con las fechas en
+        microsegundos desde EPOCH y array('d') con los pesos, listos para
+        cálculos vectorizados sin crear un WeightEntryData por registro.
+        """
+        timestamps, weights = array('q'), array('d')
+        for chunk in self.iter_weight_entries(user_id):
+            for entry in chunk:
+                timestamps.append(datetime_to_micros(entry.recorded_date))
+                weights.append(entry.weight_kg)
+        return timestamps, weights
+
+    def get_user_snapshot(self, user_id: int, since: Optional[int] = None) -> UserSnapshot:
+        """Obtiene todos los datos de un usuario en una sola lectura
+
+        Con since, incluye solo los cambios posteriores a esa versión si el
+        registro de cambios los conserva. Esta implementación combina las
+        consultas individuales (leyendo primero la versión, como los ETag);
+        las implementaciones pueden sobrescribirla para leer todo de una vez.
+        """
+        data_version = self.get_data_version(user_id)
+        changes = self.get_weight_changes(user_id, since) if since else None
+        entries = self.get_all_weight_entries(user_id) if changes is None else changes
+        return UserSnapshot(
+            user=self.get_user(user_id),
+            data_version=data_version,
+            weight_count=self.get_weight_count(user_id),
+            max_weight=self.get_max_weight(user_id),
+            min_weight=self.get_min_weight(user_id),
+            last_weight_entry=self.get_last_weight_entry(user_id),
+            weight_entries=entries,
+            weight_changes_only=changes is not None
+        )
+
+    def iter_weight_entries(self, user_id: int, chunk_size: int = 500):
+        """Recorre las entradas de peso de un usuario en orden cronológico, por bloques
+
+        Genera listas de hasta chunk_size entradas. Las implementaciones pueden
+        sobrescribirlo para leer cada bloque sin cargar el historial completo.
+        """
+        entries = self.get_all_weight_entries(user_id)
+        entries.reverse()
+        for start in range(0, len(entries), chunk_size):
+            yield entries[start:start + chunk_size]
+
+
+# Las fechas de registro se guardan en el historial como microsegundos desde
+# EPOCH (fechas sin zona horaria, como las genera la API)
+EPOCH = datetime(1970, 1, 1)
+_EPOCH_ORDINAL = EPOCH.toordinal()
+MICROSECONDS_PER_DAY = 86_400_000_000
+
+# Cambios que conserva el registro de cada usuario; al superarse se descarta
+# la mitad más antigua y los clientes anteriores deben resincronizar. Cada
+# cambio ocupa 16 bytes: el límite acota el registro a unos KiB por usuario,
+# independientemente del número de escrituras
+CHANGE_LOG_SIZE = 256
+
+
+def datetime_to_micros(value: datetime) -> int:
+    """Convierte una fecha (sin zona horaria) a microsegundos desde EPOCH"""
+    seconds = (value.hour * 60 + value.minute) * 60 + value.second
+    return ((value.toordinal() - _EPOCH_ORDINAL) * 86_400 + seconds) * 1_000_000 + value.microsecond
+
+
+def micros_to_datetime(micros: int) -> datetime:
+    """Convierte microsegundos desde EPOCH a fecha (sin zona horaria)"""
+    return EPOCH + timedelta(microseconds=micros)
+
+
+def next_data_version(previous: int) -> int:
+    """Versión siguiente a previous
+
+    Parte del reloj en microsegundos para que las versiones sigan creciendo
+    tras un reinicio (aunque el almacenamiento empiece vacío) y las cachés de
+    los clientes no validen datos de una ejecución anterior.
+    """
+    return max(previous + 1, time.time_ns() // 1000)
+
+
+class _UserWeightHistory:
+    """Historial de pesos de un usuario en formato columnar
+
+    Cada registro ocupa una posición en tres columnas paralelas (array) con la
+    fecha en microsegundos, el peso y el entry_id, ordenadas por fecha (un
+    único registro por día). El registro de un día se localiza por búsqueda
+    binaria sobre la columna de fechas, y los WeightEntryData solo se crean al
+    leer, en la frontera de la API.
+
+    Los pesos se guardan además en una columna ordenada que se actualiza en
+    cada escritura (incluida la eliminación del peso reemplazado), de modo que
+    el mínimo y el máximo se leen de sus extremos sin recorrer las entradas.
+
+    El registro de cambios guarda, por cada escritura, la versión de datos y
+    la fecha escrita, hasta CHANGE_LOG_SIZE cambios; change_floor es la
+    versión más antigua a partir de la cual el registro está completo.
+    """
+
+    def __init__(self, user_id: int, change_floor: int = 0):
+        self.user_id = user_id
+        self.timestamps = array('q')  # microsegundos desde EPOCH, ascendente
+        self.weights = array('d')
+        self.entry_ids = array('q')
+        self.sorted_weights = array('d')  # pesos en orden ascendente
+        self.change_versions = array('q')  # ascendente
+        self.change_timestamps = array('q')
+        self.change_floor = change_floor
+
+    @classmethod
+    def from_columns(cls, user_id: int, change_floor: int, timestamps: array, weights: array,
+                     entry_ids: array, sorted_weights: array) -> '_UserWeightHistory':
+        """Historial formado por columnas ya ordenadas (carga de snapshots)
+
+        Las columnas pasan a ser las del historial: quien llama no debe volver a
+        usarlas.
+        """
+        history = cls(user_id, change_floor)
+        history.timestamps = timestamps
+        history.weights = weights
+        history.entry_ids = entry_ids
+        history.sorted_weights = sorted_weights
+        return history
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def _entry(self, index: int) -> WeightEntryData:
+        return WeightEntryData(
+            entry_id=self.entry_ids[index],
+            user_id=self.user_id,
+            weight_kg=self.weights[index],
+            recorded_date=micros_to_datetime(self.timestamps[index])
+        )
+
+    def put(self, entry: WeightEntryData) -> None:
+        """Inserta la entrada o reemplaza la existente del mismo día"""
+        timestamp = datetime_to_micros(entry.recorded_date)
+        day_start = timestamp - timestamp % MICROSECONDS_PER_DAY
+        timestamps = self.timestamps
+        if timestamps and day_start > timestamps[-1]:
+            # Caso habitual: el nuevo día es posterior a todos los anteriores
+            index = len(timestamps)
+        else:
+            index = bisect_left(timestamps, day_start)
+
+        if index < len(timestamps) and timestamps[index] < day_start + MICROSECONDS_PER_DAY:
+            # Reemplazo: el peso anterior deja de contar para el mínimo y el máximo
+            previous_weight = self.weights[index]
+            del self.sorted_weights[bisect_left(self.sorted_weights, previous_weight)]
+            timestamps[index] = timestamp
+            self.weights[index] = entry.weight_kg
+            self.entry_ids[index] = entry.entry_id
+        elif index == len(timestamps):
+            timestamps.append(timestamp)
+            self.weights.append(entry.weight_kg)
+            self.entry_ids.append(entry.entry_id)
+        else:
+            timestamps.insert(index, timestamp)
+            self.weights.insert(index, entry.weight_kg)
+            self.entry_ids.insert(index, entry.entry_id)
+        self.sorted_weights.insert(bisect_right(self.sorted_weights, entry.weight_kg), entry.weight_kg)
+
+    def min_weight(self) -> Optional[float]:
+        return self.sorted_weights[0] if self.sorted_weights else None
+
+    def max_weight(self) -> Optional[float]:
+        return self.sorted_weights[-1] if self.sorted_weights else None
+
+    def last(self) -> Optional[WeightEntryData]:
+        if not self.timestamps:
+            return None
+        return self._entry(len(self.timestamps) - 1)
+
+    def last_before_day(self, day: date) -> Optional[WeightEntryData]:
+        """Última entrada de un día estrictamente anterior al indicado"""
+        day_start = (day.toordinal() - _EPOCH_ORDINAL) * MICROSECONDS_PER_DAY
+        index = bisect_left(self.timestamps, day_start)
+        if index == 0:
+            return None
+        return self._entry(index - 1)
+
+    def newest_first(self) -> list:
+        return [self._entry(index) for index in range(len(self.timestamps) - 1, -1, -1)]
+
+    def range_newest_first(self, start: Optional[int], end: Optional[int],
+                           limit: Optional[int]) -> list:
+        """Entradas con start <= timestamp < end, de la más reciente a la más antigua"""
+        timestamps = self.timestamps
+        low = 0 if start is None else bisect_left(timestamps, start)
+        high = len(timestamps) if end is None else bisect_left(timestamps, end)
+        if limit is not None:
+            low = max(low, high - limit)
+        return [self._entry(index) for index in range(high - 1, low - 1, -1)]
+
+    def log_change(self, version: int, timestamp: int) -> None:
+        """Registra la escritura de la fecha timestamp con la versión dada"""
+        if len(self.change_versions) >= CHANGE_LOG_SIZE:
+            dropped = CHANGE_LOG_SIZE // 2
+            self.change_floor = self.change_versions[dropped - 1]
+            del self.change_versions[:dropped]
+            del self.change_timestamps[:dropped]
+        self.change_versions.append(version)
+        self.change_timestamps.append(timestamp)
+
+    def changes_since(self, since: int) -> Optional[list]:
+        """Estado actual de los días escritos después de since (None si no se conoce)"""
+        if since < self.change_floor:
+            return None
+        start = bisect_right(self.change_versions, since)
+        days = sorted({
+            timestamp - timestamp % MICROSECONDS_PER_DAY
+            for timestamp in self.change_timestamps[start:]
+        })
+        # Los días no se eliminan nunca, por lo que cada día registrado existe
+        return [self._entry(bisect_left(self.timestamps, day)) for day in days]
+
+    def chunk_after(self, timestamp: Optional[int], limit: int) -> tuple:
+        """Hasta limit entradas posteriores a timestamp, en orden cronológico
+
+        Devuelve las entradas y el timestamp de la última, para pedir el
+        bloque siguiente aunque el historial cambie entre bloques.
+        """
+        start = 0 if timestamp is None else bisect_right(self.timestamps, timestamp)
+        end = min(start + limit, len(self.timestamps))
+        if start >= end:
+            return [], timestamp
+        return [self._entry(index) for index in range(start, end)], self.timestamps[end - 1]
+
+
+# Particiones por defecto de MemoryStorage; cada una tiene su propio bloqueo
+DEFAULT_PARTITIONS = 64
+
+
+class _EntryIdAllocator:
+    """Contador de entry_id compartido por todas las particiones
+
+    Su bloqueo solo protege el incremento del contador: se toma dentro del de
+    una partición, pero nunca al revés, y se libera enseguida.
+    """
+
+    def __init__(self):
+        self._next_id = 1
+        self._lock = threading.Lock()
+
+    @property
+    def next_id(self) -> int:
+        return self._next_id
+
+    def allocate(self, count: int = 1) -> int:
+        """Reserva count identificadores consecutivos y devuelve el primero"""
+        with self._lock:
+            first = self._next_id
+            self._next_id += count
+            return first
+
+    def advance_past(self, entry_id: int) -> None:
+        """Garantiza que los siguientes identificadores serán mayores que entry_id"""
+        with self._lock:
+            self._next_id = max(self._next_id, entry_id + 1)
+
+
+class _StoragePartition:
+    """Usuarios, historiales y versiones de una partición de MemoryStorage"""
+
+    __slots__ = ('users', 'histories', 'versions', 'last_version', 'lock')
+
+    def __init__(self):
+        self.users = {}  # {user_id: UserData}
+        self.histories = {}  # {user_id: _UserWeightHistory}
+        self.versions = {}  # {user_id: versión de sus datos}
+        self.last_version = 0
+        self.lock = ReadWriteLock()
+
 
 class MemoryStorage(StorageInterface):
-    """Implementación de almacenamiento en memoria"""
+    """Implementación de almacenamiento en memoria
+
+    Cada usuario tiene su propio historial columnar ordenado por fecha, de modo
+    que las operaciones no dependen del número total de registros de otros
+    usuarios y cada registro ocupa unas decenas de bytes.
+
+    Los usuarios se reparten por user_id entre particiones independientes,
+    cada una con su propio bloqueo de lectura/escritura (workers gthread o
+    --threads): las lecturas de una partición se comparten, las escrituras la
+    toman en exclusiva y los usuarios de particiones distintas nunca se
+    esperan entre sí.
+    """
     
-    def __init__(self):
-        self._users = {}  # {user_id: UserData}
-        self._weight_entries = []  # List[WeightEntryData]
-        self._next_entry_id = 1
+    def __init__(self, partitions: int = DEFAULT_PARTITIONS):
+        self._partitions = [_StoragePartition() for _ in range(max(1, partitions))]
+        self._entry_ids = _EntryIdAllocator()
+        # Ningún cliente puede tener cambios posteriores a esta versión de una
+        # ejecución anterior: los registros de cambios empiezan aquí
+        self._change_floor = next_data_version(0)
+    
+    def _partition(self, user_id: int) -> _StoragePartition:
+        return self._partitions[user_id % len(self._partitions)]
     
     def get_user(self, user_id: int) -> Optional[UserData]:
-        return self._users.get(user_id)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            return partition.users.get(user_id)
     
     def save_user(self, user: UserData) -> None:
-        self._users[user.user_id] = user
+        partition = self._partition(user.user_id)
+        with partition.lock.write:
+            partition.users[user.user_id] = user
+            self._bump_version(partition, user.user_id)
+    
+    def _bump_version(self, partition: _StoragePartition, user_id: int) -> int:
+        """Marca como modificados los datos del usuario (con el bloqueo de escritura tomado)"""
+        partition.last_version = next_data_version(partition.last_version)
+        partition.versions[user_id] = partition.last_version
+        return partition.last_version
+    
+    def _put_entry(self, partition: _StoragePartition, entry: WeightEntryData) -> None:
+        """Guarda la entrada y registra el cambio (con el bloqueo de escritura tomado)"""
+        history = partition.histories.get(entry.user_id)
+        if history is None:
+            history = partition.histories[entry.user_id] = _UserWeightHistory(
+                entry.user_id, self._change_floor
+            )
+        history.put(entry)
+        history.log_change(self._bump_version(partition, entry.user_id),
+                           datetime_to_micros(entry.recorded_date))
+    
+    def get_data_version(self, user_id: int) -> int:
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            return partition.versions.get(user_id, 0)
     
     def get_last_weight_entry(self, user_id: int) -> Optional[WeightEntryData]:
-        user_entries = [e for e in self._weight_entries if e.user_id == user_id]
-        if not user_entries:
-            return None
-        return max(user_entries, key=lambda e: e.recorded_date)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return None
+            return history.last()
     
     def get_last_weight_entry_from_different_date(self, user_id: int, reference_date: date) -> Optional[WeightEntryData]:
         """Obtiene la última entrada de peso de un día diferente a la fecha de referencia"""
-        user_entries = [e for e in self._weight_entries if e.user_id == user_id]
-        if not user_entries:
-            return None
-        
-        # Filtrar entradas de fechas diferentes a la referencia
-        different_date_entries = [
-            e for e in user_entries 
-            if e.recorded_date.date() != reference_date
-        ]
-        
-        if not different_date_entries:
-            return None
-        
-        return max(different_date_entries, key=lambda e: e.recorded_date)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return None
+            
+            last = history.last()
+            if last is None or last.recorded_date.date() != reference_date:
+                return last
+            
+            # La última entrada es del día de referencia: tomar la del día anterior
+            return history.last_before_day(reference_date)
     
     def add_weight_entry(self, entry: WeightEntryData) -> None:
-        entry_date = entry.recorded_date.date()
-        
-        # Eliminar entradas del mismo día para el mismo usuario
-        self._weight_entries = [
-            e for e in self._weight_entries 
-            if not (e.user_id == entry.user_id and e.recorded_date.date() == entry_date)
-        ]
-        
-        # Añadir la nueva entrada
-        entry.entry_id = self._next_entry_id
-        self._next_entry_id += 1
-        self._weight_entries.append(entry)
+        partition = self._partition(entry.user_id)
+        with partition.lock.write:
+            # Añadir la nueva entrada (reemplaza la del mismo día si existe)
+            entry.entry_id = self._entry_ids.allocate()
+            self._put_entry(partition, entry)
+    
+    def add_weight_entries(self, entries: list) -> None:
+        """Registra las entradas agrupadas por partición, con un bloqueo por partición"""
+        by_partition = {}
+        for entry in entries:
+            by_partition.setdefault(entry.user_id % len(self._partitions), []).append(entry)
+        for index, partition_entries in by_partition.items():
+            partition = self._partitions[index]
+            with partition.lock.write:
+                first_id = self._entry_ids.allocate(len(partition_entries))
+                for offset, entry in enumerate(partition_entries):
+                    entry.entry_id = first_id + offset
+                    self._put_entry(partition, entry)
+    
+    def _restore_weight_entry(self, entry: WeightEntryData) -> None:
+        """Inserta una entrada conservando su entry_id (carga de datos persistidos)"""
+        partition = self._partition(entry.user_id)
+        with partition.lock.write:
+            self._put_entry(partition, entry)
+        self._entry_ids.advance_past(entry.entry_id)
+    
+    def _restore_next_entry_id(self, next_entry_id: int) -> None:
+        """Garantiza que los siguientes entry_id no bajarán de next_entry_id"""
+        self._entry_ids.advance_past(next_entry_id - 1)
+    
+    def _export_blocks(self) -> tuple:
+        """Copia los datos de todos los usuarios para guardar un snapshot
+
+        Devuelve los bloques (SnapshotBlock) y el siguiente entry_id. Las
+        columnas se copian (una copia de memoria por columna), por lo que se
+        pueden guardar después sin bloquear. Cada partición se copia con su
+        propio bloqueo de lectura; quien necesite un estado consistente entre
+        particiones debe detener antes las escrituras.
+        """
+        from .snapshot import SnapshotBlock
+        blocks = []
+        next_entry_id = self._entry_ids.next_id
+        for partition in self._partitions:
+            with partition.lock.read:
+                for user_id in partition.users.keys() | partition.histories.keys():
+                    history = partition.histories.get(user_id)
+                    if history is None:
+                        history = _UserWeightHistory(user_id)
+                    blocks.append(SnapshotBlock(
+                        user_id, partition.users.get(user_id), history.timestamps[:],
+                        history.weights[:], history.entry_ids[:], history.sorted_weights[:]
+                    ))
+        return blocks, next_entry_id
+    
+    def _load_snapshot(self, snapshot) -> None:
+        """Sustituye los datos de los usuarios incluidos en el snapshot (un bloqueo por partición)"""
+        by_partition = {}
+        for block in snapshot.blocks:
+            by_partition.setdefault(block.user_id % len(self._partitions), []).append(block)
+        for index, blocks in by_partition.items():
+            partition = self._partitions[index]
+            with partition.lock.write:
+                for block in blocks:
+                    if block.user is not None:
+                        partition.users[block.user_id] = block.user
+                    # Los clientes con versiones anteriores a la carga deben resincronizar
+                    version = self._bump_version(partition, block.user_id)
+                    if block.timestamps:
+                        partition.histories[block.user_id] = _UserWeightHistory.from_columns(
+                            block.user_id, version, block.timestamps, block.weights,
+                            block.entry_ids, block.sorted_weights
+                        )
+                    else:
+                        partition.histories.pop(block.user_id, None)
+        self._restore_next_entry_id(snapshot.next_entry_id)
+    
+    def dump(self, path: str) -> None:
+        """Guarda todos los datos en un snapshot binario (ver app/snapshot.py)"""
+        from .snapshot import write_snapshot
+        blocks, next_entry_id = self._export_blocks()
+        write_snapshot(path, blocks, next_entry_id)
+    
+    def load(self, path: str) -> None:
+        """Carga un snapshot binario guardado con dump()
+
+        Los usuarios del snapshot sustituyen a los que ya hubiera con el mismo
+        user_id; el resto se conserva.
+        """
+        from .snapshot import read_snapshot
+        self._load_snapshot(read_snapshot(path))
     
     def get_weight_count(self, user_id: int) -> int:
-        return len([e for e in self._weight_entries if e.user_id == user_id])
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            return len(history) if history is not None else 0
     
     def get_max_weight(self, user_id: int) -> Optional[float]:
-        user_entries = [e for e in self._weight_entries if e.user_id == user_id]
-        if not user_entries:
-            return None
-        return max(e.weight_kg for e in user_entries)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return None
+            return history.max_weight()
     
     def get_min_weight(self, user_id: int) -> Optional[float]:
-        user_entries = [e for e in self._weight_entries if e.user_id == user_id]
-        if not user_entries:
-            return None
-        return min(e.weight_kg for e in user_entries)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return None
+            return history.min_weight()
     
     def get_all_weight_entries(self, user_id: int) -> list:
         """Obtiene todas las entradas de peso de un usuario, ordenadas por fecha descendente"""
-        user_entries = [e for e in self._weight_entries if e.user_id == user_id]
-        return sorted(user_entries, key=lambda e: e.recorded_date, reverse=True)
-
-
-
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return []
+            return history.newest_first()
+    
+    def get_weight_entries_range(self, user_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> list:
+        """Localiza la ventana por búsqueda binaria y solo crea las entradas devueltas"""
+        start_ts = None if start is None else datetime_to_micros(start)
+        end_ts = None if end is None else datetime_to_micros(end)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return []
+            return history.range_newest_first(start_ts, end_ts, limit)
+    
+    def get_weight_entries_after(self, user_id: int, after: Optional[datetime],
+                                 limit: int) -> list:
+        timestamp = None if after is None else datetime_to_micros(after)
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return []
+            return history.chunk_after(timestamp, limit)[0]
+    
+    def get_weight_changes(self, user_id: int, since: int) -> Optional[list]:
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return None if since < self._change_floor else []
+            return history.changes_since(since)
+    
+    def get_weight_series(self, user_id: int) -> tuple:
+        """Copia las columnas del historial (una copia de memoria por columna)"""
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            history = partition.histories.get(user_id)
+            if history is None:
+                return array('q'), array('d')
+            return array('q', history.timestamps), array('d', history.weights)
+    
+    def get_user_snapshot(self, user_id: int, since: Optional[int] = None) -> UserSnapshot:
+        """Lee todos los datos del usuario con un único bloqueo de lectura"""
+        partition = self._partition(user_id)
+        with partition.lock.read:
+            user = partition.users.get(user_id)
+            data_version = partition.versions.get(user_id, 0)
+            history = partition.histories.get(user_id)
+            if history is None:
+                changes_only = bool(since) and since >= self._change_floor
+                return UserSnapshot(user, data_version, 0, None, None, None, [], changes_only)
+            
+            changes = history.changes_since(since) if since else None
+            return UserSnapshot(
+                user=user,
+                data_version=data_version,
+                weight_count=len(history),
+                max_weight=history.max_weight(),
+                min_weight=history.min_weight(),
+                last_weight_entry=history.last(),
+                weight_entries=history.newest_first() if changes is None else changes,
+                weight_changes_only=changes is not None
+            )
+    
+    def iter_weight_entries(self, user_id: int, chunk_size: int = 500):
+        """Recorre las entradas por bloques; el bloqueo de lectura se toma solo por bloque"""
+        partition = self._partition(user_id)
+        timestamp = None
+        while True:
+            with partition.lock.read:
+                history = partition.histories.get(user_id)
+                if history is None:
+                    return
+                chunk, timestamp = history.chunk_after(timestamp, chunk_size)
+            if not chunk:
+                return
+            yield chunk
 
 
+def create_storage(storage_config: dict) -> StorageInterface:
+    """Crea el almacenamiento indicado en la configuración (ver STORAGE_CONFIG)"""
+    backend = storage_config.get("backend", "memory")
+    if backend == "memory":
+        return MemoryStorage(storage_config.get("partitions", DEFAULT_PARTITIONS))
+    if backend == "journal":
+        from .journal import DEFAULT_MAX_BATCH, JournaledMemoryStorage
+        return JournaledMemoryStorage(storage_config["journal_dir"],
+                                      storage_config["compaction_interval"],
+                                      storage_config.get("partitions", DEFAULT_PARTITIONS),
+                                      storage_config.get("flush_interval", 0),
+                                      storage_config.get("max_batch", DEFAULT_MAX_BATCH))
+    if backend == "shared":
+        from .storage_server import RemoteStorage
+        return RemoteStorage(storage_config["socket_path"],
+                             bytes.fromhex(storage_config["authkey"]))
+    if backend == "sqlite":
+        from .sqlite_storage import SqliteStorage
+        return SqliteStorage(storage_config["sqlite_path"])
+    raise ValueError(f"Backend de almacenamiento desconocido: {backend}")
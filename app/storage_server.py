@@ -0,0 +1,234 @@
+"""
+Almacenamiento compartido entre procesos
+Un proceso servidor mantiene el almacenamiento y los workers de gunicorn
+acceden a él a través de un socket Unix local, de modo que todos ven los
+mismos datos aunque se ejecute más de un worker.
+"""
+import os
+import signal
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+from datetime import date, datetime
+from typing import Optional
+
+from .storage import StorageInterface, UserData, UserSnapshot, WeightEntryData
+
+
+# Métodos del almacenamiento que se pueden invocar de forma remota
+REMOTE_METHODS = frozenset({
+    'get_user',
+    'save_user',
+    'get_last_weight_entry',
+    'get_last_weight_entry_from_different_date',
+    'add_weight_entry',
+    'add_weight_entries',
+    'get_data_version',
+    'get_weight_count',
+    'get_max_weight',
+    'get_min_weight',
+    'get_all_weight_entries',
+    'get_weight_entries_range',
+    'get_weight_entries_after',
+    'get_weight_changes',
+    'get_user_snapshot',
+    'get_weight_series',
+})
+
+
+class StorageServer:
+    """Servidor que expone un StorageInterface a través de un socket Unix
+
+    Cada conexión se atiende en su propio hilo; el almacenamiento debe ser
+    seguro entre hilos (lo son todas las implementaciones de la aplicación).
+    """
+
+    def __init__(self, storage: StorageInterface, address: str, authkey: bytes):
+        self._storage = storage
+        self._address = address
+        self._authkey = authkey
+        self._closed = threading.Event()
+        self._serving_thread = None
+
+        directory = os.path.dirname(address)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(address):
+            # Socket de una ejecución anterior
+            os.remove(address)
+        self._listener = Listener(address, family='AF_UNIX', authkey=authkey)
+
+    def serve_forever(self) -> None:
+        """Acepta conexiones hasta que se llama a close()"""
+        self._serving_thread = threading.current_thread()
+        while not self._closed.is_set():
+            try:
+                conn = self._listener.accept()
+            except (OSError, EOFError, AuthenticationError):
+                # Cliente que no supera la autenticación o listener cerrado
+                continue
+            if self._closed.is_set():
+                conn.close()
+                break
+            threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+    def _serve_connection(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    method, args = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    result = ('ok', self._dispatch(method, args))
+                except Exception as exc:
+                    result = ('error', exc)
+                conn.send(result)
+
+    def _dispatch(self, method: str, args: tuple):
+        if method not in REMOTE_METHODS:
+            raise AttributeError(f"Método no disponible: {method}")
+        result = getattr(self._storage, method)(*args)
+        # El cliente necesita los entry_id asignados por el almacenamiento
+        if method == 'add_weight_entry':
+            return args[0].entry_id
+        if method == 'add_weight_entries':
+            return [entry.entry_id for entry in args[0]]
+        return result
+
+    def close(self) -> None:
+        """Detiene el servidor y elimina el socket"""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        serving_thread = self._serving_thread
+        if serving_thread is not None and serving_thread is not threading.current_thread():
+            # Despierta a serve_forever si está bloqueado en accept()
+            try:
+                Client(self._address, family='AF_UNIX', authkey=self._authkey).close()
+            except OSError:
+                pass
+        self._listener.close()
+        if os.path.exists(self._address):
+            os.remove(self._address)
+
+
+class RemoteStorage(StorageInterface):
+    """Cliente de StorageServer que implementa StorageInterface
+
+    Mantiene una conexión por hilo; la conexión se abre en la primera llamada,
+    por lo que el servidor puede arrancar después que los workers.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self._address = address
+        self._authkey = authkey
+        self._local = threading.local()
+
+    def _call(self, method: str, *args):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = Client(self._address, family='AF_UNIX', authkey=self._authkey)
+            self._local.conn = conn
+        try:
+            conn.send((method, args))
+            status, result = conn.recv()
+        except (EOFError, OSError):
+            # La conexión se volverá a abrir en la siguiente llamada
+            self._local.conn = None
+            conn.close()
+            raise
+        if status == 'error':
+            raise result
+        return result
+
+    def get_user(self, user_id: int) -> Optional[UserData]:
+        return self._call('get_user', user_id)
+
+    def save_user(self, user: UserData) -> None:
+        self._call('save_user', user)
+
+    def get_last_weight_entry(self, user_id: int) -> Optional[WeightEntryData]:
+        return self._call('get_last_weight_entry', user_id)
+
+    def get_last_weight_entry_from_different_date(self, user_id: int, reference_date: date) -> Optional[WeightEntryData]:
+        return self._call('get_last_weight_entry_from_different_date', user_id, reference_date)
+
+    def add_weight_entry(self, entry: WeightEntryData) -> None:
+        entry.entry_id = self._call('add_weight_entry', entry)
+
+    def add_weight_entries(self, entries: list) -> None:
+        entry_ids = self._call('add_weight_entries', entries)
+        for entry, entry_id in zip(entries, entry_ids):
+            entry.entry_id = entry_id
+
+    def get_data_version(self, user_id: int) -> int:
+        return self._call('get_data_version', user_id)
+
+    def get_weight_changes(self, user_id: int, since: int) -> Optional[list]:
+        return self._call('get_weight_changes', user_id, since)
+
+    def get_user_snapshot(self, user_id: int, since: Optional[int] = None) -> UserSnapshot:
+        return self._call('get_user_snapshot', user_id, since)
+
+    def get_weight_series(self, user_id: int) -> tuple:
+        return self._call('get_weight_series', user_id)
+
+    def get_weight_count(self, user_id: int) -> int:
+        return self._call('get_weight_count', user_id)
+
+    def get_max_weight(self, user_id: int) -> Optional[float]:
+        return self._call('get_max_weight', user_id)
+
+    def get_min_weight(self, user_id: int) -> Optional[float]:
+        return self._call('get_min_weight', user_id)
+
+    def get_all_weight_entries(self, user_id: int) -> list:
+        return self._call('get_all_weight_entries', user_id)
+
+    def get_weight_entries_range(self, user_id: int, start: Optional[datetime] = None,
+                                 end: Optional[datetime] = None,
+                                 limit: Optional[int] = None) -> list:
+        return self._call('get_weight_entries_range', user_id, start, end, limit)
+
+    def get_weight_entries_after(self, user_id: int, after: Optional[datetime],
+                                 limit: int) -> list:
+        return self._call('get_weight_entries_after', user_id, after, limit)
+
+    def iter_weight_entries(self, user_id: int, chunk_size: int = 500):
+        """Pide el historial bloque a bloque: cada llamada solo transfiere un bloque"""
+        after = None
+        while True:
+            chunk = self.get_weight_entries_after(user_id, after, chunk_size)
+            if not chunk:
+                return
+            after = chunk[-1].recorded_date
+            yield chunk
+
+
+def _raise_system_exit(signum, frame):
+    raise SystemExit(0)
+
+
+def run_storage_server(storage_config: dict) -> None:
+    """Punto de entrada del proceso servidor de almacenamiento"""
+    from .storage import create_storage
+
+    # SIGTERM termina el servidor ordenadamente (cierra el almacenamiento)
+    signal.signal(signal.SIGTERM, _raise_system_exit)
+
+    backend_config = dict(storage_config, backend=storage_config["shared_backend"])
+    storage = create_storage(backend_config)
+    server = StorageServer(storage, storage_config["socket_path"],
+                           bytes.fromhex(storage_config["authkey"]))
+    try:
+        server.serve_forever()
+    finally:
+        server.close()
+        if hasattr(storage, 'close'):
+            storage.close()
+
+
+if __name__ == '__main__':
+    from .config import STORAGE_CONFIG
+    run_storage_server(STORAGE_CONFIG)
@@ -1,67 +1,179 @@
 """
 Gestor de traducciones
-Proporciona funciones de acceso a las traducciones del idioma activo
+Proporciona funciones de acceso a las traducciones del idioma de cada petición
+
+El idioma se elige en cada petición a partir de la cabecera Accept-Language
+entre AVAILABLE_LANGUAGES; si ninguno coincide, o fuera de una petición, se
+usa ACTIVE_LANGUAGE. Cada módulo de idioma (app/languages/<código>.py) se
+importa la primera vez que se usa y sus mensajes se compilan a plantillas ya
+analizadas, de modo que get_error y get_text no vuelven a analizar el texto
+en cada llamada.
 """
-from .languages import es
-from .config import ACTIVE_LANGUAGE, AVAILABLE_LANGUAGES
+import importlib
+import threading
+from functools import lru_cache
+from string import Formatter
 
-# Mapeo de códigos de idioma a módulos de traducción
-# Se construye dinámicamente basado en AVAILABLE_LANGUAGES de config.py
-LANGUAGE_MODULES = {
-    'es': es,
-}
+from flask import g, has_request_context, request
 
-# Obtener el módulo de traducción del idioma activo
-_current_language = LANGUAGE_MODULES.get(ACTIVE_LANGUAGE, es)
+from .config import ACTIVE_LANGUAGE, AVAILABLE_LANGUAGES
 
-# Importar todas las traducciones del idioma activo
-ERRORS = _current_language.ERRORS
-MESSAGES = _current_language.MESSAGES
-BMI_COMPLETE_DESCRIPTIONS = _current_language.BMI_COMPLETE_DESCRIPTIONS
-BMI_DESCRIPTIONS = _current_language.BMI_DESCRIPTIONS
-DAYS_TEXT_MAP = _current_language.DAYS_TEXT_MAP
-DAYS_TEXT_TEMPLATE = _current_language.DAYS_TEXT_TEMPLATE
-TEXTS = _current_language.TEXTS
-FRONTEND_MESSAGES = _current_language.FRONTEND_MESSAGES
-HTML_TEXTS = _current_language.HTML_TEXTS
+# Textos de días transcurridos que se conservan ya formateados (por idioma y días)
+DAYS_TEXT_CACHE_SIZE = 1024
+
+_FORMATTER = Formatter()
+_CONVERSIONS = {'r': repr, 's': str, 'a': ascii}
+
+
+class MessageTemplate:
+    """Mensaje con marcadores {nombre} analizado una sola vez
+
+    format() concatena los fragmentos literales con los valores formateados,
+    con el mismo resultado que str.format pero sin analizar de nuevo el
+    texto. Los marcadores que no son un nombre simple (posicionales,
+    atributos, índices o especificaciones anidadas) se formatean con str.format.
+    """
+
+    __slots__ = ('text', '_parts')
+
+    def __init__(self, text: str):
+        self.text = text
+        parts = []
+        for literal, field, spec, conversion in _FORMATTER.parse(text):
+            if field is not None and (not field.isidentifier() or '{' in spec):
+                parts = None
+                break
+            parts.append((literal, field, spec, _CONVERSIONS[conversion] if conversion else None))
+        self._parts = parts
+
+    def format(self, values: dict) -> str:
+        if self._parts is None:
+            return self.text.format(**values)
+        pieces = []
+        for literal, field, spec, conversion in self._parts:
+            pieces.append(literal)
+            if field is not None:
+                value = values[field]
+                if conversion is not None:
+                    value = conversion(value)
+                pieces.append(format(value, spec))
+        return ''.join(pieces)
+
+
+class Catalog:
+    """Traducciones de un idioma, con los mensajes con marcadores ya compilados"""
+
+    def __init__(self, language: str, module):
+        self.language = language
+        self.module = module
+        self.errors = {key: MessageTemplate(text) for key, text in module.ERRORS.items()}
+        self.texts = {key: MessageTemplate(text) for key, text in module.TEXTS.items()}
+        self.messages = module.MESSAGES
+        self.bmi_descriptions = module.BMI_DESCRIPTIONS
+        self.bmi_complete_descriptions = module.BMI_COMPLETE_DESCRIPTIONS
+        self.days_text_map = module.DAYS_TEXT_MAP
+        self.days_text_template = MessageTemplate(module.DAYS_TEXT_TEMPLATE)
+        self.frontend_messages = module.FRONTEND_MESSAGES
+        self.html_texts = module.HTML_TEXTS
+
+
+_catalogs = {}  # {código de idioma: Catalog}
+_catalogs_lock = threading.Lock()
+
+
+def get_catalog(language=None):
+    """Traducciones del idioma indicado (por defecto, el de la petición actual)"""
+    if language is None:
+        language = get_language()
+    catalog = _catalogs.get(language)
+    if catalog is None:
+        with _catalogs_lock:
+            catalog = _catalogs.get(language)
+            if catalog is None:
+                module = importlib.import_module(f"{__package__}.languages.{language}")
+                catalog = _catalogs[language] = Catalog(language, module)
+    return catalog
+
+
+def get_language():
+    """Idioma de la petición actual según Accept-Language (se resuelve una vez por petición)"""
+    if not has_request_context():
+        return ACTIVE_LANGUAGE
+    language = g.get('language')
+    if language is None:
+        language = request.accept_languages.best_match(AVAILABLE_LANGUAGES, default=ACTIVE_LANGUAGE)
+        g.language = language
+    return language
+
+
+def is_multilingual():
+    """Indica si la misma URL puede responder en más de un idioma"""
+    return len(AVAILABLE_LANGUAGES) > 1
+
+
+def __getattr__(name):
+    # Compatibilidad: ERRORS, MESSAGES, HTML_TEXTS, etc. del idioma por defecto
+    if name.isupper():
+        module = get_catalog(ACTIVE_LANGUAGE).module
+        if hasattr(module, name):
+            return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_error(key, **kwargs):
     """Obtiene un mensaje de error formateado"""
-    message = ERRORS.get(key, key)
+    template = get_catalog().errors.get(key)
+    if template is None:
+        return key
     if kwargs:
-        return message.format(**kwargs)
-    return message
+        return template.format(kwargs)
+    return template.text
 
 
 def get_message(key):
     """Obtiene un mensaje de éxito"""
-    return MESSAGES.get(key, key)
+    return get_catalog().messages.get(key, key)
 
 
 def get_bmi_description(key):
     """Obtiene la descripción de BMI (clasificación)"""
-    return BMI_DESCRIPTIONS.get(key, key)
+    return get_catalog().bmi_descriptions.get(key, key)
 
 
 def get_bmi_complete_description(key):
     """Obtiene la descripción completa de BMI (clasificación + descripción detallada)"""
-    return BMI_COMPLETE_DESCRIPTIONS.get(key, "")
+    return get_catalog().bmi_complete_descriptions.get(key, "")
 
 
 def get_days_text(days):
     """Obtiene el texto de días transcurridos"""
-    return DAYS_TEXT_MAP.get(days, DAYS_TEXT_TEMPLATE.format(days=days))
+    return _days_text(get_language(), days)
+
+
+@lru_cache(maxsize=DAYS_TEXT_CACHE_SIZE)
+def _days_text(language, days):
+    catalog = get_catalog(language)
+    text = catalog.days_text_map.get(days)
+    if text is None:
+        text = catalog.days_text_template.format({'days': days})
+    return text
 
 
 def get_text(key, **kwargs):
     """Obtiene un texto general formateado"""
-    message = TEXTS.get(key, key)
+    template = get_catalog().texts.get(key)
+    if template is None:
+        return key
     if kwargs:
-        return message.format(**kwargs)
-    return message
+        return template.format(kwargs)
+    return template.text
 
 
 def get_frontend_messages():
     """Obtiene todos los mensajes para el frontend"""
-    return FRONTEND_MESSAGES
+    return get_catalog().frontend_messages
+
+
+def get_html_texts():
+    """Obtiene los textos de la interfaz HTML"""
+    return get_catalog().html_texts
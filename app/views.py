@@ -2,18 +2,48 @@
 Blueprint para las rutas de vistas (frontend)
 Maneja las páginas HTML y la interfaz de usuario
 """
-from flask import render_template, Blueprint
-from .translations import HTML_TEXTS
-from .config import ACTIVE_LANGUAGE, AVAILABLE_LANGUAGES
+import os
+
+from flask import current_app, render_template, Blueprint
+from .translations import get_catalog, get_html_texts, get_language, is_multilingual
+from .config import AVAILABLE_LANGUAGES
+from .precomputed import PrecomputedPage
 
 views = Blueprint('views', __name__)
 
+INDEX_TEMPLATE = 'index.html'
+
+_INDEX_PAGES = {}  # {idioma: PrecomputedPage}
+
+
+def _render_index(language):
+    """Renderiza la página principal de un idioma"""
+    html = render_template(INDEX_TEMPLATE,
+                           html_texts=get_html_texts(),
+                           active_language=language,
+                           available_languages=AVAILABLE_LANGUAGES)
+    sources = [os.path.join(current_app.root_path, current_app.template_folder, INDEX_TEMPLATE)]
+    # Los textos salen del módulo del idioma (si es un fichero)
+    module_file = getattr(get_catalog(language).module, '__file__', None)
+    if module_file:
+        sources.append(module_file)
+    return PrecomputedPage(html, sources)
+
 
 @views.route('/')
 def index():
-    """Página principal de la aplicación"""
-    return render_template('index.html', 
-                         html_texts=HTML_TEXTS, 
-                         active_language=ACTIVE_LANGUAGE,
-                         available_languages=AVAILABLE_LANGUAGES)
+    """Página principal de la aplicación, en el idioma de la petición
 
+    El HTML solo depende del idioma: se renderiza una vez por idioma y se sirve
+    desde memoria con ETag y Last-Modified, sin trabajo de Jinja. Con recarga
+    de plantillas (modo debug) se vuelve a renderizar cuando cambia la fecha de
+    modificación de la plantilla; en producción queda fija hasta reiniciar.
+    """
+    language = get_language()
+    page = _INDEX_PAGES.get(language)
+    if page is None or (current_app.jinja_env.auto_reload and page.is_stale()):
+        page = _INDEX_PAGES[language] = _render_index(language)
+    response = page.make_response()
+    if is_multilingual():
+        response.vary.add('Accept-Language')
+    return response
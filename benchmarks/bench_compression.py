@@ -0,0 +1,85 @@
+"""
+Benchmark de compresión de respuestas
+Para cada endpoint mide el tamaño sin comprimir, el tamaño con gzip y brotli
+(si está instalado) y el tiempo de CPU que cuesta comprimir cada respuesta,
+con los niveles de COMPRESSION_CONFIG.
+
+Uso:
+    python -m benchmarks.bench_compression [--days 1825] [--repeat 20]
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+from app import create_app
+from app.compression import available_encodings, compress_bytes
+from app.config import COMPRESSION_CONFIG
+from app.storage import MemoryStorage, UserData, WeightEntryData
+
+
+ENDPOINTS = [
+    '/api/imc',
+    '/api/stats',
+    '/api/config',
+    '/api/messages',
+    '/api/weights?limit=50',
+    '/api/weights',
+    '/api/bootstrap',
+    '/api/weights/export?format=ndjson',
+    '/api/weights/export?format=csv',
+]
+
+
+def build_app(days):
+    """Aplicación con un usuario y un registro diario durante days días"""
+    storage = MemoryStorage()
+    storage.save_user(UserData(user_id=1, first_name="Juan", last_name="Pérez García",
+                               birth_date=date(1990, 5, 15), height_m=1.75))
+    base_date = datetime.now() - timedelta(days=days)
+    storage.add_weight_entries([
+        WeightEntryData(entry_id=0, user_id=1, weight_kg=round(70 + (i % 90) / 10, 1),
+                        recorded_date=base_date + timedelta(days=i, minutes=i % 120))
+        for i in range(days)
+    ])
+    return create_app(storage=storage)
+
+
+def _cpu_per_call(function, repeat):
+    start = time.process_time()
+    for _ in range(repeat):
+        function()
+    return (time.process_time() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--days', type=int, default=5 * 365)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # El cliente de pruebas no envía Accept-Encoding: las respuestas llegan sin comprimir
+    client = build_app(args.days).test_client()
+    encodings = available_encodings()
+    print(f"Historial: {args.days:,} días; umbral {COMPRESSION_CONFIG['min_size']} bytes; "
+          f"gzip nivel {COMPRESSION_CONFIG['gzip_level']}, brotli calidad {COMPRESSION_CONFIG['brotli_quality']}")
+    header = f"{'Endpoint':<36} {'Original':>10}"
+    for encoding in encodings:
+        header += f" {encoding:>10} {'ahorro':>7} {'CPU ms':>8}"
+    print(header)
+
+    for url in ENDPOINTS:
+        body = client.get(url).get_data()
+        line = f"{url:<36} {len(body):>10,}"
+        if len(body) < COMPRESSION_CONFIG['min_size']:
+            print(line + "   (bajo el umbral: se envía sin comprimir)")
+            continue
+        for encoding in encodings:
+            compressed = compress_bytes(body, encoding, COMPRESSION_CONFIG)
+            cpu = _cpu_per_call(lambda: compress_bytes(body, encoding, COMPRESSION_CONFIG), args.repeat)
+            saved = 1 - len(compressed) / len(body)
+            line += f" {len(compressed):>10,} {saved:>6.0%} {cpu * 1000:>8.2f}"
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark de throughput de /api/imc/batch
+Mide mediciones por segundo del cálculo punto a punto (calculate_bmi y
+get_bmi_description por medición), del cálculo vectorizado del endpoint y de
+la petición completa, incluida la lectura y la serialización del JSON.
+
+Uso:
+    python -m benchmarks.bench_imc_batch [--measurements 100000] [--repeat 10]
+"""
+import argparse
+import random
+import time
+
+from app import create_app
+from app.config import VALIDATION_LIMITS
+from app.helpers import calculate_bmi, get_bmi_description
+from app.routes import _float_column, _imc_batch_payload
+
+
+def build_batch(count):
+    rng = random.Random(0)
+    return {
+        "peso_kg": [round(rng.uniform(40, 160), 1) for _ in range(count)],
+        "talla_m": [round(rng.uniform(1.4, 2.1), 2) for _ in range(count)],
+    }
+
+
+def batch_loop(batch):
+    """Camino punto a punto, con la misma validación que el endpoint"""
+    results = []
+    for weight_kg, height_m in zip(batch["peso_kg"], batch["talla_m"]):
+        if not (VALIDATION_LIMITS["weight_min"] <= weight_kg <= VALIDATION_LIMITS["weight_max"]
+                and VALIDATION_LIMITS["height_min"] <= height_m <= VALIDATION_LIMITS["height_max"]):
+            results.append(None)
+            continue
+        bmi = calculate_bmi(weight_kg, height_m)
+        results.append((bmi, get_bmi_description(bmi)))
+    return results
+
+
+def _time_per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--measurements', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    batch = build_batch(args.measurements)
+    app = create_app()
+    client = app.test_client()
+    headers = {'Accept-Encoding': 'identity'}
+
+    def vectorized():
+        with app.app_context():
+            _imc_batch_payload(_float_column(batch["peso_kg"]), _float_column(batch["talla_m"]))
+
+    timings = [
+        ("Punto a punto", _time_per_call(lambda: batch_loop(batch), args.repeat)),
+        ("Vectorizado", _time_per_call(vectorized, args.repeat)),
+        ("POST /api/imc/batch", _time_per_call(
+            lambda: client.post('/api/imc/batch', json=batch, headers=headers).get_data(), args.repeat
+        )),
+    ]
+
+    print(f"Mediciones por petición: {args.measurements:,}")
+    for name, elapsed in timings:
+        print(f"{name:<20} {elapsed * 1000:9.2f} ms  {args.measurements / elapsed:14,.0f} mediciones/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark del historial de IMC
+Compara el cálculo punto a punto (calculate_bmi y clasificación con las
+traducciones en cada pesaje) con el vectorizado de /api/imc/history, y mide
+la respuesta completa del endpoint.
+
+Uso:
+    python -m benchmarks.bench_imc_history [--entries 100000] [--repeat 20]
+"""
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+from app import create_app
+from app.analytics import iso_dates
+from app.config import USER_ID
+from app.helpers import BMI_CATEGORY_KEYS, BMI_THRESHOLDS, calculate_bmi, calculate_bmi_array, \
+    classify_bmi_array, bmi_category_labels
+from app.storage import MICROSECONDS_PER_DAY, MemoryStorage, UserData, WeightEntryData
+from app.translations import get_bmi_description as get_bmi_label
+
+HEIGHT_M = 1.75
+
+
+def build_storage(count):
+    storage = MemoryStorage()
+    storage.save_user(UserData(user_id=USER_ID, first_name="Juan", last_name="Pérez",
+                               birth_date=date(1990, 5, 15), height_m=HEIGHT_M))
+    base_date = datetime(1800, 1, 1, 8, 30)
+    storage.add_weight_entries([
+        WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=50.0 + (i % 900) / 10,
+                        recorded_date=base_date + timedelta(days=i))
+        for i in range(count)
+    ])
+    return storage
+
+
+def history_loop(storage):
+    """Camino punto a punto: una entrada, un cálculo y una traducción por pesaje"""
+    result = []
+    for entry in storage.get_all_weight_entries(USER_ID):
+        bmi = calculate_bmi(entry.weight_kg, HEIGHT_M)
+        key = BMI_CATEGORY_KEYS[sum(bmi >= threshold for threshold in BMI_THRESHOLDS)]
+        result.append((entry.recorded_date.date().isoformat(), bmi, get_bmi_label(key)))
+    return result
+
+
+def history_vectorized(storage):
+    """Camino de /api/imc/history sin la serialización JSON"""
+    timestamps, weights = storage.get_weight_series(USER_ID)
+    bmi = calculate_bmi_array(np.frombuffer(weights, dtype=np.float64), HEIGHT_M)
+    categories = bmi_category_labels()[classify_bmi_array(bmi)]
+    days = np.frombuffer(timestamps, dtype=np.int64) // MICROSECONDS_PER_DAY
+    return iso_dates(days), bmi.tolist(), categories.tolist()
+
+
+def _time_per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    storage = build_storage(args.entries)
+    client = create_app(storage).test_client()
+    headers = {'Accept-Encoding': 'identity'}
+
+    print(f"Pesajes: {args.entries:,}")
+    loop = _time_per_call(lambda: history_loop(storage), max(1, args.repeat // 10))
+    vectorized = _time_per_call(lambda: history_vectorized(storage), args.repeat)
+    endpoint = _time_per_call(lambda: client.get('/api/imc/history', headers=headers).get_data(),
+                              args.repeat)
+    print(f"Punto a punto          {loop * 1000:8.2f} ms")
+    print(f"Vectorizado            {vectorized * 1000:8.2f} ms  ({loop / vectorized:.0f}x)")
+    print(f"GET /api/imc/history   {endpoint * 1000:8.2f} ms  (incluye la serialización JSON)")
+
+
+if __name__ == '__main__':
+    main()
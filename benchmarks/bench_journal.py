@@ -0,0 +1,92 @@
+"""
+Benchmark de latencia de escritura del almacenamiento journal
+Compara la escritura síncrona (cada registro en disco antes de volver, con
+group commit entre hilos) con el modo write-behind, sobre un disco simulado
+con una latencia fija por fsync.
+
+Uso:
+    python -m benchmarks.bench_journal [--writes 2000] [--threads 8] [--fsync-ms 5]
+        [--flush-interval 0.05] [--max-batch 1000]
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import journal
+from app.journal import JournaledMemoryStorage
+from app.storage import WeightEntryData
+
+
+def slow_fsync(delay):
+    """os.fsync con una latencia adicional fija, como la de un disco lento"""
+    original = os.fsync
+
+    def fsync(fd):
+        time.sleep(delay)
+        original(fd)
+    return fsync
+
+
+def measure(directory, writes, threads, flush_interval, max_batch):
+    """Latencias (ms) de add_weight_entry y número de fsync realizados"""
+    storage = JournaledMemoryStorage(directory, compaction_interval=0,
+                                     flush_interval=flush_interval, max_batch=max_batch)
+    fsync = journal.os.fsync
+    fsync_count = [0]
+
+    def counting_fsync(fd):
+        fsync_count[0] += 1
+        fsync(fd)
+    journal.os.fsync = counting_fsync
+    base_date = datetime(2000, 1, 1, 8, 0)
+
+    def write(index):
+        entry = WeightEntryData(entry_id=0, user_id=index % 1000 + 1, weight_kg=70.0,
+                                recorded_date=base_date + timedelta(days=index // 1000))
+        start = time.perf_counter()
+        storage.add_weight_entry(entry)
+        return (time.perf_counter() - start) * 1000
+
+    try:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = sorted(pool.map(write, range(writes)))
+        start = time.perf_counter()
+        storage.close()
+        close_time = time.perf_counter() - start
+    finally:
+        journal.os.fsync = fsync
+    return latencies, fsync_count[0], close_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--writes', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--fsync-ms', type=float, default=5, help="latencia simulada de cada fsync")
+    parser.add_argument('--flush-interval', type=float, default=0.05, help="segundos (modo write-behind)")
+    parser.add_argument('--max-batch', type=int, default=1000)
+    args = parser.parse_args()
+
+    original_fsync = journal.os.fsync
+    journal.os.fsync = slow_fsync(args.fsync_ms / 1000)
+    try:
+        print(f"Escrituras: {args.writes:,}, hilos: {args.threads}, fsync: {args.fsync_ms} ms")
+        print(f"{'Modo':<24} {'p50 (ms)':>9} {'p99 (ms)':>9} {'fsync':>7} {'close (ms)':>11}")
+        for name, flush_interval in [("síncrono", 0),
+                                     (f"write-behind ({args.flush_interval} s)", args.flush_interval)]:
+            with tempfile.TemporaryDirectory() as directory:
+                latencies, fsyncs, close_time = measure(directory, args.writes, args.threads,
+                                                        flush_interval, args.max_batch)
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            print(f"{name:<24} {statistics.median(latencies):>9.3f} {p99:>9.3f} {fsyncs:>7}"
+                  f" {close_time * 1000:>11.1f}")
+    finally:
+        journal.os.fsync = original_fsync
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Benchmark de serialización JSON de listas de pesos
+Mide el camino real de GET /api/weights para cada almacenamiento: leer el
+historial con get_all_weight_entries, formar el contenido de la respuesta y
+serializarlo. Compara el camino anterior (isoformat() y proveedor JSON
+estándar de Flask) con el actual (recorded_date_iso y OrjsonProvider si orjson
+está instalado).
+
+MemoryStorage (y journal) crea un WeightEntryData nuevo en cada lectura, por lo
+que recorded_date_iso formatea la fecha igual que isoformat() y la mejora se
+debe solo a orjson; SqliteStorage devuelve la fecha ISO tal como la guarda.
+
+Uso:
+    python -m benchmarks.bench_json [--entries 10000] [--repeat 50]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.json_provider import OrjsonProvider, orjson_available
+from app.routes import _weight_payload
+from app.sqlite_storage import SqliteStorage
+from app.storage import MemoryStorage, WeightEntryData
+
+USER_ID = 1
+
+
+def build_entries(count):
+    base_date = datetime(2000, 1, 1, 8, 30)
+    return [
+        WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + (i % 200) / 10,
+                        recorded_date=base_date + timedelta(days=i, seconds=i % 3600))
+        for i in range(count)
+    ]
+
+
+def payload_isoformat(storage):
+    """Camino anterior: isoformat() en cada serialización"""
+    return {"weights": [
+        {"id": e.entry_id, "peso_kg": e.weight_kg, "fecha_registro": e.recorded_date.isoformat()}
+        for e in storage.get_all_weight_entries(USER_ID)
+    ]}
+
+
+def payload_current(storage):
+    """Camino actual: el mismo contenido que GET /api/weights"""
+    return {"weights": [_weight_payload(e) for e in storage.get_all_weight_entries(USER_ID)]}
+
+
+def _time_per_call(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=10_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    providers = [("estándar", DefaultJSONProvider(app))]
+    if orjson_available():
+        providers.append(("orjson", OrjsonProvider(app)))
+    else:
+        print("orjson no está instalado: solo se mide el proveedor estándar")
+
+    print(f"Entradas: {args.entries:,}")
+    with tempfile.TemporaryDirectory() as directory:
+        backends = [("memory", MemoryStorage()),
+                    ("sqlite", SqliteStorage(os.path.join(directory, "bench.db")))]
+        with app.app_context():
+            for backend_name, storage in backends:
+                storage.add_weight_entries(build_entries(args.entries))
+                print(f"\nAlmacenamiento: {backend_name}")
+                baseline = None
+                for payload_name, build_payload in [("isoformat()", payload_isoformat),
+                                                    ("recorded_date_iso", payload_current)]:
+                    for provider_name, provider in providers:
+                        elapsed = _time_per_call(
+                            lambda: provider.response(build_payload(storage)).get_data(), args.repeat
+                        )
+                        baseline = baseline or elapsed
+                        print(f"{payload_name:<17} + {provider_name:<9} {elapsed * 1000:8.2f} ms"
+                              f"  ({elapsed / baseline:5.0%} del camino anterior)")
+                if hasattr(storage, 'close'):
+                    storage.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark de memoria del historial de pesos
+Compara los bytes por registro de la disposición anterior (lista global de
+WeightEntryData) con el historial columnar de MemoryStorage.
+
+Uso:
+    python -m benchmarks.bench_memory [--entries 1000000] [--users 1000]
+"""
+import argparse
+import gc
+import tracemalloc
+from datetime import datetime, timedelta
+
+from app.storage import MemoryStorage, WeightEntryData
+
+
+def _dates(entries, users):
+    """Genera (user_id, fecha) con un registro diario por usuario"""
+    days_per_user = entries // users
+    base_date = datetime(2000, 1, 1, 8, 30)
+    for user_id in range(1, users + 1):
+        for day in range(days_per_user):
+            yield user_id, base_date + timedelta(days=day, minutes=user_id % 60)
+
+
+def _measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return data, after - before
+
+
+def build_object_list(entries, users):
+    """Disposición anterior: una lista de objetos WeightEntryData"""
+    return [
+        WeightEntryData(entry_id=i, user_id=user_id, weight_kg=70.0 + (i % 200) / 10,
+                        recorded_date=recorded_date)
+        for i, (user_id, recorded_date) in enumerate(_dates(entries, users), start=1)
+    ]
+
+
+def build_columnar_storage(entries, users):
+    """Disposición actual: historial columnar por usuario en MemoryStorage"""
+    storage = MemoryStorage()
+    for i, (user_id, recorded_date) in enumerate(_dates(entries, users), start=1):
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=user_id,
+                                                 weight_kg=70.0 + (i % 200) / 10,
+                                                 recorded_date=recorded_date))
+    return storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1_000)
+    args = parser.parse_args()
+    entries = (args.entries // args.users) * args.users
+
+    print(f"Registros: {entries:,} ({args.users:,} usuarios)")
+    for name, build in [("Lista de WeightEntryData", build_object_list),
+                        ("Historial columnar", build_columnar_storage)]:
+        data, size = _measure(lambda: build(entries, args.users))
+        print(f"{name:<28} {size / 2**20:9.1f} MiB  {size / entries:7.1f} bytes/registro")
+        del data
+
+
+if __name__ == '__main__':
+    main()
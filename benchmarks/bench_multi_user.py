@@ -0,0 +1,94 @@
+"""
+Benchmark de latencia por petición en modo multiusuario
+Carga de 1 a 100.000 usuarios con historial y mide la latencia (p50 y p99)
+de una mezcla de lecturas y escrituras de usuarios aleatorios, con varios
+hilos a la vez, para comprobar que no crece con el número de usuarios.
+
+Uso:
+    python -m benchmarks.bench_multi_user [--users 1,100,10000,100000] [--weights 10]
+        [--requests 4000] [--threads 8] [--partitions 64]
+"""
+import argparse
+import json
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+
+from app import create_app
+from app.config import MULTI_USER_CONFIG
+from app.storage import MemoryStorage, UserData, WeightEntryData
+
+DEFAULT_USERS = "1,10,100,1000,10000,100000"
+
+
+def build_storage(users, weights_per_user, partitions):
+    storage = MemoryStorage(partitions)
+    base_date = datetime.now().replace(hour=8, minute=0, second=0, microsecond=0) - timedelta(days=weights_per_user)
+    for user_id in range(1, users + 1):
+        storage.save_user(UserData(user_id=user_id, first_name="Usuario", last_name=str(user_id),
+                                   birth_date=date(1980, 1, 1), height_m=1.75))
+        storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=user_id, weight_kg=70.0 + (day % 5) / 10,
+                            recorded_date=base_date + timedelta(days=day))
+            for day in range(weights_per_user)
+        ])
+    return storage
+
+
+def run_requests(app, users, count, threads):
+    """Lanza count peticiones repartidas entre threads hilos; devuelve las latencias en ms"""
+    header = MULTI_USER_CONFIG["user_header"]
+    weight_body = json.dumps({"peso_kg": 70.2})
+    local = threading.local()
+
+    def request(seed):
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = app.test_client()
+        rng = random.Random(seed)
+        headers = {header: str(rng.randint(1, users))}
+        kind = rng.random()
+        start = time.perf_counter()
+        if kind < 0.1:
+            response = client.post('/api/weight', data=weight_body, content_type='application/json',
+                                   headers=headers)
+        elif kind < 0.55:
+            response = client.get('/api/stats', headers=headers)
+        else:
+            response = client.get('/api/imc', headers=headers)
+        response.get_data()
+        return (time.perf_counter() - start) * 1000
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(request, range(count)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--users', default=DEFAULT_USERS, help="números de usuarios separados por comas")
+    parser.add_argument('--weights', type=int, default=10, help="pesajes por usuario")
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--partitions', type=int, default=64)
+    args = parser.parse_args()
+
+    MULTI_USER_CONFIG["enabled"] = True
+    print(f"Pesajes por usuario: {args.weights}, peticiones: {args.requests:,}, "
+          f"hilos: {args.threads}, particiones: {args.partitions}")
+    print(f"{'Usuarios':>9} {'Carga (s)':>10} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for users in (int(value) for value in args.users.split(',')):
+        start = time.perf_counter()
+        storage = build_storage(users, args.weights, args.partitions)
+        load_time = time.perf_counter() - start
+        app = create_app(storage)
+        run_requests(app, users, args.requests // 10, args.threads)  # calentamiento
+        latencies = sorted(run_requests(app, users, args.requests, args.threads))
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{users:>9,} {load_time:>10.1f} {statistics.median(latencies):>9.3f} {p99:>9.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de guardado y carga de snapshots del almacenamiento
+Compara el snapshot JSON anterior (una entrada serializada por registro) con
+el snapshot binario columnar de MemoryStorage.dump()/load(): tiempo de
+guardado, tiempo de carga y tamaño del fichero.
+
+Uso:
+    python -m benchmarks.bench_snapshot [--entries 1000000] [--users 1000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+from app.storage import MemoryStorage, UserData, WeightEntryData
+
+
+def build_storage(entries, users):
+    storage = MemoryStorage()
+    days_per_user = entries // users
+    base_date = datetime(2000, 1, 1, 8, 30)
+    for user_id in range(1, users + 1):
+        storage.save_user(UserData(user_id=user_id, first_name="Usuario", last_name=str(user_id),
+                                   birth_date=date(1980, 1, 1), height_m=1.75))
+        storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=user_id, weight_kg=70.0 + (day % 200) / 10,
+                            recorded_date=base_date + timedelta(days=day, minutes=user_id % 60))
+            for day in range(days_per_user)
+        ])
+    return storage
+
+
+def dump_json(storage, users, path):
+    """Snapshot anterior: usuarios y entradas como diccionarios JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'sequence': 0,
+            'next_entry_id': storage._entry_ids.next_id,
+            'users': [storage.get_user(user_id).to_dict() for user_id in range(1, users + 1)],
+            'weight_entries': [entry.to_dict() for user_id in range(1, users + 1)
+                               for entry in storage.get_all_weight_entries(user_id)],
+        }, f, separators=(',', ':'))
+
+
+def load_json(path):
+    storage = MemoryStorage()
+    with open(path, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    for user_data in snapshot['users']:
+        storage.save_user(UserData.from_dict(user_data))
+    for entry_data in snapshot['weight_entries']:
+        storage._restore_weight_entry(WeightEntryData.from_dict(entry_data))
+    return storage
+
+
+def load_binary(path):
+    storage = MemoryStorage()
+    storage.load(path)
+    return storage
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--entries', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--skip-json', action='store_true', help="no medir el snapshot JSON (lento)")
+    args = parser.parse_args()
+
+    storage = build_storage(args.entries, args.users)
+    entries = sum(storage.get_weight_count(user_id) for user_id in range(1, args.users + 1))
+    print(f"Entradas: {entries:,}, usuarios: {args.users:,}")
+    print(f"{'Formato':<8} {'Guardado (s)':>13} {'Carga (s)':>10} {'Tamaño (MB)':>12}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        formats = [('binario', storage.dump, load_binary, 'snapshot.bin')]
+        if not args.skip_json:
+            formats.append(('JSON', lambda path: dump_json(storage, args.users, path),
+                            load_json, 'snapshot.json'))
+        for name, dump, load, filename in formats:
+            path = os.path.join(directory, filename)
+            _, dump_time = _timed(dump, path)
+            restored, load_time = _timed(load, path)
+            assert restored.get_weight_count(args.users) == storage.get_weight_count(args.users)
+            size = os.path.getsize(path) / 1e6
+            print(f"{name:<8} {dump_time:>13.3f} {load_time:>10.3f} {size:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
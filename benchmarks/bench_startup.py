@@ -0,0 +1,112 @@
+"""
+Benchmark de arranque en frío de la aplicación
+Mide, en procesos nuevos, el tiempo de importar app, de create_app() y de
+servir la primera petición, junto con el de una aplicación Flask vacía en el
+mismo equipo. El presupuesto se aplica a la diferencia (el coste propio de la
+aplicación sobre Flask), que no depende de la velocidad de la máquina: el
+script termina con código 1 si la mediana lo supera. Antes de medir compila
+los módulos de app, como están en una imagen desplegada, para no medir la
+compilación a bytecode de una copia recién descargada (el paso de CI lo
+ejecuta así tras los tests).
+
+Uso:
+    python -m benchmarks.bench_startup [--runs 7] [--path /] [--budget-ms 30]
+"""
+import argparse
+import compileall
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# Presupuesto del coste de arranque sobre Flask (mediana de importación +
+# create_app() + primera petición GET /). Tanto el árbol anterior a la
+# optimización del arranque como el actual miden unos 19 ms de mediana sobre
+# Flask en la máquina de desarrollo, con oscilaciones de ±5 ms entre
+# ejecuciones; el margen restante detecta cualquier módulo o registro nuevo
+# que se cargue al arrancar.
+STARTUP_OVERHEAD_BUDGET_MS = 30
+
+# Se ejecutan en un intérprete nuevo para que ningún módulo esté ya cargado
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+application = create_app()
+created = time.perf_counter()
+response = application.test_client().get(sys.argv[1])
+response.get_data()
+served = time.perf_counter()
+assert response.status_code < 400, response.status_code
+print(json.dumps({
+    "import": (imported - start) * 1000,
+    "create_app": (created - imported) * 1000,
+    "first_request": (served - created) * 1000,
+    "total": (served - start) * 1000,
+    "numpy": "numpy" in sys.modules,
+}))
+"""
+
+_BARE_FLASK_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+from flask import Flask
+application = Flask(__name__)
+application.add_url_rule(sys.argv[1], 'index', lambda: 'ok')
+application.test_client().get(sys.argv[1]).get_data()
+print(json.dumps({"total": (time.perf_counter() - start) * 1000}))
+"""
+
+PHASES = ("import", "create_app", "first_request", "total")
+
+
+def _run_child(code, path):
+    output = subprocess.run([sys.executable, '-c', code, path], check=True, cwd=PROJECT_ROOT,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def measure(path):
+    """Mide un arranque de la aplicación y uno de Flask vacío (en ese orden)"""
+    result = _run_child(_CHILD, path)
+    result["flask"] = _run_child(_BARE_FLASK_CHILD, path)["total"]
+    result["overhead"] = result["total"] - result["flask"]
+    return result
+
+
+def median_overhead(runs, path='/'):
+    """Mediana del coste de arranque de la aplicación sobre Flask, en ms"""
+    return statistics.median(measure(path)["overhead"] for _ in range(runs))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--path', default='/', help="ruta de la primera petición")
+    parser.add_argument('--budget-ms', type=float, default=STARTUP_OVERHEAD_BUDGET_MS,
+                        help="presupuesto del coste sobre Flask")
+    args = parser.parse_args()
+
+    # Calentamiento: bytecode de app en __pycache__ aunque PYTHONDONTWRITEBYTECODE esté activo
+    compileall.compile_dir(PROJECT_ROOT / 'app', quiet=1)
+    results = [measure(args.path) for _ in range(args.runs)]
+    print(f"Primera petición: GET {args.path}, ejecuciones: {args.runs}"
+          f", NumPy cargado: {'sí' if results[0]['numpy'] else 'no'}")
+    print(f"{'Fase':<14} {'Mediana (ms)':>13} {'Mínimo (ms)':>12}")
+    for phase in PHASES + ("flask", "overhead"):
+        values = [result[phase] for result in results]
+        print(f"{phase:<14} {statistics.median(values):>13.1f} {min(values):>12.1f}")
+
+    overhead = statistics.median(result["overhead"] for result in results)
+    if overhead > args.budget_ms:
+        print(f"Coste sobre Flask de {overhead:.1f} ms: supera el presupuesto de {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"Coste sobre Flask dentro del presupuesto de {args.budget_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark de formateo de mensajes traducidos
+Compara str.format sobre el texto del idioma (implementación anterior) con
+las plantillas precompiladas de translations, get_error completo (incluye
+elegir el catálogo del idioma) y get_days_text con y sin la caché LRU.
+
+Uso:
+    python -m benchmarks.bench_translations [--calls 200000]
+"""
+import argparse
+import time
+
+from app import translations
+from app.translations import get_catalog, get_days_text, get_error
+
+VARIATION_VALUES = {"days_text": "3 días", "max_allowed_difference": 15.0, "weight_difference": 16.2}
+
+
+def _time_per_call(function, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=200_000)
+    args = parser.parse_args()
+
+    catalog = get_catalog()  # carga el idioma antes de medir
+    variation = catalog.errors["weight_variation_exceeded"]
+    too_many = catalog.errors["too_many_entries"]
+    days_text = translations._days_text.__wrapped__
+    cases = [
+        ("weight_variation_exceeded: str.format", lambda: variation.text.format(**VARIATION_VALUES)),
+        ("weight_variation_exceeded: plantilla", lambda: variation.format(VARIATION_VALUES)),
+        ("weight_variation_exceeded: get_error", lambda: get_error("weight_variation_exceeded",
+                                                                   **VARIATION_VALUES)),
+        ("too_many_entries: str.format", lambda: too_many.text.format(max_entries=1000)),
+        ("too_many_entries: plantilla", lambda: too_many.format({"max_entries": 1000})),
+        ("get_days_text(12) sin caché", lambda: days_text(translations.ACTIVE_LANGUAGE, 12)),
+        ("get_days_text(12) con caché", lambda: get_days_text(12)),
+    ]
+    print(f"Llamadas por caso: {args.calls:,}")
+    print(f"{'Caso':<42} {'µs/llamada':>11}")
+    for name, function in cases:
+        print(f"{name:<42} {_time_per_call(function, args.calls):>11.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Configuración de gunicorn
+Con más de un worker, los almacenamientos de un solo proceso (memory, journal)
+se sirven desde un proceso servidor compartido (STORAGE_BACKEND=shared) para
+que todos los workers vean los mismos datos.
+"""
+import os
+import subprocess
+import sys
+import time
+
+bind = "0.0.0.0:5001"
+workers = int(os.environ.get("WEB_CONCURRENCY", 1))
+# Hilos por worker (más de uno usa el worker gthread; el almacenamiento es seguro entre hilos)
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+timeout = 120
+
+# Se ajusta el entorno antes de importar la configuración de la aplicación,
+# ya que los workers heredan los módulos importados por el proceso maestro
+if workers > 1 and os.environ.get("STORAGE_BACKEND", "memory") in ("memory", "journal"):
+    os.environ["STORAGE_SHARED_BACKEND"] = os.environ.get("STORAGE_BACKEND", "memory")
+    os.environ["STORAGE_BACKEND"] = "shared"
+if os.environ.get("STORAGE_BACKEND") == "shared" and not os.environ.get("STORAGE_AUTHKEY"):
+    os.environ["STORAGE_AUTHKEY"] = os.urandom(32).hex()
+
+from app.config import STORAGE_CONFIG  # noqa: E402
+
+_storage_process = None
+
+
+def on_starting(server):
+    """Arranca el proceso servidor de almacenamiento antes que los workers"""
+    global _storage_process
+    if STORAGE_CONFIG["backend"] != "shared":
+        return
+    # Proceso independiente (no un fork del maestro, que heredarían los workers);
+    # recibe la configuración a través de las variables de entorno
+    _storage_process = subprocess.Popen([sys.executable, "-m", "app.storage_server"])
+
+    # Espera a que el socket esté disponible
+    deadline = time.monotonic() + 10
+    while not os.path.exists(STORAGE_CONFIG["socket_path"]) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    server.log.info("Servidor de almacenamiento compartido en %s (backend: %s)",
+                    STORAGE_CONFIG["socket_path"], STORAGE_CONFIG["shared_backend"])
+
+
+def on_exit(server):
+    """Detiene el proceso servidor de almacenamiento"""
+    if _storage_process is not None and _storage_process.poll() is None:
+        _storage_process.terminate()
+        _storage_process.wait(timeout=10)
@@ -4,7 +4,7 @@ Prueban los endpoints sin conocer la implementación interna
 """
 import pytest
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 from tests.backend.conftest import assert_success, assert_created, assert_bad_request, assert_not_found
 
 
@@ -299,6 +299,610 @@ class TestAPIWeights:
         dates = [datetime.fromisoformat(w['fecha_registro']) for w in weights]
         for i in range(len(dates) - 1):
             assert dates[i] >= dates[i + 1], "Los pesos deben estar ordenados por fecha descendente"
+    
+    def _add_days(self, client, days):
+        from datetime import timedelta
+        from app.storage import WeightEntryData
+        base_date = datetime(2024, 3, 1, 9, 30)
+        client.application.storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=1, weight_kg=70.0 + i % 4,
+                            recorded_date=base_date + timedelta(days=i))
+            for i in range(days)
+        ])
+    
+    def test_get_weights_paginated(self, client, sample_user):
+        """Test que limit y cursor recorren todo el historial sin repetir"""
+        self._add_days(client, 25)
+        
+        seen = []
+        url = '/api/weights?limit=10'
+        while True:
+            response = client.get(url)
+            assert_success(response)
+            data = json.loads(response.data)
+            assert len(data['weights']) <= 10
+            seen.extend(w['fecha_registro'] for w in data['weights'])
+            if data['next_cursor'] is None:
+                break
+            url = f"/api/weights?limit=10&cursor={data['next_cursor']}"
+        
+        assert len(seen) == 25
+        assert seen == sorted(seen, reverse=True)
+    
+    def test_get_weights_without_limit_has_no_cursor(self, client, sample_user, sample_weights):
+        """Test que sin limit se devuelven todos los pesos y no hay más páginas"""
+        data = json.loads(client.get('/api/weights').data)
+        assert len(data['weights']) == 3
+        assert data['next_cursor'] is None
+    
+    def test_get_weights_date_range(self, client, sample_user):
+        """Test que from y to incluyen ambos días"""
+        self._add_days(client, 10)
+        
+        response = client.get('/api/weights?from=2024-03-03&to=2024-03-05')
+        assert_success(response)
+        dates = [w['fecha_registro'][:10] for w in json.loads(response.data)['weights']]
+        assert dates == ['2024-03-05', '2024-03-04', '2024-03-03']
+    
+    def test_get_weights_date_range_paginated(self, client, sample_user):
+        """Test que el cursor respeta el rango de fechas"""
+        self._add_days(client, 10)
+        
+        first = json.loads(client.get('/api/weights?from=2024-03-02&to=2024-03-06&limit=3').data)
+        second = json.loads(client.get(
+            f"/api/weights?from=2024-03-02&to=2024-03-06&limit=3&cursor={first['next_cursor']}"
+        ).data)
+        dates = [w['fecha_registro'][:10] for w in first['weights'] + second['weights']]
+        assert dates == ['2024-03-06', '2024-03-05', '2024-03-04', '2024-03-03', '2024-03-02']
+        assert second['next_cursor'] is None
+    
+    @pytest.mark.parametrize('query', [
+        'limit=0', 'limit=abc', 'limit=100000', 'cursor=no-es-un-cursor',
+        'from=2024-13-01', 'to=ayer'
+    ])
+    def test_get_weights_invalid_parameters(self, client, sample_user, query):
+        """Test error con parámetros de paginación o fechas no válidos"""
+        response = client.get(f'/api/weights?{query}')
+        assert_bad_request(response)
+
+
+class TestAPIWeightChanges:
+    """Tests de caja negra para GET /api/weights/changes"""
+    
+    def _post_weight(self, client, peso):
+        response = client.post('/api/weight', data=json.dumps({'peso_kg': peso}),
+                               content_type='application/json')
+        assert_created(response)
+    
+    def test_first_sync_requires_resync(self, client, sample_weights):
+        """Test que sin versión previa se pide la sincronización completa"""
+        response = client.get('/api/weights/changes')
+        assert_success(response)
+        data = json.loads(response.data)
+        assert data['resync_required'] is True
+        assert data['changes'] == []
+        assert data['version'] > 0
+    
+    def test_changes_since_version(self, client, sample_weights):
+        """Test que solo se devuelven los cambios posteriores a la versión"""
+        version = json.loads(client.get('/api/weights/changes').data)['version']
+        self._post_weight(client, 74.0)
+        
+        data = json.loads(client.get(f'/api/weights/changes?since={version}').data)
+        assert data['resync_required'] is False
+        assert [c['peso_kg'] for c in data['changes']] == [74.0]
+        assert set(data['changes'][0].keys()) == {'id', 'peso_kg', 'fecha_registro'}
+        assert data['version'] > version
+        
+        data = json.loads(client.get(f"/api/weights/changes?since={data['version']}").data)
+        assert data['resync_required'] is False
+        assert data['changes'] == []
+    
+    def test_same_day_replacement(self, client, sample_weights):
+        """Test que un reemplazo del mismo día aparece una sola vez con su valor actual"""
+        version = json.loads(client.get('/api/weights/changes').data)['version']
+        self._post_weight(client, 74.0)
+        self._post_weight(client, 74.5)
+        
+        data = json.loads(client.get(f'/api/weights/changes?since={version}').data)
+        assert [c['peso_kg'] for c in data['changes']] == [74.5]
+    
+    def test_version_from_previous_run_requires_resync(self, client, sample_weights):
+        """Test que una versión anterior al arranque del almacenamiento pide resincronizar"""
+        data = json.loads(client.get('/api/weights/changes?since=1').data)
+        assert data['resync_required'] is True
+    
+    def test_invalid_since(self, client, sample_user):
+        """Test error con una versión no numérica"""
+        response = client.get('/api/weights/changes?since=abc')
+        assert_bad_request(response)
+    
+    def test_no_user(self, client):
+        """Test error si el usuario no está configurado"""
+        response = client.get('/api/weights/changes?since=1')
+        assert_not_found(response)
+
+
+class TestAPIWeightsExport:
+    """Tests de caja negra para la exportación del historial de peso"""
+    
+    def test_export_ndjson(self, client, sample_user, sample_weights):
+        """Test GET /api/weights/export en NDJSON, en orden cronológico"""
+        response = client.get('/api/weights/export?format=ndjson')
+        assert_success(response)
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [row['peso_kg'] for row in rows] == [70.0, 72.5, 75.0]
+        assert rows[0]['fecha_registro'] == '2024-01-01T10:00:00'
+        assert set(rows[0].keys()) == {'id', 'peso_kg', 'fecha_registro'}
+    
+    def test_export_csv(self, client, sample_user, sample_weights):
+        """Test GET /api/weights/export en CSV con cabecera"""
+        response = client.get('/api/weights/export?format=csv')
+        assert_success(response)
+        assert response.mimetype == 'text/csv'
+        assert 'pesos.csv' in response.headers['Content-Disposition']
+        
+        lines = response.get_data(as_text=True).splitlines()
+        assert lines[0] == 'id,peso_kg,fecha_registro'
+        assert len(lines) == 4
+        assert lines[1].endswith(',70.0,2024-01-01T10:00:00')
+    
+    def test_export_many_entries_in_chunks(self, client, sample_user):
+        """Test que la exportación recorre historiales de varios bloques"""
+        from datetime import timedelta
+        from app.storage import WeightEntryData
+        storage = client.application.storage
+        base_date = datetime(2020, 1, 1, 9, 0)
+        storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=1, weight_kg=70.0 + i % 5,
+                            recorded_date=base_date + timedelta(days=i))
+            for i in range(1203)
+        ])
+        
+        response = client.get('/api/weights/export')
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert len(rows) == 1203
+        assert rows == sorted(rows, key=lambda row: row['fecha_registro'])
+    
+    def test_export_invalid_format(self, client, sample_user):
+        """Test error con un formato no soportado"""
+        response = client.get('/api/weights/export?format=xml')
+        assert_bad_request(response)
+    
+    def test_export_no_user(self, client):
+        """Test error si el usuario no está configurado"""
+        response = client.get('/api/weights/export')
+        assert_not_found(response)
+
+
+class TestAPIWeightsBulk:
+    """Tests de caja negra para la carga masiva de pesos"""
+    
+    def test_bulk_upload_success(self, client, sample_user):
+        """Test POST /api/weights/bulk registra todos los pesos válidos"""
+        payload = {'weights': [
+            {'peso_kg': 72.0, 'fecha_registro': '2024-01-03T10:00:00'},
+            {'peso_kg': 70.0, 'fecha_registro': '2024-01-01T10:00:00.000Z'},
+            {'peso_kg': 71.0, 'fecha_registro': '2024-01-02T10:00:00'},
+        ]}
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        assert_success(response)
+        data = response.get_json()
+        assert data['created'] == 3
+        assert [r['status'] for r in data['results']] == ['created', 'created', 'created']
+        
+        weights = client.get('/api/weights').get_json()['weights']
+        assert [w['peso_kg'] for w in weights] == [72.0, 71.0, 70.0]
+    
+    def test_bulk_upload_per_item_errors(self, client, sample_user):
+        """Test que los registros inválidos se informan sin impedir el resto"""
+        payload = [
+            {'peso_kg': 70.0, 'fecha_registro': '2024-01-01T10:00:00'},
+            {'peso_kg': 'no_es_un_numero', 'fecha_registro': '2024-01-02T10:00:00'},
+            {'peso_kg': 700, 'fecha_registro': '2024-01-02T10:00:00'},
+            {'peso_kg': 71.0, 'fecha_registro': 'fecha-invalida'},
+            {'peso_kg': 90.0, 'fecha_registro': '2024-01-02T10:00:00'},
+            {'peso_kg': 74.0, 'fecha_registro': '2024-01-03T10:00:00'},
+        ]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        assert_success(response)
+        results = response.get_json()['results']
+        assert [r['status'] for r in results] == ['created', 'error', 'error', 'error', 'error', 'created']
+        # 90 kg un día después de 70 kg supera la variación máxima
+        assert '1 día' in results[4]['error']
+    
+    def test_bulk_upload_same_day_last_wins(self, client, sample_user):
+        """Test que con varios registros del mismo día prevalece el último"""
+        payload = [
+            {'peso_kg': 71.0, 'fecha_registro': '2024-01-01T20:00:00'},
+            {'peso_kg': 70.0, 'fecha_registro': '2024-01-01T08:00:00'},
+        ]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        results = response.get_json()['results']
+        assert results[0]['status'] == 'created'
+        assert results[1]['status'] == 'replaced'
+        
+        weights = client.get('/api/weights').get_json()['weights']
+        assert len(weights) == 1
+        assert weights[0]['peso_kg'] == 71.0
+    
+    def test_bulk_upload_ndjson(self, client, sample_user):
+        """Test que se acepta un cuerpo NDJSON"""
+        body = '\n'.join([
+            json.dumps({'peso_kg': 70.0, 'fecha_registro': '2024-01-01T10:00:00'}),
+            json.dumps({'peso_kg': 70.5, 'fecha_registro': '2024-01-02T10:00:00'}),
+        ])
+        response = client.post('/api/weights/bulk', data=body, content_type='application/x-ndjson')
+        assert_success(response)
+        assert response.get_json()['created'] == 2
+    
+    def test_bulk_upload_validates_against_stored_weight(self, client, sample_user, sample_weights):
+        """Test que el primer registro se valida respecto al último peso guardado"""
+        # Último peso guardado: 75 kg el 2024-02-01
+        payload = [{'peso_kg': 90.0, 'fecha_registro': '2024-02-02T10:00:00'}]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        assert response.get_json()['results'][0]['status'] == 'error'
+    
+    def test_bulk_upload_validates_against_later_stored_weight(self, client, sample_user, sample_weights):
+        """Test que al rellenar días antiguos se valida contra los pesos guardados anterior y posterior"""
+        # Guardados: 70 kg el 2024-01-01, 72.5 kg el 2024-01-15 y 75 kg el 2024-02-01
+        payload = [
+            {'peso_kg': 200.0, 'fecha_registro': '2024-01-02T10:00:00'},
+            {'peso_kg': 60.0, 'fecha_registro': '2024-01-31T10:00:00'},
+            {'peso_kg': 71.0, 'fecha_registro': '2024-01-08T10:00:00'},
+        ]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        results = response.get_json()['results']
+        # 200 kg supera la variación respecto al peso anterior (70 kg un día antes)
+        assert results[0]['status'] == 'error'
+        # 60 kg supera la variación respecto al peso guardado del día siguiente (75 kg)
+        assert results[1]['status'] == 'error'
+        assert '1 día' in results[1]['error']
+        assert results[2]['status'] == 'created'
+
+    def test_bulk_upload_backfill_before_recent_weights(self, client, sample_user):
+        """Test que con pesos recientes guardados no se acepta un peso antiguo incoherente"""
+        today = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0)
+        for days_ago, weight in ((30, 70.0), (0, 72.0)):
+            client.post('/api/weights/bulk', data=json.dumps([
+                {'peso_kg': weight, 'fecha_registro': (today - timedelta(days=days_ago)).isoformat()}
+            ]), content_type='application/json')
+
+        payload = [{'peso_kg': 200.0, 'fecha_registro': (today - timedelta(days=29)).isoformat()}]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        assert response.get_json()['results'][0]['status'] == 'error'
+
+        payload = [{'peso_kg': 70.5, 'fecha_registro': (today - timedelta(days=29)).isoformat()}]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        assert response.get_json()['results'][0]['status'] == 'created'
+        assert len(client.get('/api/weights').get_json()['weights']) == 3
+
+    def test_bulk_upload_future_date(self, client, sample_user):
+        """Test que no se aceptan fechas futuras"""
+        payload = [{'peso_kg': 70.0, 'fecha_registro': '2999-01-01T10:00:00'}]
+        response = client.post('/api/weights/bulk', data=json.dumps(payload), content_type='application/json')
+        assert response.get_json()['results'][0]['status'] == 'error'
+    
+    def test_bulk_upload_invalid_payload(self, client, sample_user):
+        """Test error cuando el cuerpo no es una lista de registros"""
+        response = client.post('/api/weights/bulk', data=json.dumps({'peso_kg': 70}),
+                               content_type='application/json')
+        assert_bad_request(response)
+    
+    def test_bulk_upload_without_user(self, client):
+        """Test error si el usuario no está configurado"""
+        response = client.post('/api/weights/bulk', data=json.dumps([]), content_type='application/json')
+        assert_bad_request(response)
+
+
+class TestAPIConditionalGet:
+    """Tests de caja negra para ETag e If-None-Match"""
+    
+    ENDPOINTS = ['/api/user', '/api/weights', '/api/imc', '/api/stats', '/api/analytics', '/api/imc/history']
+    
+    @pytest.mark.parametrize('url', ENDPOINTS)
+    def test_etag_and_not_modified(self, client, sample_weights, url):
+        """Test que la respuesta lleva ETag y una petición condicional recibe 304"""
+        response = client.get(url)
+        assert_success(response)
+        etag = response.headers['ETag']
+        assert response.headers['Cache-Control'] == 'no-cache'
+        
+        cached = client.get(url, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+    
+    @pytest.mark.parametrize('url', ENDPOINTS)
+    def test_etag_changes_after_write(self, client, sample_weights, url):
+        """Test que registrar un peso invalida el ETag anterior"""
+        etag = client.get(url).headers['ETag']
+        
+        client.post('/api/weight', data=json.dumps({'peso_kg': 74.0}),
+                    content_type='application/json')
+        
+        response = client.get(url, headers={'If-None-Match': etag})
+        assert_success(response)
+        assert response.headers['ETag'] != etag
+    
+    def test_etag_changes_after_user_update(self, client, sample_user):
+        """Test que actualizar el usuario invalida el ETag"""
+        etag = client.get('/api/user').headers['ETag']
+        
+        client.post('/api/user', data=json.dumps({
+            'nombre': 'Ana', 'apellidos': 'López', 'fecha_nacimiento': '1985-03-20', 'talla_m': 1.65
+        }), content_type='application/json')
+        
+        response = client.get('/api/user', headers={'If-None-Match': etag})
+        assert_success(response)
+        assert json.loads(response.data)['nombre'] == 'Ana'
+    
+    def test_not_modified_does_not_read_entries(self, client, sample_weights, monkeypatch):
+        """Test que la respuesta 304 no consulta la lista de pesos"""
+        etag = client.get('/api/weights').headers['ETag']
+        storage = client.application.storage
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("no debe leer los pesos")
+        monkeypatch.setattr(storage, 'get_weight_entries_range', fail)
+        monkeypatch.setattr(storage, 'get_all_weight_entries', fail)
+        
+        response = client.get('/api/weights', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+    
+    def test_errors_have_no_etag(self, client):
+        """Test que las respuestas de error no se marcan con ETag"""
+        response = client.get('/api/user')
+        assert_not_found(response)
+        assert 'ETag' not in response.headers
+
+
+class TestAPIIMCHistory:
+    """Tests de caja negra para GET /api/imc/history"""
+    
+    def test_imc_history_success(self, client, sample_weights):
+        """Test que devuelve el IMC y la clasificación de cada pesaje en orden cronológico"""
+        response = client.get('/api/imc/history')
+        assert_success(response)
+        data = json.loads(response.data)
+        
+        assert data['talla_m'] == 1.75
+        assert data['fechas'] == ['2024-01-01', '2024-01-15', '2024-02-01']
+        assert data['peso_kg'] == [70.0, 72.5, 75.0]
+        assert data['imc'] == [22.9, 23.7, 24.5]
+        assert data['categoria'] == ['Peso Normal'] * 3
+    
+    def test_imc_history_matches_current_imc(self, client, sample_weights):
+        """Test que el último punto coincide con /api/imc"""
+        history = json.loads(client.get('/api/imc/history').data)
+        current = json.loads(client.get('/api/imc').data)
+        assert history['imc'][-1] == current['imc']
+        assert current['description'].startswith(history['categoria'][-1])
+    
+    def test_imc_history_without_weights(self, client, sample_user):
+        """Test que sin pesos devuelve columnas vacías"""
+        data = json.loads(client.get('/api/imc/history').data)
+        assert data['imc'] == []
+        assert data['categoria'] == []
+    
+    def test_imc_history_without_user(self, client):
+        """Test que sin usuario configurado devuelve 404"""
+        assert_not_found(client.get('/api/imc/history'))
+    
+    def test_imc_history_weight_out_of_range(self, app, client, sample_user):
+        """Test que un peso almacenado fuera de límites aparece sin IMC"""
+        from app.storage import WeightEntryData
+        
+        for weight, day in [(1.0, 1), (70.0, 2)]:
+            app.storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=1, weight_kg=weight, recorded_date=datetime(2024, 1, day, 8, 0)
+            ))
+        data = json.loads(client.get('/api/imc/history').data)
+        assert data['imc'] == [None, 22.9]
+        assert data['categoria'] == [None, 'Peso Normal']
+    
+    def test_imc_history_height_out_of_range(self, app, client, sample_weights):
+        """Test validación defensiva de la talla almacenada"""
+        from app.storage import UserData
+        from datetime import date
+        
+        app.storage.save_user(UserData(user_id=1, first_name="Juan", last_name="Pérez",
+                                       birth_date=date(1990, 5, 15), height_m=3.0))
+        assert_bad_request(client.get('/api/imc/history'))
+
+
+class TestAPIIMCBatch:
+    """Tests de caja negra para POST /api/imc/batch"""
+    
+    def _post(self, client, payload):
+        return client.post('/api/imc/batch', data=json.dumps(payload),
+                           content_type='application/json')
+    
+    def test_batch_success(self, client):
+        """Test que devuelve IMC y clasificación en columnas, en el orden recibido"""
+        response = self._post(client, {'peso_kg': [70, 50, 95.5], 'talla_m': [1.75, 1.80, 1.70]})
+        assert_success(response)
+        data = json.loads(response.data)
+        
+        assert data['imc'] == [22.9, 15.4, 33.0]
+        assert data['categoria'] == ['Peso Normal', 'Peso Bajo', 'Obesidad Clase I']
+        assert data['error'] == [None, None, None]
+    
+    def test_batch_same_rounding_as_imc(self, client, sample_weights):
+        """Test que el IMC coincide con el de /api/imc para los mismos datos"""
+        current = json.loads(client.get('/api/imc').data)
+        data = json.loads(self._post(client, {'peso_kg': [75.0], 'talla_m': [1.75]}).data)
+        assert data['imc'] == [current['imc']]
+    
+    def test_batch_per_item_errors(self, client):
+        """Test que las mediciones no válidas tienen su error y no bloquean al resto"""
+        response = self._post(client, {
+            'peso_kg': [70, 'abc', 700, 70, None, 1],
+            'talla_m': [1.75, 1.75, 1.75, 3.0, 'x', 0.1]
+        })
+        assert_success(response)
+        data = json.loads(response.data)
+        
+        assert data['imc'] == [22.9, None, None, None, None, None]
+        assert data['categoria'] == ['Peso Normal', None, None, None, None, None]
+        assert data['error'] == [
+            None,
+            'Peso no válido',
+            'Peso fuera de rango (2 - 650 kg)',
+            'Talla fuera de rango (0.4 - 2.72 m)',
+            'Peso no válido',
+            'Peso fuera de rango (2 - 650 kg)',
+        ]
+    
+    def test_batch_empty(self, client):
+        """Test que un lote vacío devuelve columnas vacías"""
+        data = json.loads(self._post(client, {'peso_kg': [], 'talla_m': []}).data)
+        assert data == {'imc': [], 'categoria': [], 'error': []}
+    
+    @pytest.mark.parametrize('payload', [
+        {'peso_kg': [70, 80], 'talla_m': [1.75]},
+        {'peso_kg': 70, 'talla_m': 1.75},
+        {'peso_kg': [70]},
+        [70, 1.75],
+    ])
+    def test_batch_invalid_payload(self, client, payload):
+        """Test error cuando las columnas faltan, no son listas o no tienen la misma longitud"""
+        assert_bad_request(self._post(client, payload))
+    
+    def test_batch_does_not_need_user(self, client):
+        """Test que no depende del usuario configurado"""
+        assert_success(self._post(client, {'peso_kg': [70], 'talla_m': [1.75]}))
+
+
+class TestAPIAnalytics:
+    """Tests de caja negra para GET /api/analytics"""
+    
+    def test_analytics_success(self, client, sample_weights):
+        """Test que devuelve la serie, las medias y la tendencia del historial"""
+        response = client.get('/api/analytics')
+        assert_success(response)
+        data = json.loads(response.data)
+        
+        assert data['serie']['fechas'] == ['2024-01-01', '2024-01-15', '2024-02-01']
+        assert data['serie']['peso_kg'] == [70.0, 72.5, 75.0]
+        assert data['serie']['media_movil_7d'] == [70.0, 72.5, 75.0]
+        assert data['serie']['media_movil_30d'] == [70.0, 71.25, 73.75]
+        assert data['tendencia_kg_semana'] > 0
+        assert [m['mes'] for m in data['medias_mensuales']] == ['2024-01', '2024-02']
+        assert data['medias_mensuales'][0] == {'mes': '2024-01', 'peso_medio': 71.25, 'num_pesajes': 2}
+        assert len(data['medias_semanales']) == 3
+    
+    def test_analytics_updated_after_write(self, client, sample_weights):
+        """Test que un peso nuevo aparece en la analítica siguiente"""
+        client.get('/api/analytics')
+        client.post('/api/weight', data=json.dumps({'peso_kg': 74.0}),
+                    content_type='application/json')
+        
+        data = json.loads(client.get('/api/analytics').data)
+        assert data['serie']['peso_kg'][-1] == 74.0
+    
+    def test_analytics_without_weights(self, client, sample_user):
+        """Test que sin pesos devuelve listas vacías y sin tendencia"""
+        response = client.get('/api/analytics')
+        assert_success(response)
+        data = json.loads(response.data)
+        assert data['serie']['fechas'] == []
+        assert data['tendencia_kg_semana'] is None
+    
+    def test_analytics_without_user(self, client):
+        """Test que sin usuario configurado devuelve 404"""
+        assert_not_found(client.get('/api/analytics'))
+
+
+class TestAPIBootstrap:
+    """Tests de caja negra para GET /api/bootstrap"""
+    
+    def test_bootstrap_matches_individual_endpoints(self, client, sample_weights):
+        """Test que cada sección coincide con su endpoint individual"""
+        response = client.get('/api/bootstrap')
+        assert_success(response)
+        data = json.loads(response.data)
+        
+        assert data['user'] == json.loads(client.get('/api/user').data)
+        assert data['imc'] == json.loads(client.get('/api/imc').data)
+        assert data['stats'] == json.loads(client.get('/api/stats').data)
+        assert data['weights'] == json.loads(client.get('/api/weights').data)['weights']
+        assert data['config'] == json.loads(client.get('/api/config').data)
+        assert data['messages'] == json.loads(client.get('/api/messages').data)
+        assert data['resync_required'] is True
+    
+    def test_bootstrap_without_user(self, client):
+        """Test que sin usuario se devuelven configuración y mensajes igualmente"""
+        response = client.get('/api/bootstrap')
+        assert_success(response)
+        data = json.loads(response.data)
+        assert data['user'] is None
+        assert data['imc'] is None
+        assert data['weights'] == []
+        assert data['stats'] == {"num_pesajes": 0, "peso_max": 0, "peso_min": 0}
+        assert 'validation_limits' in data['config']
+    
+    def test_bootstrap_delta(self, client, sample_weights):
+        """Test que con since solo se incluyen los pesos modificados"""
+        version = json.loads(client.get('/api/bootstrap').data)['version']
+        client.post('/api/weight', data=json.dumps({'peso_kg': 74.0}),
+                    content_type='application/json')
+        
+        data = json.loads(client.get(f'/api/bootstrap?since={version}').data)
+        assert data['resync_required'] is False
+        assert [w['peso_kg'] for w in data['weights']] == [74.0]
+        assert data['stats']['num_pesajes'] == 4
+    
+    def test_bootstrap_single_storage_read(self, client, sample_weights, monkeypatch):
+        """Test que los datos del usuario salen de una sola lectura del storage"""
+        storage = client.application.storage
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("debe usar get_user_snapshot")
+        for name in ('get_user', 'get_last_weight_entry', 'get_weight_count', 'get_max_weight',
+                     'get_min_weight', 'get_all_weight_entries'):
+            monkeypatch.setattr(storage, name, fail)
+        
+        assert_success(client.get('/api/bootstrap'))
+    
+    def test_bootstrap_not_modified(self, client, sample_weights):
+        """Test ETag e If-None-Match"""
+        etag = client.get('/api/bootstrap').headers['ETag']
+        response = client.get('/api/bootstrap', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+
+    def test_bootstrap_etag_changes_with_config(self, client, sample_weights, monkeypatch):
+        """Test que un cambio de configuración (p. ej. tras un despliegue) invalida el ETag aunque los datos no cambien"""
+        from app import routes
+        from app.config import STATIC_API_MAX_AGE, VALIDATION_LIMITS
+        from app.precomputed import PrecomputedResponse
+        etag = client.get('/api/bootstrap').headers['ETag']
+
+        monkeypatch.setitem(VALIDATION_LIMITS, 'weight_max', VALIDATION_LIMITS['weight_max'] + 50)
+        monkeypatch.setattr(routes, '_CONFIG_RESPONSE',
+                            PrecomputedResponse(routes._config_payload(), STATIC_API_MAX_AGE))
+        response = client.get('/api/bootstrap', headers={'If-None-Match': etag})
+        assert_success(response)
+        assert response.headers['ETag'] != etag
+        limits = json.loads(response.data)['config']['validation_limits']
+        assert limits['weight_max'] == VALIDATION_LIMITS['weight_max']
+
+    def test_bootstrap_etag_changes_with_messages(self, client, sample_weights, monkeypatch):
+        """Test que un cambio en los mensajes del frontend invalida el ETag aunque los datos no cambien"""
+        from app import routes
+        from app.config import STATIC_API_MAX_AGE
+        from app.precomputed import PrecomputedResponse
+        etag = client.get('/api/bootstrap').headers['ETag']
+
+        monkeypatch.setattr(routes, '_MESSAGES_RESPONSES', {
+            'es': PrecomputedResponse({"texts": {"no_weight_records": "Otro texto"}}, STATIC_API_MAX_AGE)
+        })
+        response = client.get('/api/bootstrap', headers={'If-None-Match': etag})
+        assert_success(response)
+        assert response.headers['ETag'] != etag
 
 
 class TestAPIConfig:
@@ -341,6 +945,44 @@ class TestAPIConfig:
         assert isinstance(limits['weight_variation_per_day'], (int, float))
 
 
+class TestAPIPrecomputedResponses:
+    """Tests de caja negra para /api/config y /api/messages precalculados"""
+    
+    @pytest.mark.parametrize('url', ['/api/config', '/api/messages'])
+    def test_gzip_variant(self, client, url):
+        """Test que la variante gzip contiene el mismo JSON que la variante sin comprimir"""
+        import gzip
+        plain = client.get(url)
+        compressed = client.get(url, headers={'Accept-Encoding': 'gzip, deflate'})
+        assert_success(compressed)
+        assert 'Content-Encoding' not in plain.headers
+        if compressed.headers.get('Content-Encoding') == 'gzip':
+            assert json.loads(gzip.decompress(compressed.data)) == json.loads(plain.data)
+            assert compressed.headers['ETag'] != plain.headers['ETag']
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+    
+    def test_messages_are_compressed(self, client):
+        """Test que los mensajes (con descripciones largas) se sirven comprimidos"""
+        response = client.get('/api/messages', headers={'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        refused = client.get('/api/messages', headers={'Accept-Encoding': 'gzip;q=0'})
+        assert 'Content-Encoding' not in refused.headers
+    
+    @pytest.mark.parametrize('url', ['/api/config', '/api/messages'])
+    def test_strong_etag_and_cache_control(self, client, url):
+        """Test ETag fuerte, caché larga y 304 con If-None-Match"""
+        from app.config import STATIC_API_MAX_AGE
+        response = client.get(url)
+        etag = response.headers['ETag']
+        assert not etag.startswith('W/')
+        assert f'max-age={STATIC_API_MAX_AGE}' in response.headers['Cache-Control']
+        
+        cached = client.get(url, headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+
+
 class TestAPIIndex:
     """Tests de caja negra para endpoint raíz"""
     
@@ -350,3 +992,30 @@ class TestAPIIndex:
         assert_success(response)
         assert 'text/html' in response.content_type
 
+    def test_index_not_modified_with_etag(self, client):
+        """Test GET / con If-None-Match del ETag recibido devuelve 304 sin cuerpo"""
+        response = client.get('/')
+        etag = response.headers['ETag']
+        assert response.headers['Last-Modified']
+        assert response.headers['Cache-Control'] == 'no-cache'
+
+        cached = client.get('/', headers={'If-None-Match': etag})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert cached.headers['ETag'] == etag
+
+    def test_index_not_modified_since(self, client):
+        """Test GET / con If-Modified-Since igual a Last-Modified devuelve 304"""
+        last_modified = client.get('/').headers['Last-Modified']
+        cached = client.get('/', headers={'If-Modified-Since': last_modified})
+        assert cached.status_code == 304
+
+        old = client.get('/', headers={'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:01 GMT'})
+        assert_success(old)
+
+    def test_index_other_etag_returns_page(self, client):
+        """Test GET / con un ETag que no coincide devuelve la página completa"""
+        response = client.get('/', headers={'If-None-Match': '"otro"'})
+        assert_success(response)
+        assert b'<html' in response.data
+
@@ -0,0 +1,82 @@
+"""
+Tests de Caja Negra para las respuestas en varios idiomas
+Cada petición recibe los textos del idioma de su cabecera Accept-Language
+"""
+import json
+from tests.backend.conftest import (
+    app, client, sample_user, sample_weights, english_language, assert_success, assert_bad_request
+)
+
+
+def _english():
+    return {"Accept-Language": "en-GB,en;q=0.9"}
+
+
+class TestAPILanguages:
+    """Tests de caja negra para la elección de idioma por petición"""
+
+    def test_messages_in_request_language(self, client, english_language):
+        """Test que /api/messages devuelve los mensajes del idioma pedido, con su propio ETag"""
+        spanish = client.get('/api/messages')
+        english = client.get('/api/messages', headers=_english())
+        assert_success(spanish)
+        assert_success(english)
+        assert spanish.get_json()["texts"]["no_weight_records"] == "Sin registros de peso"
+        assert english.get_json()["texts"]["no_weight_records"] == "No weight records"
+        assert spanish.headers['ETag'] != english.headers['ETag']
+        assert 'Accept-Language' in english.headers['Vary']
+
+        revalidated = client.get('/api/messages', headers={**_english(),
+                                                           "If-None-Match": english.headers['ETag']})
+        assert revalidated.status_code == 304
+
+    def test_errors_in_request_language(self, client, sample_user, english_language):
+        """Test que los errores de validación salen en el idioma de la petición"""
+        response = client.post('/api/weight', data=json.dumps({"peso_kg": "abc"}),
+                               content_type='application/json', headers=_english())
+        assert_bad_request(response)
+        assert response.get_json()["error"] == "Invalid weight"
+
+        response = client.post('/api/weight', data=json.dumps({"peso_kg": "abc"}),
+                               content_type='application/json')
+        assert response.get_json()["error"] == "Peso no válido"
+
+    def test_imc_description_and_etag_per_language(self, client, sample_weights, english_language):
+        """Test que la descripción del IMC cambia con el idioma y el ETag también"""
+        spanish = client.get('/api/imc')
+        english = client.get('/api/imc', headers=_english())
+        assert english.get_json()["description"].startswith("EN ")
+        assert not spanish.get_json()["description"].startswith("EN ")
+        assert spanish.headers['ETag'] != english.headers['ETag']
+        assert 'Accept-Language' in english.headers['Vary']
+
+        # El ETag de un idioma no valida la respuesta del otro
+        response = client.get('/api/imc', headers={"If-None-Match": english.headers['ETag']})
+        assert_success(response)
+
+    def test_index_in_request_language(self, client, english_language):
+        """Test que la página principal usa los textos y el atributo lang del idioma pedido"""
+        html = client.get('/', headers=_english()).get_data(as_text=True)
+        assert '<html lang="en">' in html
+        assert '<title>BMI Tracker</title>' in html
+
+    def test_index_etag_per_language(self, client, english_language):
+        """Test que cada idioma de la página principal tiene su ETag y varía con Accept-Language"""
+        spanish = client.get('/')
+        english = client.get('/', headers=_english())
+        assert spanish.headers['ETag'] != english.headers['ETag']
+        assert 'Accept-Language' in english.headers['Vary']
+
+        revalidated = client.get('/', headers={**_english(), "If-None-Match": english.headers['ETag']})
+        assert revalidated.status_code == 304
+        # El ETag de un idioma no valida la página del otro
+        response = client.get('/', headers={"If-None-Match": english.headers['ETag']})
+        assert_success(response)
+        assert '<html lang="es">' in response.get_data(as_text=True)
+
+    def test_single_language_responses_do_not_vary(self, client, sample_weights):
+        """Test que con un solo idioma las respuestas no dependen de Accept-Language"""
+        response = client.get('/api/imc', headers=_english())
+        assert 'Accept-Language' not in response.headers.get('Vary', '')
+        assert response.headers['ETag'].strip('"').startswith('v')
+        assert '-' not in response.headers['ETag']
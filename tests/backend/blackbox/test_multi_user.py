@@ -0,0 +1,82 @@
+"""
+Tests de Caja Negra para el modo multiusuario
+Cada petición se identifica con la cabecera del proxy de autenticación y
+solo ve los datos de su usuario
+"""
+import json
+import pytest
+from tests.backend.conftest import assert_success, assert_not_found
+from app.config import MULTI_USER_CONFIG
+
+
+HEADER = MULTI_USER_CONFIG["user_header"]
+
+
+@pytest.fixture
+def multi_user(monkeypatch):
+    """Activa el modo multiusuario durante el test"""
+    monkeypatch.setitem(MULTI_USER_CONFIG, "enabled", True)
+
+
+def _as_user(user_id):
+    return {HEADER: str(user_id)}
+
+
+def _create_user(client, user_id, nombre, talla_m=1.75):
+    payload = {"nombre": nombre, "apellidos": "Prueba", "fecha_nacimiento": "1990-01-01", "talla_m": talla_m}
+    return client.post('/api/user', data=json.dumps(payload), content_type='application/json',
+                       headers=_as_user(user_id))
+
+
+class TestMultiUserAPI:
+    """Tests de caja negra del modo multiusuario"""
+    
+    def test_users_are_isolated(self, client, multi_user):
+        """Test que cada usuario solo ve sus propios datos"""
+        assert_success(_create_user(client, 101, "Ana"))
+        assert_success(_create_user(client, 202, "Luis", talla_m=1.80))
+        client.post('/api/weight', data=json.dumps({'peso_kg': 60.0}),
+                    content_type='application/json', headers=_as_user(101))
+        
+        ana = json.loads(client.get('/api/user', headers=_as_user(101)).data)
+        luis = json.loads(client.get('/api/user', headers=_as_user(202)).data)
+        assert ana['nombre'] == "Ana"
+        assert luis['nombre'] == "Luis"
+        
+        assert json.loads(client.get('/api/stats', headers=_as_user(101)).data)['num_pesajes'] == 1
+        assert json.loads(client.get('/api/stats', headers=_as_user(202)).data)['num_pesajes'] == 0
+        assert json.loads(client.get('/api/weights', headers=_as_user(202)).data)['weights'] == []
+    
+    def test_unknown_user(self, client, multi_user):
+        """Test que un usuario sin datos recibe 404 como en modo monousuario"""
+        assert_not_found(client.get('/api/user', headers=_as_user(303)))
+    
+    @pytest.mark.parametrize('headers', [{}, {HEADER: 'abc'}, {HEADER: '0'}, {HEADER: '-5'}])
+    def test_missing_or_invalid_identity(self, client, multi_user, headers):
+        """Test que sin identificación válida se responde 401"""
+        response = client.get('/api/user', headers=headers)
+        assert response.status_code == 401
+        assert 'error' in json.loads(response.data)
+    
+    @pytest.mark.parametrize('url', ['/api/config', '/api/messages'])
+    def test_anonymous_endpoints(self, client, multi_user, url):
+        """Test que la configuración y los mensajes no necesitan identificación"""
+        assert_success(client.get(url))
+    
+    def test_imc_batch_without_identity(self, client, multi_user):
+        """Test que el cálculo de IMC en lote no necesita identificación"""
+        response = client.post('/api/imc/batch', data=json.dumps({'peso_kg': [70], 'talla_m': [1.75]}),
+                               content_type='application/json')
+        assert_success(response)
+    
+    def test_vary_by_user_header(self, client, multi_user):
+        """Test que las respuestas con ETag varían según la cabecera del usuario"""
+        _create_user(client, 101, "Ana")
+        response = client.get('/api/user', headers=_as_user(101))
+        assert HEADER in response.headers['Vary']
+    
+    def test_header_ignored_in_single_user_mode(self, client, sample_user):
+        """Test que en modo monousuario la cabecera no cambia el usuario"""
+        response = client.get('/api/user', headers=_as_user(202))
+        assert_success(response)
+        assert json.loads(response.data)['nombre'] == "Juan"
@@ -73,3 +73,43 @@ def sample_weights(app, sample_user):
             app.storage.add_weight_entry(weight)
         return weights
 
+
+
+@pytest.fixture
+def english_language(monkeypatch):
+    """Añade un segundo idioma ('en') a AVAILABLE_LANGUAGES durante el test
+
+    El módulo de idioma se registra en sys.modules, de donde lo toma la carga
+    diferida de translations; las cachés de idiomas se vacían antes y después.
+    """
+    import sys
+    import types
+    from app import routes, translations, views
+    from app.languages import es
+
+    module = types.ModuleType('app.languages.en')
+    for name in dir(es):
+        if name.isupper():
+            setattr(module, name, getattr(es, name))
+    module.ERRORS = {
+        **es.ERRORS,
+        "invalid_weight": "Invalid weight",
+        "too_many_entries": "Too many entries in a single request (maximum {max_entries})",
+        "weight_variation_exceeded": "{days_text}: at most {max_allowed_difference:.1f} kg, got {weight_difference:.1f} kg",
+    }
+    module.MESSAGES = {**es.MESSAGES, "weight_registered": "Weight recorded"}
+    module.BMI_DESCRIPTIONS = {key: f"EN {text}" for key, text in es.BMI_DESCRIPTIONS.items()}
+    module.BMI_COMPLETE_DESCRIPTIONS = {key: f"EN {text}" for key, text in es.BMI_COMPLETE_DESCRIPTIONS.items()}
+    module.DAYS_TEXT_MAP = {0: "same day", 1: "1 day"}
+    module.DAYS_TEXT_TEMPLATE = "{days} days"
+    module.FRONTEND_MESSAGES = {**es.FRONTEND_MESSAGES, "texts": {"no_weight_records": "No weight records"}}
+    module.HTML_TEXTS = {**es.HTML_TEXTS, "title": "BMI Tracker"}
+
+    monkeypatch.setitem(sys.modules, 'app.languages.en', module)
+    monkeypatch.setattr(translations, 'AVAILABLE_LANGUAGES', ['es', 'en'])
+    monkeypatch.setattr(translations, '_catalogs', {})
+    monkeypatch.setattr(routes, '_MESSAGES_RESPONSES', {})
+    monkeypatch.setattr(views, '_INDEX_PAGES', {})
+    translations._days_text.cache_clear()
+    yield module
+    translations._days_text.cache_clear()
@@ -0,0 +1,142 @@
+"""
+Tests de Caja Blanca para la analítica del historial de peso
+Comparan los cálculos vectorizados con una implementación directa en Python
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.analytics import compute_analytics
+from app.analytics_cache import AnalyticsCache
+from app.storage import MemoryStorage, WeightEntryData, datetime_to_micros
+from app.config import USER_ID
+from tests.backend.conftest import app, client, sample_user, sample_weights
+
+
+def _series(points):
+    """Serie (microsegundos, pesos) a partir de pares (fecha, peso)"""
+    return [datetime_to_micros(d) for d, _ in points], [w for _, w in points]
+
+
+def _reference_moving_average(points, window):
+    result = []
+    for recorded_date, _ in points:
+        first_day = recorded_date.date() - timedelta(days=window - 1)
+        values = [w for d, w in points if first_day <= d.date() <= recorded_date.date()]
+        result.append(round(sum(values) / len(values), 2))
+    return result
+
+
+class TestComputeAnalytics:
+    """Tests de caja blanca para compute_analytics()"""
+    
+    # Pesajes irregulares: huecos de varios días y un cambio de mes y de año
+    POINTS = [
+        (datetime(2023, 12, 28, 8, 0), 80.0),
+        (datetime(2023, 12, 31, 22, 0), 79.4),
+        (datetime(2024, 1, 1, 7, 30), 79.9),
+        (datetime(2024, 1, 3, 8, 0), 79.1),
+        (datetime(2024, 1, 9, 9, 0), 78.6),
+        (datetime(2024, 1, 20, 8, 0), 78.0),
+        (datetime(2024, 2, 5, 8, 0), 77.2),
+    ]
+    
+    def test_moving_averages(self):
+        """Test que las medias móviles usan días naturales, no número de pesajes"""
+        result = compute_analytics(*_series(self.POINTS))
+        series = result["serie"]
+        assert series["fechas"][0] == "2023-12-28"
+        assert series["peso_kg"] == [w for _, w in self.POINTS]
+        assert series["media_movil_7d"] == _reference_moving_average(self.POINTS, 7)
+        assert series["media_movil_30d"] == _reference_moving_average(self.POINTS, 30)
+    
+    def test_trend_per_week(self):
+        """Test que la tendencia es la pendiente de mínimos cuadrados en kg/semana"""
+        points = [(datetime(2024, 1, 1) + timedelta(days=2 * i), 90.0 - 0.1 * i) for i in range(20)]
+        result = compute_analytics(*_series(points))
+        # -0.1 kg cada dos días = -0.35 kg/semana
+        assert result["tendencia_kg_semana"] == pytest.approx(-0.35)
+    
+    def test_weekly_means(self):
+        """Test que las semanas empiezan en lunes y agrupan años distintos"""
+        result = compute_analytics(*_series(self.POINTS))
+        assert result["medias_semanales"] == [
+            {"semana": "2023-12-25", "peso_medio": 79.7, "num_pesajes": 2},
+            {"semana": "2024-01-01", "peso_medio": 79.5, "num_pesajes": 2},
+            {"semana": "2024-01-08", "peso_medio": 78.6, "num_pesajes": 1},
+            {"semana": "2024-01-15", "peso_medio": 78.0, "num_pesajes": 1},
+            {"semana": "2024-02-05", "peso_medio": 77.2, "num_pesajes": 1},
+        ]
+    
+    def test_monthly_means(self):
+        """Test de las medias mensuales"""
+        result = compute_analytics(*_series(self.POINTS))
+        assert result["medias_mensuales"] == [
+            {"mes": "2023-12", "peso_medio": 79.7, "num_pesajes": 2},
+            {"mes": "2024-01", "peso_medio": 78.9, "num_pesajes": 4},
+            {"mes": "2024-02", "peso_medio": 77.2, "num_pesajes": 1},
+        ]
+    
+    def test_dates_before_epoch(self):
+        """Test que las fechas anteriores a 1970 se asignan a su día"""
+        points = [(datetime(1969, 12, 31, 23, 0), 70.0)]
+        result = compute_analytics(*_series(points))
+        assert result["serie"]["fechas"] == ["1969-12-31"]
+        assert result["medias_semanales"][0]["semana"] == "1969-12-29"
+    
+    def test_single_entry_has_no_trend(self):
+        """Test que con un solo pesaje no hay tendencia"""
+        result = compute_analytics(*_series(self.POINTS[:1]))
+        assert result["tendencia_kg_semana"] is None
+        assert result["serie"]["media_movil_7d"] == [80.0]
+    
+    def test_empty_series(self):
+        """Test que un historial vacío devuelve listas vacías"""
+        result = compute_analytics([], [])
+        assert result["serie"]["fechas"] == []
+        assert result["tendencia_kg_semana"] is None
+        assert result["medias_semanales"] == []
+        assert result["medias_mensuales"] == []
+
+
+class TestAnalyticsCache:
+    """Tests de caja blanca para AnalyticsCache"""
+    
+    def _storage_with_weights(self, count):
+        storage = MemoryStorage()
+        for i in range(count):
+            storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=USER_ID, weight_kg=70.0 + i, recorded_date=datetime(2024, 1, 1 + i, 8, 0)
+            ))
+        return storage
+    
+    def test_cached_until_data_changes(self, monkeypatch):
+        """Test que se reutiliza el resultado hasta que cambia la versión de los datos"""
+        storage = self._storage_with_weights(3)
+        calls = []
+        original = storage.get_weight_series
+        monkeypatch.setattr(storage, 'get_weight_series', lambda user_id: calls.append(user_id) or original(user_id))
+        cache = AnalyticsCache()
+        
+        first = cache.get(storage, USER_ID)
+        assert cache.get(storage, USER_ID) is first
+        assert len(calls) == 1
+        
+        storage.add_weight_entry(WeightEntryData(
+            entry_id=0, user_id=USER_ID, weight_kg=71.0, recorded_date=datetime(2024, 1, 10, 8, 0)
+        ))
+        updated = cache.get(storage, USER_ID)
+        assert len(calls) == 2
+        assert updated["serie"]["peso_kg"][-1] == 71.0
+    
+    def test_evicts_least_recently_used(self):
+        """Test que la caché no crece por encima de max_users"""
+        storage = self._storage_with_weights(1)
+        cache = AnalyticsCache(max_users=2)
+        for user_id in (1, 2, 3):
+            cache.get(storage, user_id)
+        assert list(cache._entries) == [2, 3]
+    
+    def test_app_has_cache(self, app):
+        """Test que create_app() crea una caché por aplicación"""
+        assert isinstance(app.analytics_cache, AnalyticsCache)
@@ -0,0 +1,113 @@
+"""
+Tests de Caja Blanca para la compresión de respuestas
+Prueban la elección de codificación y la compresión por bloques
+"""
+import gzip
+import json
+from datetime import datetime, timedelta
+
+import pytest
+from werkzeug.http import parse_accept_header
+
+from app import compression
+from app.config import COMPRESSION_CONFIG
+from app.storage import WeightEntryData
+from tests.backend.conftest import app, client, sample_user
+
+
+def _add_days(app, days):
+    base_date = datetime(2020, 1, 1, 8, 0)
+    app.storage.add_weight_entries([
+        WeightEntryData(entry_id=0, user_id=1, weight_kg=70.0 + i % 10 / 10,
+                        recorded_date=base_date + timedelta(days=i))
+        for i in range(days)
+    ])
+
+
+class TestChooseEncoding:
+    """Tests de caja blanca para la negociación de Accept-Encoding"""
+    
+    @pytest.mark.parametrize('header, expected', [
+        ('gzip, deflate, br', 'br'),
+        ('gzip', 'gzip'),
+        ('br;q=0.5, gzip', 'gzip'),
+        ('gzip;q=0', None),
+        ('identity', None),
+        ('*', 'br'),
+    ])
+    def test_choose_encoding(self, header, expected):
+        """Test que se elige la codificación de mayor calidad, brotli en empate"""
+        chosen = compression._choose_encoding(parse_accept_header(header), ('br', 'gzip'))
+        assert chosen == expected
+    
+    def test_without_brotli(self, monkeypatch):
+        """Test que sin el paquete brotli solo se ofrece gzip"""
+        monkeypatch.setattr(compression, 'brotli', None)
+        assert compression.available_encodings() == ('gzip',)
+
+
+class TestCompressionLayer:
+    """Tests de caja blanca para init_compression()"""
+    
+    def test_large_response_is_compressed(self, client, sample_user):
+        """Test que /api/weights con historial largo se comprime con gzip"""
+        _add_days(client.application, 400)
+        plain = client.get('/api/weights')
+        response = client.get('/api/weights', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert len(response.data) < len(plain.data) / 4
+        assert json.loads(gzip.decompress(response.data)) == json.loads(plain.data)
+        assert response.headers['ETag'] == 'W/' + plain.headers['ETag']
+    
+    def test_compressed_etag_still_validates(self, client, sample_user):
+        """Test que el ETag débil de la respuesta comprimida permite obtener 304"""
+        _add_days(client.application, 400)
+        etag = client.get('/api/weights', headers={'Accept-Encoding': 'gzip'}).headers['ETag']
+        response = client.get('/api/weights', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert response.status_code == 304
+    
+    def test_small_response_is_not_compressed(self, client, sample_user):
+        """Test que las respuestas pequeñas (/api/imc) no se comprimen"""
+        response = client.get('/api/imc', headers={'Accept-Encoding': 'gzip, br'})
+        assert 'Content-Encoding' not in response.headers
+        assert 'Vary' not in response.headers
+    
+    def test_streamed_export_is_compressed(self, client, sample_user):
+        """Test que la exportación en streaming se comprime bloque a bloque"""
+        _add_days(client.application, 1200)
+        plain = client.get('/api/weights/export?format=csv')
+        response = client.get('/api/weights/export?format=csv', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        assert gzip.decompress(response.data) == plain.data
+    
+    def test_brotli(self, client, sample_user):
+        """Test que con brotli instalado se prefiere cuando el cliente lo acepta"""
+        brotli = pytest.importorskip('brotli')
+        _add_days(client.application, 400)
+        plain = client.get('/api/weights')
+        response = client.get('/api/weights', headers={'Accept-Encoding': 'gzip, br'})
+        
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.data) == plain.data
+    
+    def test_streamed_export_with_brotli(self, client, sample_user):
+        """Test que la exportación en streaming se comprime con brotli bloque a bloque"""
+        brotli = pytest.importorskip('brotli')
+        _add_days(client.application, 1200)
+        plain = client.get('/api/weights/export?format=ndjson')
+        response = client.get('/api/weights/export?format=ndjson', headers={'Accept-Encoding': 'br'})
+        
+        assert response.headers['Content-Encoding'] == 'br'
+        assert 'Content-Length' not in response.headers
+        assert brotli.decompress(response.data) == plain.data
+    
+    def test_disabled(self):
+        """Test que con enabled=False no se registra la compresión"""
+        from flask import Flask
+        flask_app = Flask(__name__)
+        compression.init_compression(flask_app, dict(COMPRESSION_CONFIG, enabled=False))
+        assert not flask_app.after_request_funcs
@@ -0,0 +1,174 @@
+"""
+Tests de Caja Blanca para la concurrencia del almacenamiento
+Someten MemoryStorage a lecturas y escrituras simultáneas desde varios hilos
+"""
+import sys
+import threading
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, date
+from app.concurrency import ReadWriteLock
+from app.storage import MemoryStorage, UserData, WeightEntryData
+
+
+WRITERS = 8
+READERS = 8
+DAYS_PER_WRITER = 100
+USERS = 1  # todos los hilos sobre el mismo historial: máxima contención
+
+
+@pytest.fixture
+def fast_switching():
+    """Reduce el intervalo de cambio de hilo para provocar más entrelazados"""
+    previous = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(previous)
+
+
+class TestReadWriteLock:
+    """Tests de caja blanca para ReadWriteLock"""
+    
+    def test_readers_share_the_lock(self):
+        """Test que varios lectores pueden tener el bloqueo a la vez"""
+        lock = ReadWriteLock()
+        barrier = threading.Barrier(3, timeout=5)
+        
+        def reader():
+            with lock.read:
+                # Si los lectores se excluyeran, la barrera no se completaría
+                barrier.wait()
+        
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not barrier.broken
+    
+    def test_writer_excludes_readers(self):
+        """Test que un lector espera mientras hay un escritor"""
+        lock = ReadWriteLock()
+        events = []
+        lock.acquire_write()
+        
+        reader = threading.Thread(target=lambda: (lock.acquire_read(), events.append('read'), lock.release_read()))
+        reader.start()
+        reader.join(timeout=0.1)
+        events.append('write_done')
+        lock.release_write()
+        reader.join(timeout=5)
+        
+        assert events == ['write_done', 'read']
+
+
+class TestMemoryStorageStress:
+    """Test de estrés de MemoryStorage desde un pool de hilos"""
+    
+    def test_concurrent_writes_and_reads(self, fast_switching):
+        """Test que las escrituras concurrentes no pierden datos ni duplican ids"""
+        storage = MemoryStorage()
+        for user_id in range(1, USERS + 1):
+            storage.save_user(UserData(user_id=user_id, first_name="Usuario", last_name=str(user_id),
+                                       birth_date=date(1990, 1, 1), height_m=1.75))
+        base_date = datetime(2020, 1, 1, 9, 0)
+        read_errors = []
+        
+        def writer(worker):
+            user_id = worker % USERS + 1
+            ids = []
+            for i in range(DAYS_PER_WRITER):
+                # Cada writer usa días distintos; cada día se registra dos veces (reemplazo)
+                recorded_date = base_date + timedelta(days=worker // USERS * DAYS_PER_WRITER + i)
+                for weight in (70.0 + i % 10, 60.0 + i % 10):
+                    entry = WeightEntryData(entry_id=0, user_id=user_id, weight_kg=weight,
+                                            recorded_date=recorded_date)
+                    storage.add_weight_entry(entry)
+                    ids.append(entry.entry_id)
+            return ids
+        
+        def reader(worker):
+            user_id = worker % USERS + 1
+            for _ in range(DAYS_PER_WRITER):
+                entries = storage.get_all_weight_entries(user_id)
+                count = storage.get_weight_count(user_id)
+                if any(a.recorded_date <= b.recorded_date for a, b in zip(entries, entries[1:])):
+                    read_errors.append("orden incorrecto")
+                if count < len(entries):
+                    read_errors.append("número de registros decreciente")
+                last = storage.get_last_weight_entry(user_id)
+                if entries and last is None:
+                    read_errors.append("última entrada perdida")
+        
+        with ThreadPoolExecutor(max_workers=WRITERS + READERS) as pool:
+            writer_futures = [pool.submit(writer, w) for w in range(WRITERS)]
+            reader_futures = [pool.submit(reader, r) for r in range(READERS)]
+            all_ids = [entry_id for future in writer_futures for entry_id in future.result()]
+            for future in reader_futures:
+                future.result()
+        
+        assert read_errors == []
+        # Ids únicos y consecutivos: ninguna actualización perdida de _next_entry_id
+        assert sorted(all_ids) == list(range(1, WRITERS * DAYS_PER_WRITER * 2 + 1))
+        
+        writers_per_user = WRITERS // USERS
+        for user_id in range(1, USERS + 1):
+            entries = storage.get_all_weight_entries(user_id)
+            assert len(entries) == writers_per_user * DAYS_PER_WRITER
+            assert storage.get_weight_count(user_id) == len(entries)
+            # Solo queda el segundo registro de cada día (60-69 kg)
+            weights = [e.weight_kg for e in entries]
+            assert storage.get_max_weight(user_id) == max(weights) == 69.0
+            assert storage.get_min_weight(user_id) == min(weights) == 60.0
+
+
+class TestMemoryStoragePartitions:
+    """Tests de caja blanca para las particiones de MemoryStorage"""
+    
+    def _entry(self, user_id, day=1):
+        return WeightEntryData(entry_id=0, user_id=user_id, weight_kg=70.0,
+                               recorded_date=datetime(2024, 1, day, 8, 0))
+    
+    def test_other_partitions_are_not_blocked(self):
+        """Test que una escritura en curso solo bloquea a los usuarios de su partición"""
+        storage = MemoryStorage(partitions=4)
+        events = []
+        storage._partition(1).lock.acquire_write()
+        try:
+            # El usuario 2 está en otra partición: no espera
+            other = threading.Thread(target=lambda: (storage.add_weight_entry(self._entry(2)),
+                                                     events.append('other')))
+            other.start()
+            other.join(timeout=5)
+            # El usuario 5 comparte partición con el 1: espera a que termine la escritura
+            same = threading.Thread(target=lambda: (storage.get_weight_count(5), events.append('same')))
+            same.start()
+            same.join(timeout=0.1)
+            events.append('write_done')
+        finally:
+            storage._partition(1).lock.release_write()
+        same.join(timeout=5)
+        
+        assert events == ['other', 'write_done', 'same']
+    
+    def test_concurrent_writes_many_users(self, fast_switching):
+        """Test que los ids siguen siendo únicos y consecutivos con escrituras en varias particiones"""
+        storage = MemoryStorage(partitions=8)
+        users = 32
+        
+        def writer(user_id):
+            ids = []
+            for day in range(1, 29):
+                entry = self._entry(user_id, day)
+                storage.add_weight_entry(entry)
+                ids.append(entry.entry_id)
+            entries = [self._entry(user_id, day) for day in range(1, 29)]
+            storage.add_weight_entries(entries)
+            return ids + [entry.entry_id for entry in entries]
+        
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            all_ids = [entry_id for ids in pool.map(writer, range(1, users + 1)) for entry_id in ids]
+        
+        assert sorted(all_ids) == list(range(1, users * 28 * 2 + 1))
+        for user_id in range(1, users + 1):
+            assert storage.get_weight_count(user_id) == 28
@@ -8,8 +8,15 @@ se prueban en los tests de validación y en los tests de API.
 Las funciones helper están diseñadas para ser "puras" (solo cálculo),
 mientras que las validaciones defensivas están en la capa superior (rutas).
 """
+import random
+
+import numpy as np
 import pytest
-from app.helpers import calculate_bmi, get_bmi_description
+from app.helpers import (
+    BMI_CATEGORY_KEYS, calculate_bmi, calculate_bmi_array, classify_bmi_array,
+    bmi_category_labels, get_bmi_description
+)
+from app.translations import get_bmi_complete_description
 
 
 class TestCalculateBMI:
@@ -190,3 +197,41 @@ class TestGetBMIDescription:
         assert "Obesidad Clase II" in get_bmi_description(39.99)
         assert "Obesidad Clase III" in get_bmi_description(40.0)
 
+
+class TestVectorizedBMI:
+    """Tests de caja blanca para calculate_bmi_array() y classify_bmi_array()"""
+    
+    def test_same_result_as_calculate_bmi(self):
+        """Test que coincide con calculate_bmi() en pesos y tallas aleatorios"""
+        rng = random.Random(42)
+        weights = [round(rng.uniform(2, 650), 1) for _ in range(20000)]
+        heights = [round(rng.uniform(0.4, 2.72), 2) for _ in range(20000)]
+        
+        result = calculate_bmi_array(weights, heights).tolist()
+        assert result == [calculate_bmi(w, h) for w, h in zip(weights, heights)]
+    
+    def test_rounding_ties_like_round(self):
+        """Test que los valores en la mitad se redondean como round() y no como np.round"""
+        # 21.4 / 2.0 ** 2 = 5.35, que en binario es 5.3499...
+        assert np.round(21.4 / 2.0 ** 2, 1) == 5.4
+        assert calculate_bmi_array([21.4], [2.0]).tolist() == [calculate_bmi(21.4, 2.0)] == [5.3]
+    
+    def test_single_height(self):
+        """Test que una sola talla se aplica a todos los pesos"""
+        assert calculate_bmi_array([70, 60, 80], 1.75).tolist() == [22.9, 19.6, 26.1]
+    
+    def test_height_not_positive(self):
+        """Test que las tallas no positivas dan 0 como calculate_bmi()"""
+        assert calculate_bmi_array([70, 70, 70], [0, -1, 1.75]).tolist() == [0, 0, 22.9]
+    
+    @pytest.mark.parametrize("bmi", [10.0, 18.4, 18.5, 24.9, 25.0, 29.9, 30.0, 34.9, 35.0, 39.9, 40.0, 60.0])
+    def test_classification_matches_get_bmi_description(self, bmi):
+        """Test que la clasificación vectorizada coincide con get_bmi_description() en los límites"""
+        key = BMI_CATEGORY_KEYS[classify_bmi_array(np.array([bmi]))[0]]
+        assert get_bmi_complete_description(key) == get_bmi_description(bmi)
+    
+    def test_labels_are_shared(self):
+        """Test que los puntos de la misma clasificación comparten la misma cadena"""
+        categories = bmi_category_labels()[classify_bmi_array(np.array([22.0, 23.0, 45.0]))].tolist()
+        assert categories[0] is categories[1]
+        assert categories == ["Peso Normal", "Peso Normal", "Obesidad Clase III"]
@@ -0,0 +1,278 @@
+"""
+Tests de Caja Blanca para la persistencia con diario y snapshots
+Prueban que MemoryStorage recupera sus datos tras un reinicio
+"""
+import os
+import shutil
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta, date
+from app import journal
+from app.storage import MemoryStorage, WeightEntryData, UserData
+from app.journal import JournaledMemoryStorage, SNAPSHOT_FILE, SEGMENT_PREFIX
+from app.config import USER_ID
+
+
+def _user():
+    return UserData(user_id=USER_ID, first_name="Juan", last_name="Pérez García",
+                    birth_date=date(1990, 5, 15), height_m=1.75)
+
+
+def _add_weights(storage, count, base_date=datetime(2024, 1, 1, 9, 0)):
+    for i in range(count):
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i,
+                                                 recorded_date=base_date + timedelta(days=i)))
+
+
+def _segments(directory):
+    return [name for name in os.listdir(directory) if name.startswith(SEGMENT_PREFIX)]
+
+
+class TestJournaledMemoryStorage:
+    """Tests de caja blanca para JournaledMemoryStorage"""
+    
+    def test_replay_journal_after_restart(self, tmp_path):
+        """Test que las escrituras se recuperan reproduciendo el diario"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        storage.save_user(_user())
+        _add_weights(storage, 3)
+        # Reemplazo del mismo día
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=80.0,
+                                                 recorded_date=datetime(2024, 1, 3, 20, 0)))
+        expected_ids = [e.entry_id for e in storage.get_all_weight_entries(USER_ID)]
+        # Simula una caída: no se llama a close()
+        storage._journal.close()
+        
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        assert restored.get_user(USER_ID).first_name == "Juan"
+        assert [e.entry_id for e in restored.get_all_weight_entries(USER_ID)] == expected_ids
+        assert restored.get_max_weight(USER_ID) == 80.0
+        assert restored.get_weight_count(USER_ID) == 3
+        
+        # Los nuevos ids continúan tras el último recuperado
+        new_entry = WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=71.0,
+                                    recorded_date=datetime(2024, 2, 1, 9, 0))
+        restored.add_weight_entry(new_entry)
+        assert new_entry.entry_id == max(expected_ids) + 1
+        restored.close()
+    
+    def test_compaction_writes_snapshot_and_truncates_journal(self, tmp_path):
+        """Test que la compactación guarda un snapshot y descarta los segmentos incluidos"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        storage.save_user(_user())
+        _add_weights(storage, 5)
+        storage.compact()
+        
+        assert os.path.exists(tmp_path / SNAPSHOT_FILE)
+        assert len(_segments(tmp_path)) == 1
+        assert os.path.getsize(tmp_path / _segments(tmp_path)[0]) == 0
+        
+        # Escrituras posteriores al snapshot quedan en la cola del diario
+        _add_weights(storage, 2, base_date=datetime(2024, 2, 1, 9, 0))
+        storage._journal.close()
+        
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 7
+        assert restored._journal.sequence == storage._journal.sequence
+        restored.close()
+    
+    def test_close_writes_final_snapshot(self, tmp_path):
+        """Test que close() deja todo en el snapshot y el reinicio no reproduce diario"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        storage.save_user(_user())
+        _add_weights(storage, 3)
+        storage.close()
+        
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 3
+        assert restored.get_last_weight_entry(USER_ID).weight_kg == 72.0
+        restored.close()
+    
+    def test_incomplete_last_record_is_ignored(self, tmp_path):
+        """Test que una línea incompleta al final del diario no impide arrancar"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        storage.save_user(_user())
+        _add_weights(storage, 2)
+        storage._journal.close()
+        
+        segment = tmp_path / _segments(tmp_path)[0]
+        with open(segment, 'a', encoding='utf-8') as f:
+            f.write('{"t":"w","d":{"entry_id"')
+        
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 2
+        restored.close()
+    
+    def test_restore_with_different_partitions(self, tmp_path):
+        """Test que el snapshot y el diario se cargan aunque cambie el número de particiones"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0, partitions=2)
+        for user_id in range(1, 6):
+            storage.save_user(UserData(user_id=user_id, first_name="Juan", last_name=str(user_id),
+                                       birth_date=date(1990, 5, 15), height_m=1.75))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=user_id, weight_kg=70.0,
+                                                     recorded_date=datetime(2024, 1, 1, 9, 0)))
+        storage.compact()
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=3, weight_kg=71.0,
+                                                 recorded_date=datetime(2024, 1, 2, 9, 0)))
+        storage.close()
+        
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0, partitions=7)
+        assert [restored.get_weight_count(user_id) for user_id in range(1, 6)] == [1, 1, 2, 1, 1]
+        assert restored.get_user(4).last_name == "4"
+        new_entry = WeightEntryData(entry_id=0, user_id=1, weight_kg=71.0,
+                                    recorded_date=datetime(2024, 1, 2, 9, 0))
+        restored.add_weight_entry(new_entry)
+        assert new_entry.entry_id == 7
+        restored.close()
+    
+    def test_load_is_persisted(self, tmp_path):
+        """Test que los datos cargados con load() se conservan tras una caída"""
+        source = MemoryStorage()
+        source.save_user(_user())
+        _add_weights(source, 3)
+        source.dump(str(tmp_path / 'export.bin'))
+        
+        storage = JournaledMemoryStorage(str(tmp_path / 'journal'), compaction_interval=0)
+        storage.load(str(tmp_path / 'export.bin'))
+        storage._journal.close()
+        
+        restored = JournaledMemoryStorage(str(tmp_path / 'journal'), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 3
+        assert restored.get_user(USER_ID).height_m == 1.75
+        restored.close()
+
+
+class TestJournalGroupCommit:
+    """Tests de caja blanca para el volcado por lotes y el modo write-behind"""
+    
+    @pytest.fixture
+    def fsync_calls(self, monkeypatch):
+        """Cuenta las llamadas a os.fsync del diario"""
+        calls = []
+        original = os.fsync
+        monkeypatch.setattr(journal.os, 'fsync', lambda fd: (calls.append(fd), original(fd)))
+        return calls
+    
+    def test_one_fsync_per_batch(self, tmp_path, fsync_calls):
+        """Test que la cola se escribe en lotes de max_batch registros con un fsync cada uno"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0,
+                                         flush_interval=60, max_batch=4)
+        storage.save_user(_user())
+        _add_weights(storage, 9)
+        assert fsync_calls == []
+        
+        storage.flush()
+        assert len(fsync_calls) == 3
+        storage.close()
+    
+    def test_synchronous_mode_writes_before_returning(self, tmp_path):
+        """Test que con flush_interval = 0 la escritura está en el diario al volver"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        storage.save_user(_user())
+        _add_weights(storage, 2)
+        assert storage._pending == []
+        assert storage._journal.sequence == 3
+        storage.close()
+    
+    def test_concurrent_synchronous_writes_share_fsync(self, tmp_path, monkeypatch):
+        """Test que las escrituras síncronas simultáneas se agrupan en menos fsync"""
+        calls = []
+        original = os.fsync
+        monkeypatch.setattr(journal.os, 'fsync', lambda fd: (calls.append(fd), time.sleep(0.02), original(fd)))
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        
+        def write(index):
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=index + 1, weight_kg=70.0,
+                                                     recorded_date=datetime(2024, 1, 1, 9, 0)))
+        
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert storage._durable == 16
+        assert len(calls) < 16
+        storage.close()
+    
+    def test_write_behind_does_not_wait_for_disk(self, tmp_path, monkeypatch):
+        """Test que las escrituras vuelven aunque el disco esté bloqueado"""
+        disk_released = threading.Event()
+        original = os.fsync
+        monkeypatch.setattr(journal.os, 'fsync', lambda fd: (disk_released.wait(5), original(fd)))
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0,
+                                         flush_interval=0.01, max_batch=1)
+        
+        storage.save_user(_user())
+        _add_weights(storage, 3)
+        # El hilo de volcado está esperando al disco, pero los datos ya se leen de memoria
+        assert storage.get_weight_count(USER_ID) == 3
+        
+        disk_released.set()
+        storage.close()
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 3
+        restored.close()
+    
+    def test_background_flush(self, tmp_path):
+        """Test que el hilo vuelca la cola sin llamar a flush()"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0, flush_interval=0.01)
+        storage.save_user(_user())
+        _add_weights(storage, 2)
+        
+        deadline = time.monotonic() + 5
+        while storage._journal.sequence < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert storage._journal.sequence == 3
+        storage.close()
+    
+    def test_close_drains_pending_writes(self, tmp_path):
+        """Test que close() escribe la cola pendiente antes de terminar"""
+        storage = JournaledMemoryStorage(str(tmp_path), compaction_interval=0, flush_interval=60)
+        storage.save_user(_user())
+        _add_weights(storage, 5)
+        assert len(storage._pending) == 6
+        storage.close()
+        
+        restored = JournaledMemoryStorage(str(tmp_path), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 5
+        restored.close()
+    
+    def test_crash_loses_only_pending_writes(self, tmp_path):
+        """Test que una caída solo pierde lo que seguía en la cola (ventana de pérdida)"""
+        storage = JournaledMemoryStorage(str(tmp_path / "journal"), compaction_interval=0, flush_interval=60)
+        storage.save_user(_user())
+        _add_weights(storage, 2)
+        storage.flush()
+        _add_weights(storage, 3, base_date=datetime(2024, 2, 1, 9, 0))
+        # Simula una caída: lo que hay en disco en este momento
+        crashed = tmp_path / "crash"
+        shutil.copytree(tmp_path / "journal", crashed)
+        storage.close()
+        
+        restored = JournaledMemoryStorage(str(crashed), compaction_interval=0)
+        assert restored.get_weight_count(USER_ID) == 2
+        restored.close()
+    
+    def test_compaction_with_pending_writes(self, tmp_path):
+        """Test que el snapshot tomado con escrituras en la cola se recupera correctamente"""
+        storage = JournaledMemoryStorage(str(tmp_path / "journal"), compaction_interval=0, flush_interval=60)
+        storage.save_user(_user())
+        _add_weights(storage, 2)
+        storage.flush()
+        # Reemplazo del mismo día y un día nuevo, aún en la cola
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=75.0,
+                                                 recorded_date=datetime(2024, 1, 2, 20, 0)))
+        _add_weights(storage, 1, base_date=datetime(2024, 1, 3, 9, 0))
+        storage.compact()
+        storage.flush()
+        expected = [(e.entry_id, e.weight_kg) for e in storage.get_all_weight_entries(USER_ID)]
+        # Caída después del volcado: snapshot más las escrituras repetidas en el diario
+        crashed = tmp_path / "crash"
+        shutil.copytree(tmp_path / "journal", crashed)
+        storage.close()
+        
+        restored = JournaledMemoryStorage(str(crashed), compaction_interval=0)
+        assert [(e.entry_id, e.weight_kg) for e in restored.get_all_weight_entries(USER_ID)] == expected
+        restored.close()
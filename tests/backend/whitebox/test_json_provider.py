@@ -0,0 +1,85 @@
+"""
+Tests de Caja Blanca para el proveedor JSON
+Prueban que orjson y el proveedor estándar producen el mismo contenido
+"""
+import json
+from datetime import date, datetime
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app import json_provider
+from app.storage import WeightEntryData
+from tests.backend.conftest import app, client, sample_user, sample_weights
+
+
+def _pairs(text):
+    """Contenido JSON con los objetos como listas de pares, en el orden del texto"""
+    return json.loads(text, object_pairs_hook=list)
+
+
+class TestJSONProvider:
+    """Tests de caja blanca para init_json() y OrjsonProvider"""
+    
+    def test_orjson_installed(self, app):
+        """Test que con orjson instalado la aplicación usa OrjsonProvider"""
+        pytest.importorskip('orjson')
+        assert isinstance(app.json, json_provider.OrjsonProvider)
+    
+    def test_fallback_without_orjson(self, monkeypatch):
+        """Test que sin orjson se mantiene el proveedor estándar de Flask"""
+        monkeypatch.setattr(json_provider, 'orjson_available', lambda: False)
+        flask_app = Flask(__name__)
+        json_provider.init_json(flask_app)
+        assert type(flask_app.json) is DefaultJSONProvider
+    
+    def test_same_output_as_standard_provider(self, app):
+        """Test que el contenido serializado coincide con el del proveedor estándar"""
+        pytest.importorskip('orjson')
+        data = {
+            "weights": [{"id": 1, "peso_kg": 70.5, "fecha_registro": "2024-01-01T10:00:00"}],
+            "texto": "Pérez García",
+            "fecha": date(2024, 1, 2),
+            "momento": datetime(2024, 1, 2, 3, 4, 5),
+            "dias": {1: "un día"},
+        }
+        standard = DefaultJSONProvider(app)
+        assert json.loads(app.json.dumps(data)) == json.loads(standard.dumps(data))
+        with app.app_context():
+            response = app.json.response(data)
+        assert json.loads(response.get_data()) == json.loads(standard.dumps(data))
+    
+    def test_same_key_order_as_standard_provider(self, app):
+        """Test que las claves se ordenan igual que con sort_keys del proveedor estándar"""
+        pytest.importorskip('orjson')
+        data = {"peso_kg": 70.5, "id": 1, "fecha_registro": "2024-01-01T10:00:00",
+                "anidado": {"z": 1, "a": 2}}
+        standard = DefaultJSONProvider(app)
+        assert _pairs(app.json.dumps(data)) == _pairs(standard.dumps(data))
+        with app.app_context():
+            response = app.json.response(data)
+        assert _pairs(response.get_data()) == _pairs(standard.dumps(data))
+    
+    def test_request_json_parsing(self, client, sample_user):
+        """Test que los cuerpos JSON de las peticiones se siguen leyendo y validando"""
+        response = client.post('/api/weight', data='{"peso_kg": 70.5}', content_type='application/json')
+        assert response.status_code == 201
+        response = client.post('/api/weight', data='{no es json', content_type='application/json')
+        assert response.status_code == 400
+
+
+class TestRecordedDateIso:
+    """Tests de caja blanca para la fecha ISO cacheada de WeightEntryData"""
+    
+    def test_iso_matches_isoformat(self):
+        """Test que recorded_date_iso coincide con isoformat() y se calcula una vez"""
+        entry = WeightEntryData(entry_id=1, user_id=1, weight_kg=70.0,
+                                recorded_date=datetime(2024, 1, 1, 10, 0, 0, 5))
+        assert entry.recorded_date_iso == '2024-01-01T10:00:00.000005'
+        assert entry.recorded_date_iso is entry.recorded_date_iso
+    
+    def test_api_uses_same_format(self, client, sample_weights):
+        """Test que la API mantiene el formato de isoformat()"""
+        data = json.loads(client.get('/api/weights').data)
+        assert data['weights'][-1]['fecha_registro'] == '2024-01-01T10:00:00'
@@ -0,0 +1,135 @@
+"""
+Tests de Caja Blanca para el snapshot binario del almacenamiento
+Prueban que dump()/load() conservan todos los datos y rechazan ficheros no válidos
+"""
+import struct
+from datetime import datetime, timedelta, date
+
+import pytest
+
+from app.snapshot import HEADER, SNAPSHOT_MAGIC, read_snapshot
+from app.storage import MemoryStorage, UserData, WeightEntryData
+
+
+def _user(user_id, first_name="Juan", birth_date=date(1990, 5, 15)):
+    return UserData(user_id=user_id, first_name=first_name, last_name="Pérez García",
+                    birth_date=birth_date, height_m=1.75)
+
+
+def _filled_storage(partitions=4):
+    storage = MemoryStorage(partitions=partitions)
+    for user_id in range(1, 6):
+        storage.save_user(_user(user_id, first_name=f"Usuario {user_id}"))
+        for day in range(user_id * 3):
+            storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=user_id, weight_kg=80.0 - day * 0.5 + user_id,
+                recorded_date=datetime(2024, 1, 1, 8, 30) + timedelta(days=day)
+            ))
+    return storage
+
+
+class TestBinarySnapshot:
+    """Tests de caja blanca para MemoryStorage.dump() y MemoryStorage.load()"""
+
+    def test_roundtrip_preserves_all_data(self, tmp_path):
+        """Test que un snapshot cargado en otro almacenamiento devuelve los mismos datos"""
+        path = str(tmp_path / 'snapshot.bin')
+        storage = _filled_storage()
+        storage.dump(path)
+
+        restored = MemoryStorage(partitions=3)
+        restored.load(path)
+        for user_id in range(1, 6):
+            original_user = storage.get_user(user_id)
+            restored_user = restored.get_user(user_id)
+            assert restored_user.to_dict() == original_user.to_dict()
+            assert ([e.to_dict() for e in restored.get_all_weight_entries(user_id)]
+                    == [e.to_dict() for e in storage.get_all_weight_entries(user_id)])
+            assert restored.get_min_weight(user_id) == storage.get_min_weight(user_id)
+            assert restored.get_max_weight(user_id) == storage.get_max_weight(user_id)
+
+    def test_restored_storage_accepts_writes(self, tmp_path):
+        """Test que tras cargar se puede seguir escribiendo y los ids continúan"""
+        path = str(tmp_path / 'snapshot.bin')
+        storage = _filled_storage()
+        storage.dump(path)
+        restored = MemoryStorage()
+        restored.load(path)
+
+        entry = WeightEntryData(entry_id=0, user_id=2, weight_kg=60.0,
+                                recorded_date=datetime(2024, 1, 3, 20, 0))
+        restored.add_weight_entry(entry)
+        assert entry.entry_id == 1 + sum(user_id * 3 for user_id in range(1, 6))
+        # Reemplaza el día 3 y pasa a ser el mínimo
+        assert restored.get_weight_count(2) == 6
+        assert restored.get_min_weight(2) == 60.0
+
+    def test_dates_before_epoch_and_non_ascii_names(self, tmp_path):
+        """Test que se conservan fechas anteriores a 1970 y nombres con acentos"""
+        path = str(tmp_path / 'snapshot.bin')
+        storage = MemoryStorage()
+        storage.save_user(_user(7, first_name="Ángela Núñez", birth_date=date(1931, 2, 28)))
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=7, weight_kg=55.25,
+                                                 recorded_date=datetime(1965, 7, 4, 23, 59, 59, 5)))
+        storage.dump(path)
+
+        restored = MemoryStorage()
+        restored.load(path)
+        assert restored.get_user(7).first_name == "Ángela Núñez"
+        assert restored.get_user(7).birth_date == date(1931, 2, 28)
+        assert restored.get_last_weight_entry(7).recorded_date == datetime(1965, 7, 4, 23, 59, 59, 5)
+
+    def test_user_without_entries_and_entries_without_user(self, tmp_path):
+        """Test que se guardan usuarios sin pesajes y pesajes de usuarios sin datos"""
+        path = str(tmp_path / 'snapshot.bin')
+        storage = MemoryStorage()
+        storage.save_user(_user(1))
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=2, weight_kg=70.0,
+                                                 recorded_date=datetime(2024, 1, 1, 8, 0)))
+        storage.dump(path)
+
+        restored = MemoryStorage()
+        restored.load(path)
+        assert restored.get_user(1) is not None
+        assert restored.get_weight_count(1) == 0
+        assert restored.get_user(2) is None
+        assert restored.get_weight_count(2) == 1
+
+    def test_load_requires_resync(self, tmp_path):
+        """Test que cargar cambia la versión y los clientes anteriores deben resincronizar"""
+        path = str(tmp_path / 'snapshot.bin')
+        _filled_storage().dump(path)
+        storage = _filled_storage()
+        version = storage.get_data_version(1)
+
+        storage.load(path)
+        assert storage.get_data_version(1) > version
+        assert storage.get_weight_changes(1, version) is None
+        assert storage.get_weight_changes(1, storage.get_data_version(1)) == []
+
+    def test_rejects_invalid_files(self, tmp_path):
+        """Test que se rechazan ficheros de otro tipo, de otra versión o truncados"""
+        path = tmp_path / 'snapshot.bin'
+        _filled_storage().dump(str(path))
+        data = path.read_bytes()
+
+        invalid = {
+            'empty': b'',
+            'magic': b'X' * len(SNAPSHOT_MAGIC) + data[len(SNAPSHOT_MAGIC):],
+            'version': data[:8] + struct.pack('<I', 99) + data[12:],
+            'truncated': data[:-8],
+        }
+        for name, content in invalid.items():
+            invalid_path = tmp_path / f'{name}.bin'
+            invalid_path.write_bytes(content)
+            with pytest.raises(ValueError):
+                read_snapshot(str(invalid_path))
+
+    def test_header_counts(self, tmp_path):
+        """Test que la cabecera registra usuarios, entradas y siguiente entry_id"""
+        path = tmp_path / 'snapshot.bin'
+        _filled_storage().dump(str(path))
+        fields = HEADER.unpack_from(path.read_bytes())
+        _, _, _, sequence, next_entry_id, user_count, entry_count, _ = fields
+        assert (sequence, user_count, entry_count) == (0, 5, 45)
+        assert next_entry_id == 46
@@ -0,0 +1,275 @@
+"""
+Tests de Caja Blanca para el almacenamiento en SQLite
+Prueban la implementación persistente de StorageInterface
+"""
+import json
+import pytest
+from datetime import datetime, timedelta, date
+from app import create_app
+from app.storage import MemoryStorage, WeightEntryData, UserData
+from app.sqlite_storage import SqliteStorage
+from app.config import USER_ID
+
+
+@pytest.fixture
+def sqlite_storage(tmp_path):
+    """Storage SQLite sobre un fichero temporal"""
+    storage = SqliteStorage(str(tmp_path / "app.db"))
+    storage.save_user(UserData(
+        user_id=USER_ID,
+        first_name="Juan",
+        last_name="Pérez García",
+        birth_date=date(1990, 5, 15),
+        height_m=1.75
+    ))
+    yield storage
+    storage.close()
+
+
+class TestSqliteStorage:
+    """Tests de caja blanca para SqliteStorage"""
+    
+    def test_user_roundtrip(self, sqlite_storage):
+        """Test guardar y actualizar un usuario"""
+        user = sqlite_storage.get_user(USER_ID)
+        assert user.first_name == "Juan"
+        assert user.birth_date == date(1990, 5, 15)
+        
+        user.height_m = 1.80
+        sqlite_storage.save_user(user)
+        assert sqlite_storage.get_user(USER_ID).height_m == 1.80
+        assert sqlite_storage.get_user(99) is None
+    
+    def test_same_day_replacement(self, sqlite_storage):
+        """Test que un registro del mismo día reemplaza al anterior con un nuevo id"""
+        base_date = datetime(2024, 3, 10, 9, 0)
+        first = WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0, recorded_date=base_date)
+        second = WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=71.0,
+                                 recorded_date=base_date.replace(hour=20))
+        sqlite_storage.add_weight_entry(first)
+        sqlite_storage.add_weight_entry(second)
+        
+        entries = sqlite_storage.get_all_weight_entries(USER_ID)
+        assert len(entries) == 1
+        assert entries[0].weight_kg == 71.0
+        assert entries[0].recorded_date == base_date.replace(hour=20)
+        assert second.entry_id > first.entry_id
+    
+    def test_queries(self, sqlite_storage):
+        """Test de las consultas de última entrada, agregados y orden"""
+        base_date = datetime(2024, 3, 10, 9, 0)
+        for days_ago, weight in [(5, 70.0), (0, 72.0), (2, 74.0)]:
+            sqlite_storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=USER_ID, weight_kg=weight,
+                recorded_date=base_date - timedelta(days=days_ago)))
+        
+        assert sqlite_storage.get_last_weight_entry(USER_ID).weight_kg == 72.0
+        previous = sqlite_storage.get_last_weight_entry_from_different_date(USER_ID, base_date.date())
+        assert previous.weight_kg == 74.0
+        assert sqlite_storage.get_weight_count(USER_ID) == 3
+        assert sqlite_storage.get_max_weight(USER_ID) == 74.0
+        assert sqlite_storage.get_min_weight(USER_ID) == 70.0
+        assert [e.weight_kg for e in sqlite_storage.get_all_weight_entries(USER_ID)] == [72.0, 74.0, 70.0]
+    
+    def test_empty_user(self, sqlite_storage):
+        """Test de las consultas sin registros"""
+        assert sqlite_storage.get_last_weight_entry(USER_ID) is None
+        assert sqlite_storage.get_weight_count(USER_ID) == 0
+        assert sqlite_storage.get_max_weight(USER_ID) is None
+        assert sqlite_storage.get_min_weight(USER_ID) is None
+        assert sqlite_storage.get_all_weight_entries(USER_ID) == []
+    
+    def test_data_survives_reopen(self, tmp_path):
+        """Test que los datos se conservan al volver a abrir la base de datos"""
+        path = str(tmp_path / "app.db")
+        storage = SqliteStorage(path)
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                                 recorded_date=datetime(2024, 3, 10, 9, 0)))
+        storage.close()
+        
+        reopened = SqliteStorage(path)
+        assert reopened.get_weight_count(USER_ID) == 1
+        reopened.close()
+    
+    def test_min_max_use_index(self, sqlite_storage):
+        """Test que máximo y mínimo se resuelven con el índice, sin recorrer la tabla"""
+        conn = sqlite_storage._connection()
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT MAX(weight_kg) FROM weight_entries WHERE user_id = ?", (USER_ID,)
+        ).fetchall()
+        assert any("COVERING INDEX ix_weight_entries_user_weight" in row[-1] for row in plan)
+    
+    def test_api_with_sqlite_storage(self, sqlite_storage):
+        """Test que la API funciona con SqliteStorage"""
+        app = create_app(storage=sqlite_storage)
+        client = app.test_client()
+        
+        response = client.post('/api/weight', data=json.dumps({'peso_kg': 70.5}),
+                               content_type='application/json')
+        assert response.status_code == 201
+        stats = client.get('/api/stats').get_json()
+        assert stats['num_pesajes'] == 1
+        assert stats['peso_max'] == 70.5
+    
+    def test_iter_weight_entries_in_chunks(self, sqlite_storage):
+        """Test que el recorrido por bloques devuelve todo el historial en orden"""
+        base_date = datetime(2024, 1, 1, 9, 0)
+        sqlite_storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i % 3,
+                            recorded_date=base_date + timedelta(days=i))
+            for i in range(25)
+        ])
+        
+        chunks = list(sqlite_storage.iter_weight_entries(USER_ID, chunk_size=10))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        dates = [entry.recorded_date for chunk in chunks for entry in chunk]
+        assert dates == sorted(dates)
+        assert len(set(dates)) == 25
+    
+    def test_weight_entries_after(self, sqlite_storage):
+        """Test que el bloque siguiente coincide con el de MemoryStorage"""
+        from app.storage import MemoryStorage
+        memory = MemoryStorage()
+        base_date = datetime(2024, 1, 1, 9, 0)
+        for storage in (sqlite_storage, memory):
+            storage.add_weight_entries([
+                WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i,
+                                recorded_date=base_date + timedelta(days=i))
+                for i in range(5)
+            ])
+        for after in (None, base_date, base_date + timedelta(days=1, hours=3), base_date + timedelta(days=4)):
+            expected = [e.weight_kg for e in memory.get_weight_entries_after(USER_ID, after, 2)]
+            actual = [e.weight_kg for e in sqlite_storage.get_weight_entries_after(USER_ID, after, 2)]
+            assert actual == expected
+        assert expected == []
+        assert [e.weight_kg for e in memory.get_weight_entries_after(USER_ID, base_date, 2)] == [71.0, 72.0]
+
+    def test_weight_entries_range(self, sqlite_storage):
+        """Test que la consulta por rango coincide con la de MemoryStorage"""
+        from app.storage import MemoryStorage
+        memory = MemoryStorage()
+        base_date = datetime(2024, 1, 1, 9, 0)
+        for storage in (sqlite_storage, memory):
+            storage.add_weight_entries([
+                WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i,
+                                recorded_date=base_date + timedelta(days=i, minutes=i))
+                for i in range(20)
+            ])
+        
+        for start, end, limit in [
+            (None, None, None),
+            (None, None, 5),
+            (base_date + timedelta(days=3), base_date + timedelta(days=9, minutes=9), None),
+            (base_date + timedelta(days=3), None, 4),
+        ]:
+            expected = [e.recorded_date for e in memory.get_weight_entries_range(USER_ID, start, end, limit)]
+            actual = [e.recorded_date for e in sqlite_storage.get_weight_entries_range(USER_ID, start, end, limit)]
+            assert actual == expected
+    
+    def test_weight_entries_range_uses_index(self, sqlite_storage):
+        """Test que la consulta por rango usa el índice (user_id, recorded_date)"""
+        from app.sqlite_storage import _SQL_ENTRIES_RANGE
+        plan = sqlite_storage._connection().execute(
+            "EXPLAIN QUERY PLAN " + _SQL_ENTRIES_RANGE, (USER_ID, '', '~', 10)
+        ).fetchall()
+        detail = ' '.join(row[-1] for row in plan)
+        assert 'ix_weight_entries_user_recorded' in detail
+        assert 'TEMP B-TREE' not in detail
+    
+    def test_data_version_persists(self, sqlite_storage, tmp_path):
+        """Test que la versión crece con cada escritura y se conserva al reabrir"""
+        initial = sqlite_storage.get_data_version(USER_ID)
+        sqlite_storage.add_weight_entry(WeightEntryData(
+            entry_id=0, user_id=USER_ID, weight_kg=70.0, recorded_date=datetime(2024, 1, 1, 8, 0)
+        ))
+        first = sqlite_storage.get_data_version(USER_ID)
+        sqlite_storage.add_weight_entry(WeightEntryData(
+            entry_id=0, user_id=USER_ID, weight_kg=71.0, recorded_date=datetime(2024, 1, 2, 8, 0)
+        ))
+        second = sqlite_storage.get_data_version(USER_ID)
+        assert 0 < initial < first < second
+        assert sqlite_storage.get_data_version(999) == 0
+        
+        reopened = SqliteStorage(str(tmp_path / 'app.db'))
+        assert reopened.get_data_version(USER_ID) == second
+        reopened.close()
+    
+    def test_weight_changes(self, sqlite_storage):
+        """Test que el registro de cambios devuelve el estado actual de los días modificados"""
+        sqlite_storage.add_weight_entry(WeightEntryData(
+            entry_id=0, user_id=USER_ID, weight_kg=70.0, recorded_date=datetime(2024, 1, 1, 8, 0)
+        ))
+        version = sqlite_storage.get_data_version(USER_ID)
+        for weight, day in [(71.0, 3), (72.0, 2), (73.0, 3)]:
+            sqlite_storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=USER_ID, weight_kg=weight, recorded_date=datetime(2024, 1, day, 8, 0)
+            ))
+        
+        changes = sqlite_storage.get_weight_changes(USER_ID, version)
+        assert [(c.recorded_date.day, c.weight_kg) for c in changes] == [(2, 72.0), (3, 73.0)]
+        assert sqlite_storage.get_weight_changes(USER_ID, sqlite_storage.get_data_version(USER_ID)) == []
+    
+    def test_migrates_database_without_version_column(self, tmp_path):
+        """Test que una base de datos anterior recibe la columna version al abrirse"""
+        import sqlite3
+        path = str(tmp_path / 'old.db')
+        conn = sqlite3.connect(path)
+        conn.executescript("""
+            CREATE TABLE weight_entries (
+                entry_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                day TEXT NOT NULL,
+                recorded_date TEXT NOT NULL,
+                weight_kg REAL NOT NULL
+            );
+            INSERT INTO weight_entries (user_id, day, recorded_date, weight_kg)
+                VALUES (1, '2024-01-01', '2024-01-01T08:00:00.000000', 70.0);
+        """)
+        conn.commit()
+        conn.close()
+        
+        storage = SqliteStorage(path)
+        assert storage.get_weight_count(USER_ID) == 1
+        assert len(storage.get_weight_changes(USER_ID, -1)) == 1
+        storage.close()
+    
+    def test_user_snapshot(self, sqlite_storage):
+        """Test que la lectura conjunta dentro de una transacción devuelve todos los datos"""
+        for weight, day in [(70.0, 1), (72.0, 2)]:
+            sqlite_storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=USER_ID, weight_kg=weight, recorded_date=datetime(2024, 1, day, 8, 0)
+            ))
+        
+        snapshot = sqlite_storage.get_user_snapshot(USER_ID)
+        assert snapshot.user.first_name == "Juan"
+        assert snapshot.weight_count == 2
+        assert (snapshot.min_weight, snapshot.max_weight) == (70.0, 72.0)
+        assert snapshot.last_weight_entry.weight_kg == 72.0
+        assert [e.weight_kg for e in snapshot.weight_entries] == [72.0, 70.0]
+        assert not sqlite_storage._connection().in_transaction
+    
+    def test_recorded_date_iso_from_database(self, sqlite_storage):
+        """Test que la fecha ISO guardada se reutiliza con el formato de isoformat()"""
+        for recorded_date in (datetime(2024, 1, 1, 8, 0), datetime(2024, 1, 2, 8, 0, 0, 250)):
+            sqlite_storage.add_weight_entry(WeightEntryData(
+                entry_id=0, user_id=USER_ID, weight_kg=70.0, recorded_date=recorded_date
+            ))
+        
+        for entry in sqlite_storage.get_all_weight_entries(USER_ID):
+            assert entry.recorded_date_iso == entry.recorded_date.isoformat()
+    
+    def test_weight_series_matches_memory(self, sqlite_storage):
+        """Test que la serie calculada en SQL coincide con la de MemoryStorage"""
+        memory = MemoryStorage()
+        dates = [
+            datetime(1965, 3, 4, 5, 6, 7, 891),
+            datetime(2024, 1, 2, 23, 59, 59, 999999),
+            datetime(2024, 1, 1, 0, 0),
+        ]
+        for storage in (sqlite_storage, memory):
+            for recorded_date in dates:
+                storage.add_weight_entry(WeightEntryData(
+                    entry_id=0, user_id=USER_ID, weight_kg=70.5, recorded_date=recorded_date
+                ))
+        
+        assert sqlite_storage.get_weight_series(USER_ID) == memory.get_weight_series(USER_ID)
@@ -0,0 +1,86 @@
+"""
+Tests de Caja Blanca para el arranque de la aplicación
+Comprueban, en un intérprete nuevo, qué módulos se cargan al importar app,
+al crear la aplicación y al servir las primeras peticiones
+"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+
+
+def _loaded_modules(code, modules):
+    """Ejecuta code en un proceso nuevo y devuelve cuáles de modules quedaron cargados"""
+    script = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {modules!r} if m in sys.modules]))"
+    output = subprocess.run([sys.executable, '-c', script], check=True, cwd=PROJECT_ROOT,
+                            capture_output=True, text=True).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+HEAVY_MODULES = ['flask', 'flask_cors', 'numpy', 'app.analytics', 'app.journal', 'app.sqlite_storage']
+
+
+class TestLazyStartup:
+    """Tests de caja blanca para la carga diferida de módulos"""
+
+    def test_import_package_does_not_load_flask(self):
+        """Test que importar app (servidor de almacenamiento, gunicorn.conf.py) no carga Flask"""
+        assert _loaded_modules("import app.storage_server", HEAVY_MODULES) == []
+
+    def test_first_requests_do_not_load_numpy(self):
+        """Test que crear la aplicación y servir la página y la API básica no carga NumPy"""
+        code = (
+            "from app import create_app\n"
+            "client = create_app().test_client()\n"
+            "for path in ('/', '/api/config', '/api/messages', '/api/user', '/api/stats'):\n"
+            "    client.get(path)\n"
+        )
+        assert _loaded_modules(code, HEAVY_MODULES) == ['flask', 'flask_cors']
+
+    def test_vectorized_endpoint_loads_numpy_on_demand(self):
+        """Test que NumPy se carga en la primera petición que lo necesita"""
+        code = (
+            "from app import create_app\n"
+            "client = create_app().test_client()\n"
+            "assert client.post('/api/imc/batch', json={'peso_kg': [70], 'talla_m': [1.75]}).status_code == 200\n"
+        )
+        assert 'numpy' in _loaded_modules(code, HEAVY_MODULES)
+
+    def test_language_module_loads_on_first_translation(self):
+        """Test que el módulo de idioma no se importa hasta que se necesita un texto"""
+        code = "from app import create_app\ncreate_app()\n"
+        assert _loaded_modules(code, ['app.translations', 'app.languages.es']) == ['app.translations']
+
+    def test_orjson_loads_on_first_json_response(self):
+        """Test que orjson no se importa al arrancar ni al servir la página, sino con la primera respuesta JSON"""
+        code = (
+            "from app import create_app\n"
+            "client = create_app().test_client()\n"
+            "client.get('/')\n"
+            "import sys\n"
+            "assert 'orjson' not in sys.modules\n"
+            "client.get('/api/stats')\n"
+        )
+        assert _loaded_modules(code, ['orjson']) == ['orjson']
+
+    def test_url_builders_compiled_on_demand(self, monkeypatch):
+        """Test que registrar las rutas no compila las funciones de url_for y que url_for sigue funcionando"""
+        from flask import url_for
+        from werkzeug.routing import Rule
+        from app import create_app
+
+        compiled = []
+        compile_builder = Rule._compile_builder
+        monkeypatch.setattr(Rule, '_compile_builder',
+                            lambda rule, append_unknown=True: compiled.append(rule.rule)
+                            or compile_builder(rule, append_unknown))
+        application = create_app()
+        static_rules = ['/static/<path:filename>'] * 2  # la registra Flask antes de cambiar la clase
+        assert compiled == static_rules
+
+        with application.test_request_context():
+            assert url_for('api.get_all_weights', limit=3) == '/api/weights?limit=3'
+            assert url_for('views.index') == '/'
+        assert compiled == static_rules + ['/api/weights', '/']
@@ -141,3 +141,329 @@ class TestStorageGetAllWeightEntries:
             assert len(all_entries) == 1
             assert all_entries[0].weight_kg == 71.0
 
+
+
+class TestStorageLastWeightEntry:
+    """Tests de caja blanca para la búsqueda de la última entrada en el historial indexado"""
+    
+    def test_last_weight_entry_out_of_order_insertion(self, app, sample_user):
+        """Test que la última entrada es la más reciente aunque se inserte desordenada"""
+        with app.app_context():
+            storage = app.storage
+            base_date = datetime(2024, 3, 10, 9, 0)
+            
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=72.0,
+                                                     recorded_date=base_date))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                                     recorded_date=base_date - timedelta(days=3)))
+            
+            last = storage.get_last_weight_entry(USER_ID)
+            assert last.weight_kg == 72.0
+            assert storage.get_weight_count(USER_ID) == 2
+    
+    def test_last_weight_entry_from_different_date(self, app, sample_user):
+        """Test que se ignora el día de referencia y se devuelve el día anterior más reciente"""
+        with app.app_context():
+            storage = app.storage
+            base_date = datetime(2024, 3, 10, 9, 0)
+            
+            for days_ago, weight in [(5, 70.0), (2, 71.0), (0, 72.0)]:
+                storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=weight,
+                                                         recorded_date=base_date - timedelta(days=days_ago)))
+            
+            previous = storage.get_last_weight_entry_from_different_date(USER_ID, base_date.date())
+            assert previous.weight_kg == 71.0
+            
+            # Con una fecha de referencia sin registros, se devuelve la última entrada
+            other_day = (base_date + timedelta(days=1)).date()
+            assert storage.get_last_weight_entry_from_different_date(USER_ID, other_day).weight_kg == 72.0
+    
+    def test_last_weight_entry_unknown_user(self, app):
+        """Test que un usuario sin historial no tiene entradas"""
+        with app.app_context():
+            storage = app.storage
+            assert storage.get_last_weight_entry(99) is None
+            assert storage.get_last_weight_entry_from_different_date(99, date.today()) is None
+            assert storage.get_weight_count(99) == 0
+
+
+class TestStorageAggregates:
+    """Tests de caja blanca para los agregados (número, máximo y mínimo) del storage"""
+    
+    def test_aggregates_after_replacing_max(self, app, sample_user):
+        """Test que al reemplazar el peso máximo del día se recalcula el máximo"""
+        with app.app_context():
+            storage = app.storage
+            base_date = datetime(2024, 3, 10, 9, 0)
+            
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                                     recorded_date=base_date - timedelta(days=1)))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=74.0,
+                                                     recorded_date=base_date))
+            assert storage.get_max_weight(USER_ID) == 74.0
+            
+            # Reemplazo del mismo día con un peso menor
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=71.0,
+                                                     recorded_date=base_date.replace(hour=20)))
+            
+            assert storage.get_weight_count(USER_ID) == 2
+            assert storage.get_max_weight(USER_ID) == 71.0
+            assert storage.get_min_weight(USER_ID) == 70.0
+    
+    def test_aggregates_after_replacing_min(self, app, sample_user):
+        """Test que al reemplazar el peso mínimo del día se recalcula el mínimo"""
+        with app.app_context():
+            storage = app.storage
+            base_date = datetime(2024, 3, 10, 9, 0)
+            
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                                     recorded_date=base_date))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=72.0,
+                                                     recorded_date=base_date + timedelta(days=1)))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=73.0,
+                                                     recorded_date=base_date))
+            
+            assert storage.get_weight_count(USER_ID) == 2
+            assert storage.get_min_weight(USER_ID) == 72.0
+            assert storage.get_max_weight(USER_ID) == 73.0
+    
+    def test_aggregates_empty(self, app, sample_user):
+        """Test que sin registros no hay máximo ni mínimo"""
+        with app.app_context():
+            storage = app.storage
+            assert storage.get_weight_count(USER_ID) == 0
+            assert storage.get_max_weight(USER_ID) is None
+            assert storage.get_min_weight(USER_ID) is None
+
+
+class TestStorageColumnarHistory:
+    """Tests de caja blanca para el historial columnar de MemoryStorage"""
+    
+    def test_entries_are_rebuilt_from_columns(self, app, sample_user):
+        """Test que las entradas leídas conservan id, peso y fecha exactos"""
+        with app.app_context():
+            storage = app.storage
+            recorded_date = datetime(2024, 2, 29, 23, 59, 59, 123456)
+            entry = WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.35,
+                                    recorded_date=recorded_date)
+            storage.add_weight_entry(entry)
+            
+            last = storage.get_last_weight_entry(USER_ID)
+            assert last.entry_id == entry.entry_id
+            assert last.user_id == USER_ID
+            assert last.weight_kg == 70.35
+            assert last.recorded_date == recorded_date
+    
+    def test_dates_before_epoch(self, app, sample_user):
+        """Test que las fechas anteriores a 1970 se agrupan correctamente por día"""
+        with app.app_context():
+            storage = app.storage
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                                     recorded_date=datetime(1969, 12, 31, 1, 0)))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=71.0,
+                                                     recorded_date=datetime(1969, 12, 31, 23, 0)))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=72.0,
+                                                     recorded_date=datetime(1970, 1, 1, 0, 0)))
+            
+            entries = storage.get_all_weight_entries(USER_ID)
+            assert [e.weight_kg for e in entries] == [72.0, 71.0]
+            assert entries[1].recorded_date == datetime(1969, 12, 31, 23, 0)
+
+
+class TestStorageWeightEntriesRange:
+    """Tests de caja blanca para get_weight_entries_range()"""
+    
+    def _add_days(self, storage, days):
+        base_date = datetime(2024, 1, 1, 8, 0)
+        storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i * 0.1,
+                            recorded_date=base_date + timedelta(days=i))
+            for i in range(days)
+        ])
+        return base_date
+    
+    def test_range_bounds(self, app, sample_user):
+        """Test que start es inclusivo y end exclusivo, en orden descendente"""
+        storage = app.storage
+        base_date = self._add_days(storage, 10)
+        
+        entries = storage.get_weight_entries_range(
+            USER_ID, base_date + timedelta(days=2), base_date + timedelta(days=5)
+        )
+        assert [e.recorded_date for e in entries] == [
+            base_date + timedelta(days=4),
+            base_date + timedelta(days=3),
+            base_date + timedelta(days=2),
+        ]
+    
+    def test_range_limit_takes_newest(self, app, sample_user):
+        """Test que limit devuelve las entradas más recientes de la ventana"""
+        storage = app.storage
+        base_date = self._add_days(storage, 10)
+        
+        entries = storage.get_weight_entries_range(USER_ID, limit=3)
+        assert [e.recorded_date for e in entries] == [
+            base_date + timedelta(days=9),
+            base_date + timedelta(days=8),
+            base_date + timedelta(days=7),
+        ]
+        assert len(storage.get_weight_entries_range(USER_ID)) == 10
+    
+    def test_range_empty(self, app, sample_user):
+        """Test ventana vacía y usuario sin historial"""
+        storage = app.storage
+        base_date = self._add_days(storage, 3)
+        
+        assert storage.get_weight_entries_range(USER_ID, end=base_date) == []
+        assert storage.get_weight_entries_range(999) == []
+
+
+class TestStorageDataVersion:
+    """Tests de caja blanca para get_data_version()"""
+    
+    def test_version_grows_with_each_write(self, app, sample_user):
+        """Test que cada escritura del usuario aumenta su versión"""
+        storage = app.storage
+        versions = [storage.get_data_version(USER_ID)]
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                                 recorded_date=datetime(2024, 1, 1, 8, 0)))
+        versions.append(storage.get_data_version(USER_ID))
+        storage.add_weight_entries([WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=71.0,
+                                                    recorded_date=datetime(2024, 1, 2, 8, 0))])
+        versions.append(storage.get_data_version(USER_ID))
+        storage.save_user(sample_user)
+        versions.append(storage.get_data_version(USER_ID))
+        
+        assert versions == sorted(set(versions))
+        assert storage.get_data_version(USER_ID) == versions[-1]
+    
+    def test_version_is_per_user(self, app, sample_user):
+        """Test que las escrituras de otro usuario no cambian la versión"""
+        storage = app.storage
+        version = storage.get_data_version(USER_ID)
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=999, weight_kg=80.0,
+                                                 recorded_date=datetime(2024, 1, 1, 8, 0)))
+        assert storage.get_data_version(USER_ID) == version
+        assert storage.get_data_version(12345) == 0
+    
+    def test_version_survives_restart(self, app, sample_user):
+        """Test que un almacenamiento nuevo no repite versiones anteriores"""
+        from app.storage import MemoryStorage
+        version = app.storage.get_data_version(USER_ID)
+        
+        restarted = MemoryStorage()
+        restarted.save_user(sample_user)
+        assert restarted.get_data_version(USER_ID) > version
+
+
+class TestStoragePartitions:
+    """Tests de caja blanca para el reparto de usuarios entre particiones"""
+    
+    def test_users_in_every_partition(self):
+        """Test que cada usuario ve solo sus datos aunque compartan partición"""
+        from app.storage import MemoryStorage
+        storage = MemoryStorage(partitions=3)
+        for user_id in range(1, 10):
+            storage.save_user(UserData(user_id=user_id, first_name=f"Usuario {user_id}", last_name="",
+                                       birth_date=date(1990, 1, 1), height_m=1.75))
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=user_id, weight_kg=60.0 + user_id,
+                                                     recorded_date=datetime(2024, 1, 1, 8, 0)))
+        
+        for user_id in range(1, 10):
+            assert storage.get_user(user_id).first_name == f"Usuario {user_id}"
+            assert storage.get_weight_count(user_id) == 1
+            assert storage.get_max_weight(user_id) == 60.0 + user_id
+    
+    def test_bulk_entries_of_several_users(self):
+        """Test que una carga con varios usuarios asigna ids únicos a todas las entradas"""
+        from app.storage import MemoryStorage
+        storage = MemoryStorage(partitions=4)
+        entries = [
+            WeightEntryData(entry_id=0, user_id=user_id, weight_kg=70.0,
+                            recorded_date=datetime(2024, 1, day, 8, 0))
+            for day in (1, 2) for user_id in (1, 2, 3, 5)
+        ]
+        storage.add_weight_entries(entries)
+        
+        assert sorted(entry.entry_id for entry in entries) == list(range(1, 9))
+        for user_id in (1, 2, 3, 5):
+            assert storage.get_weight_count(user_id) == 2
+    
+    def test_export_blocks_includes_all_partitions(self):
+        """Test que los bloques exportados para snapshots recorren todas las particiones"""
+        from app.storage import MemoryStorage
+        storage = MemoryStorage(partitions=4)
+        for user_id in range(1, 6):
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=user_id, weight_kg=70.0,
+                                                     recorded_date=datetime(2024, 1, 1, 8, 0)))
+        blocks, next_entry_id = storage._export_blocks()
+        assert next_entry_id == 6
+        assert sorted(block.user_id for block in blocks) == [1, 2, 3, 4, 5]
+
+
+class TestStorageChangeLog:
+    """Tests de caja blanca para el registro de cambios de MemoryStorage"""
+    
+    def test_changes_since_returns_current_state(self, app, sample_user):
+        """Test que cada día modificado se devuelve una vez, con su valor actual, en orden"""
+        storage = app.storage
+        version = storage.get_data_version(USER_ID)
+        for weight, day in [(71.0, 3), (70.0, 1), (72.0, 3)]:
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=weight,
+                                                     recorded_date=datetime(2024, 1, day, 9, 0)))
+        
+        changes = storage.get_weight_changes(USER_ID, version)
+        assert [(c.recorded_date.day, c.weight_kg) for c in changes] == [(1, 70.0), (3, 72.0)]
+    
+    def test_compacted_log_requires_resync(self, app, sample_user, monkeypatch):
+        """Test que al descartar la parte antigua del registro se pide resincronizar"""
+        from app import storage as storage_module
+        monkeypatch.setattr(storage_module, 'CHANGE_LOG_SIZE', 4)
+        storage = app.storage
+        version = storage.get_data_version(USER_ID)
+        base_date = datetime(2024, 1, 1, 9, 0)
+        for i in range(5):
+            storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i,
+                                                     recorded_date=base_date + timedelta(days=i)))
+        
+        assert storage.get_weight_changes(USER_ID, version) is None
+        recent = storage.get_weight_changes(USER_ID, storage.get_data_version(USER_ID) - 1)
+        assert [c.weight_kg for c in recent] == [74.0]
+    
+    def test_unknown_user(self, app, sample_user):
+        """Test usuario sin historial: sin cambios, salvo versiones de otra ejecución"""
+        storage = app.storage
+        assert storage.get_weight_changes(999, storage.get_data_version(USER_ID)) == []
+        assert storage.get_weight_changes(999, 1) is None
+
+
+class TestStorageUserSnapshot:
+    """Tests de caja blanca para get_user_snapshot()"""
+    
+    def test_snapshot_matches_individual_reads(self, app, sample_weights):
+        """Test que la lectura conjunta coincide con las consultas individuales"""
+        storage = app.storage
+        snapshot = storage.get_user_snapshot(USER_ID)
+        
+        assert snapshot.user is storage.get_user(USER_ID)
+        assert snapshot.data_version == storage.get_data_version(USER_ID)
+        assert snapshot.weight_count == 3
+        assert snapshot.max_weight == 75.0
+        assert snapshot.min_weight == 70.0
+        assert snapshot.last_weight_entry.weight_kg == 75.0
+        assert [e.weight_kg for e in snapshot.weight_entries] == [75.0, 72.5, 70.0]
+        assert snapshot.weight_changes_only is False
+    
+    def test_snapshot_with_changes(self, app, sample_weights):
+        """Test que con since solo se incluyen los cambios posteriores"""
+        storage = app.storage
+        version = storage.get_data_version(USER_ID)
+        storage.add_weight_entry(WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=76.0,
+                                                 recorded_date=datetime(2024, 2, 2, 10, 0)))
+        
+        snapshot = storage.get_user_snapshot(USER_ID, version)
+        assert snapshot.weight_changes_only is True
+        assert [e.weight_kg for e in snapshot.weight_entries] == [76.0]
+        assert snapshot.weight_count == 4
+        
+        assert storage.get_user_snapshot(USER_ID, 1).weight_changes_only is False
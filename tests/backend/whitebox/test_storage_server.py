@@ -0,0 +1,114 @@
+"""
+Tests de Caja Blanca para el almacenamiento compartido entre procesos
+Prueban RemoteStorage contra un StorageServer local
+"""
+import threading
+import pytest
+from datetime import datetime, date, timedelta
+from app.storage import MemoryStorage, UserData, WeightEntryData
+from app.storage_server import StorageServer, RemoteStorage
+from app.config import USER_ID
+
+
+AUTHKEY = b'test-authkey'
+
+
+class _RecordingStorage(MemoryStorage):
+    """MemoryStorage que anota los métodos invocados por el servidor"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def __getattribute__(self, name):
+        if not name.startswith('_') and name != 'calls':
+            object.__getattribute__(self, 'calls').append(name)
+        return object.__getattribute__(self, name)
+
+
+@pytest.fixture
+def server_storage():
+    return _RecordingStorage()
+
+
+@pytest.fixture
+def server_address(tmp_path, server_storage):
+    """Arranca un StorageServer en un hilo y devuelve la ruta del socket"""
+    address = str(tmp_path / "storage.sock")
+    server = StorageServer(server_storage, address, AUTHKEY)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield address
+    server.close()
+    thread.join(timeout=5)
+
+
+class TestRemoteStorage:
+    """Tests de caja blanca para RemoteStorage"""
+    
+    def test_clients_share_data(self, server_address):
+        """Test que dos clientes (como dos workers) ven los mismos datos"""
+        worker_a = RemoteStorage(server_address, AUTHKEY)
+        worker_b = RemoteStorage(server_address, AUTHKEY)
+        
+        worker_a.save_user(UserData(user_id=USER_ID, first_name="Juan", last_name="Pérez García",
+                                    birth_date=date(1990, 5, 15), height_m=1.75))
+        entry = WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0,
+                                recorded_date=datetime(2024, 1, 1, 9, 0))
+        worker_a.add_weight_entry(entry)
+        
+        assert entry.entry_id == 1
+        assert worker_b.get_user(USER_ID).first_name == "Juan"
+        assert worker_b.get_last_weight_entry(USER_ID).weight_kg == 70.0
+        assert worker_b.get_weight_count(USER_ID) == 1
+        assert worker_b.get_max_weight(USER_ID) == 70.0
+        assert worker_b.get_min_weight(USER_ID) == 70.0
+        assert len(worker_b.get_all_weight_entries(USER_ID)) == 1
+        assert worker_b.get_last_weight_entry_from_different_date(USER_ID, date(2024, 1, 1)) is None
+    
+    def test_connection_per_thread(self, server_address):
+        """Test que varios hilos pueden usar el mismo cliente a la vez"""
+        storage = RemoteStorage(server_address, AUTHKEY)
+        errors = []
+        
+        def add_weights(offset):
+            try:
+                for day in range(1, 11):
+                    storage.add_weight_entry(WeightEntryData(
+                        entry_id=0, user_id=USER_ID + offset, weight_kg=70.0,
+                        recorded_date=datetime(2024, 1, day, 9, 0)))
+            except Exception as exc:
+                errors.append(exc)
+        
+        threads = [threading.Thread(target=add_weights, args=(i,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        assert errors == []
+        assert sum(storage.get_weight_count(USER_ID + i) for i in range(4)) == 40
+    
+    def test_wrong_authkey_is_rejected(self, server_address):
+        """Test que un cliente sin la clave correcta no puede conectarse"""
+        storage = RemoteStorage(server_address, b'otra-clave')
+        with pytest.raises(Exception):
+            storage.get_user(USER_ID)
+
+    def test_iter_weight_entries_in_chunks(self, server_address, server_storage):
+        """Test que la exportación pide el historial por bloques y no completo"""
+        storage = RemoteStorage(server_address, AUTHKEY)
+        base_date = datetime(2024, 1, 1, 9, 0)
+        storage.add_weight_entries([
+            WeightEntryData(entry_id=0, user_id=USER_ID, weight_kg=70.0 + i % 3,
+                            recorded_date=base_date + timedelta(days=i))
+            for i in range(25)
+        ])
+        server_storage.calls.clear()
+
+        chunks = list(storage.iter_weight_entries(USER_ID, chunk_size=10))
+        assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+        dates = [entry.recorded_date for chunk in chunks for entry in chunk]
+        assert dates == [base_date + timedelta(days=i) for i in range(25)]
+        assert 'get_all_weight_entries' not in server_storage.calls
+        assert server_storage.calls.count('get_weight_entries_after') == 4
@@ -0,0 +1,92 @@
+"""
+Tests de Caja Blanca para el gestor de traducciones
+Prueban las plantillas precompiladas, la elección del idioma por petición y
+la caché de textos de días
+"""
+import pytest
+
+from app import translations
+from app.languages import es
+from app.translations import (
+    MessageTemplate, get_bmi_complete_description, get_days_text, get_error, get_language, get_text
+)
+from tests.backend.conftest import app, english_language
+
+
+class TestMessageTemplate:
+    """Tests de caja blanca para MessageTemplate"""
+
+    @pytest.mark.parametrize("text, values", [
+        ("Sin marcadores", {}),
+        ("Máximo {max_entries}", {"max_entries": 1000}),
+        ("{a:.1f} y {b:>6} y {c!r}", {"a": 2.25, "b": "x", "c": "y"}),
+        ("Llaves {{literales}} y {a}", {"a": 1}),
+        ("Atributo {a.real} e índice {b[0]}", {"a": 3, "b": [7]}),
+        ("Anidada {a:{width}}", {"a": 5, "width": 4}),
+        (es.ERRORS["weight_variation_exceeded"],
+         {"days_text": "3 días", "max_allowed_difference": 15.0, "weight_difference": 16.24}),
+    ])
+    def test_matches_str_format(self, text, values):
+        """Test que el resultado coincide con str.format, incluidos los casos que delegan en él"""
+        assert MessageTemplate(text).format(values) == text.format(**values)
+
+    def test_missing_value_raises(self):
+        """Test que un marcador sin valor lanza KeyError, como str.format"""
+        with pytest.raises(KeyError):
+            MessageTemplate("Máximo {max_entries}").format({})
+
+
+class TestTranslations:
+    """Tests de caja blanca para las funciones de traducción"""
+
+    def test_default_language_outside_request(self):
+        """Test que fuera de una petición se usa ACTIVE_LANGUAGE"""
+        assert get_language() == translations.ACTIVE_LANGUAGE
+        assert get_error("invalid_weight") == es.ERRORS["invalid_weight"]
+        assert get_error("too_many_entries", max_entries=5).endswith("(máximo 5)")
+        assert get_error("clave_inexistente") == "clave_inexistente"
+        assert get_text("no_weight_records") == es.TEXTS["no_weight_records"]
+
+    def test_legacy_module_constants(self):
+        """Test que las constantes del idioma por defecto siguen disponibles en el módulo"""
+        assert translations.ERRORS is es.ERRORS
+        assert translations.HTML_TEXTS is es.HTML_TEXTS
+        with pytest.raises(AttributeError):
+            translations.NO_EXISTE
+
+    def test_language_from_accept_language(self, app, english_language):
+        """Test que el idioma se elige por Accept-Language entre los disponibles"""
+        cases = [
+            ("en-US,en;q=0.9", "en"),
+            ("fr-FR,en;q=0.5,es;q=0.8", "es"),
+            ("fr-FR", translations.ACTIVE_LANGUAGE),
+            ("", translations.ACTIVE_LANGUAGE),
+        ]
+        for header, expected in cases:
+            with app.test_request_context('/', headers={"Accept-Language": header}):
+                assert get_language() == expected
+
+    def test_messages_follow_request_language(self, app, english_language):
+        """Test que errores, textos y descripciones salen en el idioma de la petición"""
+        with app.test_request_context('/', headers={"Accept-Language": "en"}):
+            assert get_error("invalid_weight") == "Invalid weight"
+            assert get_error("too_many_entries", max_entries=5).endswith("(maximum 5)")
+            assert get_bmi_complete_description("normal").startswith("EN Peso Normal")
+            assert get_days_text(0) == "same day"
+            assert get_days_text(3) == "3 days"
+        with app.test_request_context('/', headers={"Accept-Language": "es"}):
+            assert get_days_text(3) == "3 días"
+
+    def test_language_module_loaded_once(self, app, english_language):
+        """Test que cada idioma se carga y compila una sola vez"""
+        first = translations.get_catalog("en")
+        assert translations.get_catalog("en") is first
+        assert first.module is english_language
+
+    def test_days_text_is_cached(self):
+        """Test que los textos de días se conservan en una caché LRU acotada"""
+        translations._days_text.cache_clear()
+        for _ in range(3):
+            assert get_days_text(12) == "12 días"
+        info = translations._days_text.cache_info()
+        assert (info.hits, info.misses, info.maxsize) == (2, 1, translations.DAYS_TEXT_CACHE_SIZE)
@@ -0,0 +1,75 @@
+"""
+Tests de Caja Blanca para las vistas HTML
+Comprueban la caché de la página principal renderizada por idioma
+"""
+import os
+
+import pytest
+
+from app import views
+from tests.backend.conftest import app, client, english_language
+
+
+@pytest.fixture
+def render_count(monkeypatch):
+    """Vacía la caché de páginas y cuenta las llamadas a render_template"""
+    calls = []
+    render_template = views.render_template
+
+    def counting_render_template(*args, **kwargs):
+        calls.append(kwargs.get('active_language'))
+        return render_template(*args, **kwargs)
+
+    monkeypatch.setattr(views, '_INDEX_PAGES', {})
+    monkeypatch.setattr(views, 'render_template', counting_render_template)
+    return calls
+
+
+@pytest.fixture
+def template_path(app):
+    """Ruta de index.html; restaura su fecha de modificación al terminar"""
+    path = os.path.join(app.root_path, app.template_folder, views.INDEX_TEMPLATE)
+    stat = os.stat(path)
+    yield path
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+class TestIndexPageCache:
+    """Tests de caja blanca para la caché de index.html"""
+
+    def test_page_rendered_once(self, client, render_count):
+        """Test que las peticiones repetidas (y las 304) no vuelven a renderizar la plantilla"""
+        first = client.get('/')
+        for _ in range(3):
+            assert client.get('/').data == first.data
+        client.get('/', headers={'If-None-Match': first.headers['ETag']})
+        assert render_count == ['es']
+
+    def test_page_rendered_once_per_language(self, client, english_language, render_count):
+        """Test que cada idioma se renderiza una sola vez"""
+        for _ in range(2):
+            client.get('/')
+            client.get('/', headers={"Accept-Language": "en"})
+        assert render_count == ['es', 'en']
+
+    def test_production_page_frozen(self, app, client, render_count, template_path):
+        """Test que sin recarga de plantillas el cambio de index.html no invalida la caché"""
+        app.jinja_env.auto_reload = False
+        client.get('/')
+        os.utime(template_path, (4_000_000_000, 4_000_000_000))
+        client.get('/')
+        assert render_count == ['es']
+
+    def test_debug_page_rerendered_when_template_changes(self, app, client, render_count, template_path):
+        """Test que con recarga de plantillas (debug) se renderiza de nuevo si cambia la fecha de index.html"""
+        app.jinja_env.auto_reload = True
+        first = client.get('/')
+        client.get('/')
+        assert render_count == ['es']
+
+        os.utime(template_path, (4_000_000_000, 4_000_000_000))
+        second = client.get('/')
+        assert render_count == ['es', 'es']
+        assert second.headers['Last-Modified'] != first.headers['Last-Modified']
+        # Sin cambios en la plantilla el contenido (y el ETag) es el mismo
+        assert second.headers['ETag'] == first.headers['ETag']
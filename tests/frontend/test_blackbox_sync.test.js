@@ -5,7 +5,35 @@
 
 // Importar SyncManager (copiamos la clase para testing)
 class SyncManager {
-    static async syncFromBackend() {
+    static async fetchBootstrap() {
+        try {
+            const since = parseInt(localStorage.getItem('imc_app_sync_version'), 10) || 0;
+            const response = await fetch(`/api/bootstrap?since=${since}`);
+            if (response.ok) {
+                return await response.json();
+            }
+        } catch (error) {
+            console.warn('Error al cargar datos iniciales desde backend (modo offline):', error);
+        }
+        return null;
+    }
+
+    static async syncFromBackend(bootstrap = null) {
+        if (bootstrap) {
+            if (bootstrap.user) {
+                localStorage.setItem('imc_app_user', JSON.stringify(bootstrap.user));
+                if (bootstrap.resync_required) {
+                    localStorage.setItem('imc_app_weights', JSON.stringify(bootstrap.weights));
+                } else {
+                    const weights = JSON.parse(localStorage.getItem('imc_app_weights') || '[]');
+                    bootstrap.weights.forEach(change => weights.push(change));
+                    localStorage.setItem('imc_app_weights', JSON.stringify(weights));
+                }
+                localStorage.setItem('imc_app_sync_version', String(bootstrap.version));
+            }
+            return true;
+        }
+
         try {
             const userResponse = await fetch('/api/user');
             if (userResponse.ok) {
@@ -22,6 +50,25 @@ class SyncManager {
                 console.warn('Error al sincronizar usuario desde backend:', userResponse.status);
             }
 
+            let syncVersion = null;
+            const since = parseInt(localStorage.getItem('imc_app_sync_version'), 10) || 0;
+            const changesResponse = await fetch(`/api/weights/changes?since=${since}`);
+            if (changesResponse.ok) {
+                const changesData = await changesResponse.json();
+                if (!changesData.resync_required) {
+                    // Simular LocalStorageManager.applyWeightChanges
+                    const dayOf = w => new Date(w.fecha_registro).toISOString().split('T')[0];
+                    const changedDays = new Set(changesData.changes.map(dayOf));
+                    const weights = JSON.parse(localStorage.getItem('imc_app_weights') || '[]')
+                        .filter(w => !changedDays.has(dayOf(w)));
+                    changesData.changes.forEach(change => weights.push(change));
+                    localStorage.setItem('imc_app_weights', JSON.stringify(weights));
+                    localStorage.setItem('imc_app_sync_version', String(changesData.version));
+                    return true;
+                }
+                syncVersion = changesData.version;
+            }
+
             const weightsResponse = await fetch('/api/weights');
             if (weightsResponse.ok) {
                 const weightsData = await weightsResponse.json();
@@ -34,6 +81,9 @@ class SyncManager {
                 if (frontendWeights.length > 0) {
                     localStorage.setItem('imc_app_weights', JSON.stringify(frontendWeights));
                 }
+                if (syncVersion !== null) {
+                    localStorage.setItem('imc_app_sync_version', String(syncVersion));
+                }
             } else if (weightsResponse.status === 404) {
                 // Mantener pesos locales
             } else {
@@ -103,6 +153,46 @@ class SyncManager {
             return false;
         }
     }
+
+    static async syncAllWeightsToBackend() {
+        // Simular LocalStorageManager.getWeights
+        const weights = JSON.parse(localStorage.getItem('imc_app_weights') || '[]');
+        if (weights.length === 0) {
+            return 0;
+        }
+
+        try {
+            const response = await fetch('/api/weights/bulk', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    weights: weights.map(w => ({
+                        peso_kg: w.peso_kg,
+                        fecha_registro: w.fecha_registro
+                    }))
+                })
+            });
+
+            if (!response.ok) {
+                const errorData = await response.json();
+                console.error('Error al sincronizar pesos al backend:', errorData.error);
+                return 0;
+            }
+
+            const data = await response.json();
+            (data.results || []).forEach((result, index) => {
+                if (result.status === 'error') {
+                    console.warn(`Error al sincronizar peso ${weights[index].id}:`, result.error);
+                }
+            });
+            return data.created || 0;
+        } catch (error) {
+            console.warn('Error al sincronizar pesos al backend (modo offline):', error);
+            return 0;
+        }
+    }
 }
 
 describe('TestSyncManager', () => {
@@ -132,6 +222,10 @@ describe('TestSyncManager', () => {
                     ok: true,
                     json: async () => userData
                 })
+                .mockResolvedValueOnce({
+                    ok: true,
+                    json: async () => ({ version: 42, resync_required: true, changes: [] })
+                })
                 .mockResolvedValueOnce({
                     ok: true,
                     json: async () => weightsData
@@ -139,13 +233,50 @@ describe('TestSyncManager', () => {
 
             const result = await SyncManager.syncFromBackend();
             expect(result).toBe(true);
-            expect(fetch).toHaveBeenCalledTimes(2);
+            expect(fetch).toHaveBeenCalledTimes(3);
             expect(fetch).toHaveBeenCalledWith('/api/user');
+            expect(fetch).toHaveBeenCalledWith('/api/weights/changes?since=0');
             expect(fetch).toHaveBeenCalledWith('/api/weights');
 
             const savedUser = JSON.parse(localStorage.getItem('imc_app_user'));
             expect(savedUser.nombre).toBe('Juan');
             expect(savedUser.talla_m).toBe(1.75);
+            expect(localStorage.getItem('imc_app_sync_version')).toBe('42');
+        });
+
+        test('test_sync_from_backend_delta - Solo aplica los cambios desde la última versión', async () => {
+            localStorage.setItem('imc_app_sync_version', '42');
+            localStorage.setItem('imc_app_weights', JSON.stringify([
+                { id: 1, peso_kg: 70.0, fecha_registro: '2024-01-01T10:00:00' },
+                { id: 2, peso_kg: 72.5, fecha_registro: '2024-01-15T10:00:00' }
+            ]));
+
+            fetch
+                .mockResolvedValueOnce({
+                    ok: true,
+                    json: async () => ({ nombre: 'Juan' })
+                })
+                .mockResolvedValueOnce({
+                    ok: true,
+                    json: async () => ({
+                        version: 45,
+                        resync_required: false,
+                        changes: [
+                            { id: 3, peso_kg: 73.0, fecha_registro: '2024-01-15T18:00:00' },
+                            { id: 4, peso_kg: 74.0, fecha_registro: '2024-01-20T10:00:00' }
+                        ]
+                    })
+                });
+
+            const result = await SyncManager.syncFromBackend();
+            expect(result).toBe(true);
+            expect(fetch).toHaveBeenCalledTimes(2);
+            expect(fetch).toHaveBeenCalledWith('/api/weights/changes?since=42');
+            expect(fetch).not.toHaveBeenCalledWith('/api/weights');
+
+            const weights = JSON.parse(localStorage.getItem('imc_app_weights'));
+            expect(weights.map(w => w.id).sort()).toEqual([1, 3, 4]);
+            expect(localStorage.getItem('imc_app_sync_version')).toBe('45');
         });
 
         test('test_sync_from_backend_no_user - Sincronización cuando no hay usuario en backend', async () => {
@@ -154,6 +285,10 @@ describe('TestSyncManager', () => {
                     ok: false,
                     status: 404
                 })
+                .mockResolvedValueOnce({
+                    ok: false,
+                    status: 404
+                })
                 .mockResolvedValueOnce({
                     ok: false,
                     status: 404
@@ -161,7 +296,8 @@ describe('TestSyncManager', () => {
 
             const result = await SyncManager.syncFromBackend();
             expect(result).toBe(true);
-            expect(fetch).toHaveBeenCalledTimes(2);
+            expect(fetch).toHaveBeenCalledTimes(3);
+            expect(localStorage.getItem('imc_app_sync_version')).toBeNull();
         });
 
         test('test_sync_from_backend_offline - Sincronización falla (modo offline)', async () => {
@@ -172,6 +308,41 @@ describe('TestSyncManager', () => {
         });
     });
 
+    describe('fetchBootstrap', () => {
+        test('test_bootstrap_single_request - La carga inicial usa una sola petición', async () => {
+            localStorage.setItem('imc_app_sync_version', '42');
+            const bootstrap = {
+                user: { nombre: 'Juan', apellidos: 'Pérez', fecha_nacimiento: '1990-05-15', talla_m: 1.75 },
+                weights: [{ id: 3, peso_kg: 73.0, fecha_registro: '2024-01-20T10:00:00' }],
+                version: 45,
+                resync_required: false,
+                config: { validation_limits: {} },
+                messages: {}
+            };
+            fetch.mockResolvedValueOnce({
+                ok: true,
+                json: async () => bootstrap
+            });
+
+            const data = await SyncManager.fetchBootstrap();
+            expect(fetch).toHaveBeenCalledWith('/api/bootstrap?since=42');
+
+            const result = await SyncManager.syncFromBackend(data);
+            expect(result).toBe(true);
+            expect(fetch).toHaveBeenCalledTimes(1);
+            expect(JSON.parse(localStorage.getItem('imc_app_user')).nombre).toBe('Juan');
+            expect(JSON.parse(localStorage.getItem('imc_app_weights'))).toHaveLength(1);
+            expect(localStorage.getItem('imc_app_sync_version')).toBe('45');
+        });
+
+        test('test_bootstrap_offline - Devuelve null sin conexión', async () => {
+            fetch.mockRejectedValueOnce(new Error('Network error'));
+
+            const data = await SyncManager.fetchBootstrap();
+            expect(data).toBeNull();
+        });
+    });
+
     describe('syncUserToBackend', () => {
         test('test_sync_user_to_backend_success - Sincronización exitosa de usuario al backend', async () => {
             const user = {
@@ -271,5 +442,69 @@ describe('TestSyncManager', () => {
             expect(result).toBe(false);
         });
     });
-});
 
+    describe('syncAllWeightsToBackend', () => {
+        test('test_sync_all_weights_single_request - Todos los pesos en una sola petición', async () => {
+            const weights = [
+                { id: 1, peso_kg: 70.0, fecha_registro: '2024-01-01T10:00:00.000Z' },
+                { id: 2, peso_kg: 71.0, fecha_registro: '2024-01-02T10:00:00.000Z' }
+            ];
+            localStorage.setItem('imc_app_weights', JSON.stringify(weights));
+
+            fetch.mockResolvedValueOnce({
+                ok: true,
+                json: async () => ({
+                    created: 2,
+                    results: [{ status: 'created', id: 1 }, { status: 'created', id: 2 }]
+                })
+            });
+
+            const result = await SyncManager.syncAllWeightsToBackend();
+            expect(result).toBe(2);
+            expect(fetch).toHaveBeenCalledTimes(1);
+            expect(fetch).toHaveBeenCalledWith('/api/weights/bulk', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                },
+                body: JSON.stringify({
+                    weights: weights.map(w => ({ peso_kg: w.peso_kg, fecha_registro: w.fecha_registro }))
+                })
+            });
+        });
+
+        test('test_sync_all_weights_partial_errors - Errores de validación por peso', async () => {
+            localStorage.setItem('imc_app_weights', JSON.stringify([
+                { id: 1, peso_kg: 70.0, fecha_registro: '2024-01-01T10:00:00.000Z' },
+                { id: 2, peso_kg: 95.0, fecha_registro: '2024-01-02T10:00:00.000Z' }
+            ]));
+
+            fetch.mockResolvedValueOnce({
+                ok: true,
+                json: async () => ({
+                    created: 1,
+                    results: [{ status: 'created', id: 1 }, { status: 'error', error: 'Variación excedida' }]
+                })
+            });
+
+            const result = await SyncManager.syncAllWeightsToBackend();
+            expect(result).toBe(1);
+        });
+
+        test('test_sync_all_weights_empty - Sin pesos locales no se hace ninguna petición', async () => {
+            const result = await SyncManager.syncAllWeightsToBackend();
+            expect(result).toBe(0);
+            expect(fetch).not.toHaveBeenCalled();
+        });
+
+        test('test_sync_all_weights_offline - Error de red (modo offline)', async () => {
+            localStorage.setItem('imc_app_weights', JSON.stringify([
+                { id: 1, peso_kg: 70.0, fecha_registro: '2024-01-01T10:00:00.000Z' }
+            ]));
+            fetch.mockRejectedValueOnce(new Error('Network error'));
+
+            const result = await SyncManager.syncAllWeightsToBackend();
+            expect(result).toBe(0);
+        });
+    });
+});